@@ -1,6 +1,7 @@
 from app import create_app
 from extensions import db
 from models import Movie
+from migrate_db import sync_movie_genres
 from datetime import datetime
 
 def add_sample_movies():
@@ -101,6 +102,11 @@ def add_sample_movies():
             db.session.add(movie)
         
         db.session.commit()
+        
+        # Link the sample movies to the genre table used by the listings
+        with db.engine.connect() as conn:
+            sync_movie_genres(conn)
+            conn.commit()
         print(f"Added {len(sample_movies)} sample movies to the database.")
 
 if __name__ == '__main__':
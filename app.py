@@ -3,7 +3,7 @@ import os
 from extensions import db, login_manager
 from utils import import_movies_from_csv
 
-def create_app():
+def create_app(warm_model=False):
     app = Flask(__name__)
     
     # Configuration
@@ -37,18 +37,31 @@ def create_app():
             db.session.add(admin)
             db.session.commit()
         
-        # Import movies if database is empty
-        if not Movie.query.first():
-            print("No movies found in database. Starting import...")
+        # Import movies if database is empty (or finish an interrupted import)
+        if os.environ.get('STREAMIFY_SKIP_MOVIE_IMPORT') != '1':
             try:
-                import_movies_from_csv()
-                print("Movie import completed successfully!")
+                if import_movies_from_csv():
+                    print("Movie import completed successfully!")
             except Exception as e:
                 print(f"Error during movie import: {e}")
                 # Continue running the app even if import fails
+        
+        # Build the search suggestion index before the first request needs it
+        from utils.movie_suggest import get_suggestion_index
+        get_suggestion_index()
+    
+    # Servers load the recommendation model up front; scripts and tests that
+    # only need the app don't
+    if warm_model:
+        start_model_warmup(app)
     
     return app
 
+def start_model_warmup(app):
+    """Load the recommendation model in the background; requests get popular picks until it is ready."""
+    from recommendation import model_manager
+    model_manager.start(app.app_context)
+
 # Create the Flask application
 app = create_app()
 
@@ -60,5 +73,6 @@ def load_user(user_id):
     return User.query.get(int(user_id))
 
 if __name__ == '__main__':
+    start_model_warmup(app)
     # Run the app on all network interfaces (0.0.0.0) on port 5000
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,78 @@
+"""
+Benchmark: feature extraction (JSON parsing + text normalisation) for the soup.
+
+Compares the original row-by-row ``literal_eval``/``apply`` implementation
+with the JSON-parsing, vectorised ``extract_features``, single-process and
+with a process pool. Uses the TMDB CSVs when they are present, otherwise a
+synthetic catalog of ``--movies`` rows.
+
+    python benchmarks/bench_extract_features.py --movies 50000 --workers 4
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from synthetic import make_movies_frame
+import recommendation as rec
+
+
+def legacy_extract_features(df):
+    """The pre-vectorisation extract_features, kept here for comparison."""
+    df = df.copy()
+    for col in ['cast', 'crew', 'keywords', 'genres']:
+        df[col] = df[col].apply(rec.safe_literal_eval)
+    df['director'] = df['crew'].apply(
+        lambda x: next((i["name"] for i in x if isinstance(i, dict) and i.get("job") == "Director"), "")
+    )
+    for col in ['cast', 'keywords', 'genres']:
+        df[col] = df[col].apply(
+            lambda x: [i.get("name", "") for i in x[:3]] if isinstance(x, list) else []
+        )
+    for col in ['cast', 'keywords', 'director', 'genres', 'overview', 'title']:
+        df[col] = df[col].apply(
+            lambda x: " ".join(str(i).lower().replace(" ", "") for i in x)
+            if isinstance(x, list)
+            else str(x).lower().replace(" ", "") if pd.notnull(x)
+            else ""
+        )
+    return df
+
+
+def soup(df):
+    return df['keywords'] + " " + df['cast'] + " " + df['director'] + " " + df['genres']
+
+
+def timed(fn, df):
+    start = time.perf_counter()
+    result = fn(df)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--movies", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if os.path.exists(rec.CREDITS_CSV) and os.path.exists(rec.MOVIES_CSV):
+        df = rec.load_data()
+        source = "TMDB CSVs"
+    else:
+        df = make_movies_frame(args.movies)
+        source = "synthetic"
+
+    legacy, before = timed(legacy_extract_features, df)
+    single, after = timed(lambda frame: rec.extract_features(frame, workers=1), df)
+    pooled, pooled_time = timed(lambda frame: rec.extract_features(frame, workers=args.workers), df)
+    assert soup(single).equals(soup(legacy)) and soup(pooled).equals(soup(legacy))
+
+    print(f"source={source} movies={len(df)} workers={args.workers}")
+    print(f"literal_eval + apply : {before:8.2f} s")
+    print(f"json + .str (1 proc) : {after:8.2f} s  ({before / after:.1f}x)")
+    print(f"json + .str (pool)   : {pooled_time:8.2f} s  ({before / pooled_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
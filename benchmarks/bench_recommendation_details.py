@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: per-request cost of assembling recommendation details.
+
+Compares the old assembly (a boolean ``df[df['title'] == title]`` scan plus
+``indices`` lookups for every recommended title) with the precomputed
+MovieRecords table.
+
+    python benchmarks/bench_recommendation_details.py --movies 4800
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import make_movies_frame
+import recommendation as rec
+
+
+def assemble_with_scans(df, indices, movie_indices, scores):
+    """The pre-MovieRecords assembly loop, kept here for comparison."""
+    recommendations = []
+    for title, score in zip(df['title'].iloc[movie_indices].tolist(), scores):
+        movie_data = df[df['title'] == title].iloc[0]
+        _ = indices[title]
+        recommendations.append({
+            'title': title,
+            'year': int(movie_data.get('release_year', 0)) if pd.notna(movie_data.get('release_year')) else 0,
+            'genre': movie_data.get('genre', ''),
+            'rating': float(movie_data.get('rating', 0)) if pd.notna(movie_data.get('rating')) else 0.0,
+            'description': movie_data.get('description', 'No description available'),
+            'similarity_score': float(score)
+        })
+    return recommendations
+
+
+def time_per_call(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--movies", type=int, default=4800)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=rec.DEFAULT_LIMIT)
+    args = parser.parse_args()
+
+    df, sim, indices = rec.build_recommendation_model(make_movies_frame(args.movies))
+    records = rec.build_record_table(df)
+    queries = np.random.default_rng(0).integers(0, len(df), args.requests)
+    neighbours = {int(q): rec._similar_movie_scores(int(q), sim, args.limit) for q in queries}
+
+    before = time_per_call(lambda q: assemble_with_scans(df, indices, *neighbours[int(q)]), queries)
+    after = time_per_call(lambda q: records.to_dicts(*neighbours[int(q)]), queries)
+
+    print(f"catalog={args.movies} limit={args.limit} requests={args.requests}")
+    print(f"DataFrame scans : {before * 1e3:8.3f} ms/request")
+    print(f"MovieRecords    : {after * 1e3:8.3f} ms/request")
+    print(f"speedup         : {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
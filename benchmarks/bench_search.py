@@ -0,0 +1,131 @@
+"""
+Benchmark: movie search latency, ILIKE scans against the FTS5 index.
+
+Builds a throwaway SQLite catalog of synthetic movies for each size and
+times the same mix of queries (title words, description words, partial
+words and cast names) through:
+
+* ILIKE, all rows  - the original ``title/description ILIKE '%q%'`` query
+* ILIKE, one page  - the same filter through a keyset page
+* FTS5 BM25 page   - utils.movie_search.search_movies
+
+    python benchmarks/bench_search.py --movies 5000 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from synthetic import GENRES
+from flask import Flask
+from sqlalchemy import insert, or_, select
+
+from extensions import db
+from models import Actor, Movie, MovieActor
+from utils.movie_queries import paginate, PAGE_SIZE
+from utils.movie_search import search_movies
+
+
+def build_catalog(n, seed=0):
+    """Insert ``n`` synthetic movies (12 credits each) into the current app's database."""
+    rnd = random.Random(seed)
+    words = [f"w{i:05d}x" for i in range(max(2000, n // 5))]
+    people = [f"First{i} Last{i}" for i in range(max(1000, n // 2))]
+    now = datetime.utcnow()
+    db.create_all()
+    with db.engine.begin() as conn:
+        conn.execute(insert(Actor.__table__), [
+            {'id': i + 1, 'name': name, 'created_at': now, 'updated_at': now}
+            for i, name in enumerate(people)
+        ])
+        # Credits first, so the index trigger picks up each movie's cast
+        conn.execute(insert(MovieActor.__table__), [
+            {'movie_id': m + 1, 'actor_id': a + 1, 'cast_order': order}
+            for m in range(n)
+            for order, a in enumerate(rnd.sample(range(len(people)), 12))
+        ])
+        conn.execute(insert(Movie.__table__), [
+            {
+                'id': m + 1,
+                'title': " ".join(rnd.sample(words, rnd.randint(1, 3))).title(),
+                'description': " ".join(rnd.sample(words, 40)),
+                'genre': ", ".join(rnd.sample(GENRES, 2)),
+                'rating': round(rnd.uniform(1, 9), 1),
+                'release_year': rnd.randint(1950, 2020),
+                'created_at': now,
+                'updated_at': now,
+            }
+            for m in range(n)
+        ])
+    return words, people
+
+
+def make_queries(words, people, count, seed=1):
+    rnd = random.Random(seed)
+    queries = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            queries.append(rnd.choice(words))                  # whole word
+        elif kind == 1:
+            queries.append(rnd.choice(words)[:4])              # typeahead prefix
+        elif kind == 2:
+            queries.append(" ".join(rnd.sample(words, 2)))     # two words
+        else:
+            queries.append(rnd.choice(people).split()[1])      # cast surname
+    return queries
+
+
+def ilike_filter(query):
+    return or_(Movie.title.ilike(f'%{query}%'), Movie.description.ilike(f'%{query}%'))
+
+
+def percentiles(fn, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - start) * 1e3)
+        db.session.rollback()
+    cuts = statistics.quantiles(timings, n=20)
+    return statistics.median(timings), cuts[-1]
+
+
+def run(n, requests):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(app)
+        with app.app_context():
+            start = time.perf_counter()
+            words, people = build_catalog(n)
+            print(f"\ncatalog={n} (built and indexed in {time.perf_counter() - start:.1f}s) requests={requests}")
+            queries = make_queries(words, people, requests)
+
+            cases = [
+                ("ILIKE, all rows", lambda q: Movie.query.filter(ilike_filter(q)).all()),
+                ("ILIKE, one page", lambda q: paginate(select(Movie).where(ilike_filter(q)), limit=PAGE_SIZE)),
+                ("FTS5 BM25 page", lambda q: search_movies(q, limit=PAGE_SIZE)),
+            ]
+            for name, fn in cases:
+                p50, p95 = percentiles(fn, queries)
+                print(f"{name:16}: p50 {p50:8.2f} ms   p95 {p95:8.2f} ms")
+            db.session.remove()
+            db.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--movies", type=int, nargs="+", default=[5000, 100000])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    for n in args.movies:
+        run(n, args.requests)
+
+
+if __name__ == "__main__":
+    main()
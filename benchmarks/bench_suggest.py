@@ -0,0 +1,77 @@
+"""
+Benchmark: typeahead suggestion latency and memory of the prefix index.
+
+Builds utils.movie_suggest indexes over synthetic titles and actor names
+and times SuggestionIndex.suggest for prefixes one to eight characters
+long, the way a search box sends them while the user types.
+
+    python benchmarks/bench_suggest.py --movies 5000 100000
+"""
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+
+import synthetic  # noqa: F401  (puts the repo root on sys.path)
+from utils.movie_suggest import PrefixIndex, SuggestionIndex
+
+
+def make_records(n, words, seed):
+    rnd = random.Random(seed)
+    return [
+        (i + 1, " ".join(rnd.choice(words) for _ in range(rnd.randint(1, 4))).title(),
+         round(rnd.uniform(1, 9), 1), rnd.randint(1950, 2020))
+        for i in range(n)
+    ]
+
+
+def run(n, requests):
+    rnd = random.Random(n)
+    syllables = ["ka", "lo", "mi", "ne", "ro", "sa", "ti", "vu", "ar", "el", "on", "us"]
+    words = ["".join(rnd.choice(syllables) for _ in range(rnd.randint(2, 4))) for _ in range(5000)]
+    movies = make_records(n, words, 1)
+    actors = [(i, f"{first} {last}", count, None)
+              for i, (_, first, count, _), (_, last, _, _) in
+              zip(range(1, n // 2 + 1), make_records(n // 2, words, 2), make_records(n // 2, words, 3))]
+
+    def build():
+        return SuggestionIndex(PrefixIndex().with_records(movies), PrefixIndex().with_records(actors), n, n // 2)
+
+    start = time.perf_counter()
+    index = build()
+    built = time.perf_counter() - start
+    # A second build under tracemalloc (too slow to time) measures the index size
+    tracemalloc.start()
+    held = build()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+
+    titles = [title for _, title, _, _ in movies]
+    queries = []
+    for _ in range(requests):
+        title = rnd.choice(titles).lower()
+        queries.append(title[:rnd.randint(1, min(8, len(title)))])
+
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.suggest(query)
+        timings.append((time.perf_counter() - start) * 1e6)
+    p95 = statistics.quantiles(timings, n=20)[-1]
+    print(f"catalog={n:>7} actors={n // 2:>6}  build {built:6.2f}s  index memory {memory / 2 ** 20:6.1f} MiB  "
+          f"suggest p50 {statistics.median(timings):6.1f} us  p95 {p95:6.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--movies", type=int, nargs="+", default=[5000, 100000])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    for n in args.movies:
+        run(n, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Load test: concurrent viewers seeking through a locally served video.
+
+Serves one synthetic media file from a threaded local HTTP server and
+runs concurrent viewers against it with http.client. Each viewer opens the
+video (``Range: bytes=0-``, reading the first chunk and hanging up, like a
+browser), then seeks to random offsets, fetching one chunk per seek.
+Reports per-request latency, throughput and the peak Python memory of the
+process (tracemalloc; the viewers' own 1 MiB reads are included) for:
+
+* read into memory - the file read whole, the range sliced from the bytes
+* send_media_file  - utils.media_files (Range/ETag, file handed to the server)
+
+    python benchmarks/bench_video_stream.py --size-mb 256 --viewers 32
+"""
+import argparse
+import http.client
+import logging
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import synthetic  # noqa: F401  (puts the repo root on sys.path)
+from flask import Flask, Response, request
+from werkzeug.http import parse_range_header
+from werkzeug.serving import make_server
+
+from utils.media_files import send_media_file
+
+
+def make_media_file(directory, size_mb):
+    path = os.path.join(directory, 'movie.mp4')
+    block = os.urandom(1 << 20)
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(block)
+    return path
+
+
+def make_app(path):
+    app = Flask(__name__)
+
+    @app.route('/memory')
+    def read_into_memory():
+        with open(path, 'rb') as f:
+            data = f.read()
+        parsed = parse_range_header(request.headers.get('Range'))
+        if parsed is None:
+            return Response(data, mimetype='video/mp4')
+        start, stop = parsed.range_for_length(len(data))
+        response = Response(data[start:stop], status=206, mimetype='video/mp4')
+        response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{len(data)}'
+        return response
+
+    @app.route('/stream')
+    def stream():
+        return send_media_file(path, 'video/mp4')
+
+    return app
+
+
+def viewer(port, url, size, chunk, seeks, seed, timings, errors):
+    rnd = random.Random(seed)
+    offsets = [None] + [rnd.randrange(0, size - chunk) for _ in range(seeks)]
+    for offset in offsets:
+        # Opening the video asks for everything and stops reading after a chunk
+        header = 'bytes=0-' if offset is None else f'bytes={offset}-{offset + chunk - 1}'
+        start = time.perf_counter()
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        try:
+            conn.request('GET', url, headers={'Range': header})
+            response = conn.getresponse()
+            body = response.read(chunk)
+            if response.status != 206 or len(body) != chunk:
+                errors.append((response.status, len(body)))
+        finally:
+            conn.close()
+        timings.append((time.perf_counter() - start) * 1e3)
+
+
+def run_case(app, url, size, viewers, chunk, seeks):
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    timings, errors = [], []
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        clients = [
+            threading.Thread(target=viewer, args=(server.port, url, size, chunk, seeks, seed, timings, errors))
+            for seed in range(viewers)
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        server.shutdown()
+        thread.join()
+
+    cuts = statistics.quantiles(timings, n=20)
+    served = len(timings) * chunk
+    return statistics.median(timings), cuts[-1], served / elapsed / (1 << 20), peak / (1 << 20), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--viewers", type=int, default=32)
+    parser.add_argument("--seeks", type=int, default=8, help="seeks per viewer")
+    parser.add_argument("--chunk-kb", type=int, default=1024, help="bytes fetched per request")
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_media_file(tmp, args.size_mb)
+        app = make_app(path)
+        size, chunk = os.path.getsize(path), args.chunk_kb * 1024
+        print(f"file={args.size_mb} MiB viewers={args.viewers} seeks={args.seeks} chunk={args.chunk_kb} KiB")
+        for name, url in [("read into memory", '/memory'), ("send_media_file", '/stream')]:
+            p50, p95, throughput, peak, errors = run_case(app, url, size, args.viewers, chunk, args.seeks)
+            print(f"{name:16}: p50 {p50:8.2f} ms   p95 {p95:8.2f} ms   "
+                  f"{throughput:8.1f} MiB/s   peak memory {peak:8.1f} MiB"
+                  + (f"   {len(errors)} bad responses" if errors else ""))
+
+
+if __name__ == "__main__":
+    main()
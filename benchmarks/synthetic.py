@@ -0,0 +1,68 @@
+"""Synthetic TMDB-shaped data for the benchmarks in this directory."""
+import json
+import os
+import random
+import sys
+
+import pandas as pd
+
+# Allow the benchmarks to import the application modules from the repo root
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Drama", "Family",
+    "Fantasy", "History", "Horror", "Music", "Mystery", "Romance",
+    "Science Fiction", "Thriller", "War", "Western"
+]
+
+
+def make_movies_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a frame shaped like tmdb_5000_movies.csv merged with the credits file.
+    
+    Vocabulary sizes grow with ``n`` so larger catalogs keep a realistic
+    spread of keywords, cast and crew.
+    """
+    rnd = random.Random(seed)
+    words = [f"word{i}" for i in range(max(500, n // 2))]
+    people = [f"Person {i}" for i in range(max(300, n))]
+    rows = []
+    for i in range(n):
+        rows.append({
+            'id': i + 1,
+            'title': f"Synthetic Movie {i}",
+            'overview': " ".join(rnd.sample(words, 25)),
+            'release_date': f"{rnd.randint(1950, 2020)}-{rnd.randint(1, 12):02d}-01",
+            'vote_average': round(rnd.uniform(1, 9), 1),
+            'runtime': rnd.randint(80, 180),
+            'original_language': 'en',
+            'genres': json.dumps([{"id": j, "name": g} for j, g in enumerate(rnd.sample(GENRES, 3))]),
+            'keywords': json.dumps([{"id": j, "name": w} for j, w in enumerate(rnd.sample(words, 6))]),
+            'cast': json.dumps([
+                {"cast_id": j, "character": f"Character {j}", "credit_id": f"c{i}-{j}",
+                 "gender": rnd.randint(0, 2), "id": j, "name": p, "order": j}
+                for j, p in enumerate(rnd.sample(people, 12))
+            ]),
+            'crew': json.dumps([
+                {"credit_id": f"k{i}-{j}", "department": dept, "gender": 0, "id": j,
+                 "job": job, "name": rnd.choice(people)}
+                for j, (dept, job) in enumerate([
+                    ("Production", "Producer"), ("Writing", "Screenplay"),
+                    ("Directing", "Director"), ("Sound", "Original Music Composer"),
+                    ("Camera", "Director of Photography"), ("Editing", "Editor"),
+                ])
+            ]),
+        })
+    return pd.DataFrame(rows)
+
+
+def write_tmdb_csvs(directory: str, n: int, seed: int = 0):
+    """Write a synthetic catalog as tmdb_5000_credits.csv / tmdb_5000_movies.csv."""
+    data = make_movies_frame(n, seed)
+    credits_path = os.path.join(directory, "tmdb_5000_credits.csv")
+    movies_path = os.path.join(directory, "tmdb_5000_movies.csv")
+    data.drop(columns=['cast', 'crew']).to_csv(movies_path, index=False)
+    data[['id', 'title', 'cast', 'crew']].rename(columns={'id': 'movie_id'}).to_csv(credits_path, index=False)
+    return credits_path, movies_path
@@ -0,0 +1,138 @@
+import json
+import os
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+from extensions import db, login_manager
+from migrate_db import sync_movie_genres
+from models import Favorite, Movie, Subscription, User, WatchHistory, Watchlist
+
+
+@pytest.fixture
+def app():
+    """A fully wired application on an in-memory SQLite database."""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SECRET_KEY='test',
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    login_manager.init_app(app)
+
+    from routes import init_app as init_routes
+    init_routes(app)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def query_budget(app):
+    """
+    Fail a block that runs more SQL statements than its budget.
+
+        with query_budget(3) as statements:
+            client.get('/api/movies/1')
+    """
+    @contextmanager
+    def budget(limit):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        assert len(statements) <= limit, (
+            f"{len(statements)} SQL statements, budget {limit}:\n" + "\n\n".join(statements)
+        )
+
+    return budget
+
+
+@pytest.fixture
+def logged_in_client(app, client):
+    """A client logged in as the viewer of seed_catalog, and the catalog's movies."""
+    user, movies = seed_catalog()
+    login_manager.user_loader(lambda user_id: db.session.get(User, int(user_id)))
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+    return client, movies
+
+
+def seed_catalog():
+    """60 movies in three genres and a viewer with history, a watchlist, favourites and a subscription."""
+    user = User(username='viewer', email='viewer@example.com', password_hash='x')
+    db.session.add(user)
+    genres = ['Action', 'Drama', 'Comedy']
+    movies = [
+        Movie(title=f"Movie {i}", genre=genres[i % 3], rating=i % 10, release_year=1990 + i % 30)
+        for i in range(60)
+    ]
+    db.session.add_all(movies)
+    db.session.flush()
+    sync_movie_genres(db.session.connection())
+    now = datetime.utcnow()
+    db.session.add_all(
+        [WatchHistory(user_id=user.id, movie_id=m.id, watched_at=now - timedelta(hours=i))
+         for i, m in enumerate(movies[:20])]
+        + [Watchlist(user_id=user.id, movie_id=m.id) for m in movies[:5]]
+        + [Favorite(user_id=user.id, movie_id=m.id) for m in movies[5:10]]
+        + [Subscription(user_id=user.id, plan='basic')]
+    )
+    db.session.commit()
+    return user, movies
+
+
+def make_synthetic_movies(n: int, seed: int = 0) -> pd.DataFrame:
+    """Build a small TMDB-shaped frame (movies merged with credits) for tests."""
+    rnd = random.Random(seed)
+    words = [f"word{i}" for i in range(200)]
+    people = [f"Person {i}" for i in range(150)]
+    genres = ["Action", "Drama", "Comedy", "Thriller", "Horror", "Romance", "Science Fiction"]
+    rows = []
+    for i in range(n):
+        rows.append({
+            'id': i + 1,
+            'title': f"Movie {i}",
+            'overview': " ".join(rnd.sample(words, 8)),
+            'release_date': f"{rnd.randint(1950, 2020)}-05-01",
+            'vote_average': round(rnd.uniform(1, 9), 1),
+            'genres': json.dumps([{"id": j, "name": g} for j, g in enumerate(rnd.sample(genres, 2))]),
+            'keywords': json.dumps([{"id": j, "name": w} for j, w in enumerate(rnd.sample(words, 4))]),
+            'cast': json.dumps([{"cast_id": j, "name": p, "character": "", "order": j}
+                                for j, p in enumerate(rnd.sample(people, 5))]),
+            'crew': json.dumps([{"job": "Producer", "name": rnd.choice(people)},
+                                {"job": "Director", "name": rnd.choice(people)}]),
+        })
+    return pd.DataFrame(rows)
+
+
+def write_synthetic_csvs(directory, n: int = 200, data: pd.DataFrame = None, prefix: str = ""):
+    """Write a synthetic frame as TMDB-style movies and credits CSVs."""
+    data = make_synthetic_movies(n) if data is None else data
+    movies_path = os.path.join(directory, f"{prefix}movies.csv")
+    credits_path = os.path.join(directory, f"{prefix}credits.csv")
+    data.drop(columns=['cast', 'crew']).to_csv(movies_path, index=False)
+    data[['id', 'title', 'cast', 'crew']].rename(columns={'id': 'movie_id'}).to_csv(credits_path, index=False)
+    return credits_path, movies_path
@@ -1,65 +1,34 @@
-import csv
-import ast
-from datetime import datetime
+import argparse
+import os
+
+# Let this script run the import with its own options instead of the
+# default one create_app() starts when the catalog is empty
+os.environ.setdefault('STREAMIFY_SKIP_MOVIE_IMPORT', '1')
+
 from app import create_app
-from extensions import db
-from models import Movie
+from utils.movie_importer import import_movies_from_csv, MOVIES_CSV, CREDITS_CSV, BULK_BATCH_SIZE
 
-def import_movies():
+def import_movies(movies_csv=MOVIES_CSV, credits_csv=CREDITS_CSV, workers=os.cpu_count() or 1,
+                  batch_size=BULK_BATCH_SIZE, force=False):
     app = create_app()
     with app.app_context():
-        print("Starting movie import...")
-        
-        # Read movies from CSV
-        with open('tmdb_5000_movies.csv', 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader, 1):
-                try:
-                    # Parse genres (they're stored as JSON strings)
-                    genres = ast.literal_eval(row['genres'])
-                    genre = genres[0]['name'] if genres else 'Unknown'
-                    
-                    # Get release year from release_date
-                    release_year = None
-                    if row['release_date']:
-                        try:
-                            release_year = int(row['release_date'].split('-')[0])
-                        except (ValueError, IndexError):
-                            pass
-                    
-                    # Create movie with default poster if not available
-                    poster_url = None
-                    if row.get('poster_path'):
-                        poster_url = f"https://image.tmdb.org/t/p/w500{row['poster_path']}"
-                    
-                    banner_url = None
-                    if row.get('backdrop_path'):
-                        banner_url = f"https://image.tmdb.org/t/p/original{row['backdrop_path']}"
-                    
-                    # Create movie
-                    movie = Movie(
-                        title=row.get('title', 'Untitled Movie'),
-                        description=row.get('overview', 'No description available.'),
-                        release_year=release_year,
-                        genre=genre,
-                        rating=float(row.get('vote_average', 0)) if row.get('vote_average') else 0.0,
-                        poster_url=poster_url,
-                        banner_url=banner_url
-                    )
-                    db.session.add(movie)
-                    
-                    # Commit every 100 records to avoid memory issues
-                    if i % 100 == 0:
-                        db.session.commit()
-                        print(f"Imported {i} movies...")
-                        
-                except Exception as e:
-                    print(f"Error importing {row.get('title', 'unknown')}: {str(e)}")
-                    continue
-            
-            # Final commit
-            db.session.commit()
-            print(f"Successfully imported {i} movies!")
+        import_movies_from_csv(
+            movies_csv,
+            credits_csv,
+            batch_size=batch_size,
+            force=force,
+            workers=workers
+        )
 
 if __name__ == '__main__':
-    import_movies()
+    parser = argparse.ArgumentParser(description='Import the TMDB movies and credits CSVs')
+    parser.add_argument('--movies', default=MOVIES_CSV, help='Path to the movies CSV')
+    parser.add_argument('--credits', default=CREDITS_CSV, help='Path to the credits CSV')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes parsing CSV rows (1 parses in the writer thread)')
+    parser.add_argument('--batch-size', type=int, default=BULK_BATCH_SIZE,
+                        help='Movies parsed and committed per batch')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-import (upsert) even if the files were already imported')
+    args = parser.parse_args()
+    import_movies(args.movies, args.credits, args.workers, args.batch_size, args.force)
@@ -0,0 +1,99 @@
+from datetime import datetime
+from flask import Flask
+from sqlalchemy import inspect, insert, select, text
+from extensions import db
+from models import Movie, Genre, MovieGenre
+from utils.movie_importer import ensure_import_schema
+from utils.movie_search import create_search_index
+
+# Tables whose new unique (user_id, movie_id) index needs duplicates removed first
+DEDUPLICATED_TABLES = ['watchlist', 'favorite']
+
+def sync_movie_genres(conn) -> int:
+    """
+    Link movies that have no MovieGenre rows to the genres in Movie.genre.
+    
+    Movie.genre holds a genre name or a comma-separated list of them (rows
+    imported before the genre table, or added by hand); missing Genre rows
+    are created. Does not commit.
+    
+    Returns:
+        Number of movies linked
+    """
+    unlinked = conn.execute(
+        select(Movie.id, Movie.genre)
+        .where(Movie.genre.isnot(None))
+        .where(~select(MovieGenre.movie_id).where(MovieGenre.movie_id == Movie.id).exists())
+    ).all()
+    if not unlinked:
+        return 0
+    
+    genre_ids = {name: genre_id for genre_id, name in conn.execute(select(Genre.id, Genre.name))}
+    links = []
+    for movie_id, genre in unlinked:
+        names = dict.fromkeys(name.strip() for name in genre.split(',') if name.strip())
+        for position, name in enumerate(names):
+            if name not in genre_ids:
+                genre_ids[name] = conn.execute(
+                    insert(Genre.__table__).values(name=name, created_at=datetime.utcnow())
+                ).inserted_primary_key[0]
+            links.append({'movie_id': movie_id, 'genre_id': genre_ids[name], 'position': position})
+    if links:
+        conn.execute(insert(MovieGenre.__table__), links)
+    return len(unlinked)
+
+def upgrade_schema():
+    """
+    Bring an existing database up to the current models.
+
+    Creates missing tables, adds Movie.tmdb_id, links movies to the genre
+    table (see sync_movie_genres), builds the full-text search index
+    (see utils/movie_search.py) when SQLite has FTS5, removes duplicate
+    (user_id, movie_id) rows from the watchlist and favorites (keeping the
+    oldest), creates every index declared on the models that is missing,
+    and refreshes the planner statistics. Safe to run repeatedly. Must be
+    called inside an application context.
+
+    Returns:
+        Names of the indexes that were created
+    """
+    db.create_all()
+    created = []
+    with db.engine.connect() as conn:
+        ensure_import_schema(conn)
+        linked = sync_movie_genres(conn)
+        if linked:
+            print(f"Linked {linked} movies to their genres")
+        if not create_search_index(conn):
+            print("SQLite has no FTS5; search will use LIKE matching")
+        for table in DEDUPLICATED_TABLES:
+            removed = conn.execute(text(
+                f"DELETE FROM {table} WHERE id NOT IN "
+                f"(SELECT MIN(id) FROM {table} GROUP BY user_id, movie_id)"
+            )).rowcount
+            if removed:
+                print(f"Removed {removed} duplicate rows from {table}")
+
+        inspector = inspect(conn)
+        for table in db.metadata.sorted_tables:
+            existing = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+                    created.append(index.name)
+                    print(f"Created index {index.name} on {table.name}")
+
+        if conn.dialect.name == 'sqlite':
+            conn.execute(text('ANALYZE'))
+        conn.commit()
+    return created
+
+if __name__ == '__main__':
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///streamify.db'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        created = upgrade_schema()
+        print(f"Migration complete ({len(created)} indexes created)")
@@ -1,26 +1,74 @@
-import React, { useState } from 'react';
-import { View, TextInput, TouchableOpacity, StyleSheet, Platform } from 'react-native';
+import React, { useEffect, useRef, useState } from 'react';
+import { View, Text, TextInput, TouchableOpacity, StyleSheet, Platform } from 'react-native';
 import { Ionicons } from '@expo/vector-icons';
+import { suggestMovies } from '../services/api';
+import { Suggestions } from '../types';
+
+// Milliseconds of typing pause before suggestions are fetched
+const SUGGEST_DELAY = 150;
+
+const NO_SUGGESTIONS: Suggestions = { movies: [], actors: [] };
 
 interface SearchBarProps {
   onSearch: (query: string) => void;
+  // Called when a suggested movie is picked; without it the title is searched
+  onSelectMovie?: (movieId: number) => void;
   placeholder?: string;
   initialQuery?: string;
 }
 
 const SearchBar: React.FC<SearchBarProps> = ({ 
   onSearch, 
+  onSelectMovie,
   placeholder = 'Search for movies...',
   initialQuery = ''
 }) => {
   const [query, setQuery] = useState(initialQuery);
+  const [suggestions, setSuggestions] = useState<Suggestions>(NO_SUGGESTIONS);
+  // Only the latest keystroke's suggestions are shown
+  const latestQuery = useRef('');
+
+  useEffect(() => {
+    const text = query.trim();
+    latestQuery.current = text;
+    if (text.length < 2) {
+      setSuggestions(NO_SUGGESTIONS);
+      return;
+    }
+    const timer = setTimeout(() => {
+      suggestMovies(text)
+        .then(result => {
+          if (latestQuery.current === text) setSuggestions(result);
+        })
+        .catch(() => setSuggestions(NO_SUGGESTIONS));
+    }, SUGGEST_DELAY);
+    return () => clearTimeout(timer);
+  }, [query]);
 
-  const handleSearch = () => {
-    if (query.trim()) {
-      onSearch(query.trim());
+  const runSearch = (text: string) => {
+    setSuggestions(NO_SUGGESTIONS);
+    if (text.trim()) {
+      onSearch(text.trim());
     }
   };
 
+  const handleSearch = () => runSearch(query);
+
+  const pickMovie = (movie: Suggestions['movies'][number]) => {
+    if (onSelectMovie) {
+      setSuggestions(NO_SUGGESTIONS);
+      onSelectMovie(movie.id);
+    } else {
+      setQuery(movie.title);
+      runSearch(movie.title);
+    }
+  };
+
+  const pickActor = (name: string) => {
+    setQuery(name);
+    runSearch(name);
+  };
+
   return (
     <View style={styles.container}>
       <View style={styles.searchContainer}>
@@ -45,6 +93,7 @@ const SearchBar: React.FC<SearchBarProps> = ({
           <TouchableOpacity 
             onPress={() => {
               setQuery('');
+              setSuggestions(NO_SUGGESTIONS);
               onSearch('');
             }}
             style={styles.clearButton}
@@ -53,6 +102,25 @@ const SearchBar: React.FC<SearchBarProps> = ({
           </TouchableOpacity>
         )}
       </View>
+      {(suggestions.movies.length > 0 || suggestions.actors.length > 0) && (
+        <View style={styles.suggestions}>
+          {suggestions.movies.map(movie => (
+            <TouchableOpacity key={`movie-${movie.id}`} style={styles.suggestion} onPress={() => pickMovie(movie)}>
+              <Ionicons name="film-outline" size={16} color="#666" style={styles.suggestionIcon} />
+              <Text style={styles.suggestionText} numberOfLines={1}>
+                {movie.title}
+                {movie.year ? <Text style={styles.year}> ({movie.year})</Text> : null}
+              </Text>
+            </TouchableOpacity>
+          ))}
+          {suggestions.actors.map(actor => (
+            <TouchableOpacity key={`actor-${actor.id}`} style={styles.suggestion} onPress={() => pickActor(actor.name)}>
+              <Ionicons name="person-outline" size={16} color="#666" style={styles.suggestionIcon} />
+              <Text style={styles.suggestionText} numberOfLines={1}>{actor.name}</Text>
+            </TouchableOpacity>
+          ))}
+        </View>
+      )}
     </View>
   );
 };
@@ -98,6 +166,26 @@ const styles = StyleSheet.create({
   year: {
     color: '#666',
   },
+  suggestions: {
+    marginTop: 4,
+    backgroundColor: '#fff',
+    borderRadius: 12,
+    paddingVertical: 4,
+  },
+  suggestion: {
+    flexDirection: 'row',
+    alignItems: 'center',
+    paddingHorizontal: 16,
+    paddingVertical: 10,
+  },
+  suggestionIcon: {
+    marginRight: 8,
+  },
+  suggestionText: {
+    flex: 1,
+    fontSize: 15,
+    color: '#333',
+  },
 });
 
 export default SearchBar;
\ No newline at end of file
@@ -13,7 +13,7 @@ import { NativeStackScreenProps } from '@react-navigation/native-stack';
 import { Ionicons } from '@expo/vector-icons';
 import { RootStackParamList, Movie } from '../types';
 import MovieCard from '../components/MovieCard';
-import { searchMovies } from '../services/api';
+import { getGenreMovies } from '../services/api';
 
 type Props = NativeStackScreenProps<RootStackParamList, 'GenreMovies'>;
 
@@ -26,14 +26,17 @@ const GenreMoviesScreen = ({ route, navigation }: Props) => {
   const [movies, setMovies] = useState<Movie[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchMoviesByGenre = async () => {
       try {
         setLoading(true);
-        const results = await searchMovies(genre);
-        setMovies(results);
-        if (results.length === 0) {
+        const page = await getGenreMovies(genre);
+        setMovies(page.results);
+        setNextCursor(page.nextCursor);
+        if (page.results.length === 0) {
           setError(`No ${genre} movies found.`);
         }
       } catch (err) {
@@ -47,6 +50,23 @@ const GenreMoviesScreen = ({ route, navigation }: Props) => {
     fetchMoviesByGenre();
   }, [genre]);
 
+  // Fetch the next page when the list nears its end
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) {
+      return;
+    }
+    try {
+      setLoadingMore(true);
+      const page = await getGenreMovies(genre, nextCursor);
+      setMovies((current) => [...current, ...page.results]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Error loading more genre movies:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const renderMovieItem = ({ item }: { item: Movie }) => (
     <TouchableOpacity
       onPress={() => navigation.navigate('MovieDetail', { movieId: item.id })}
@@ -92,6 +112,9 @@ const GenreMoviesScreen = ({ route, navigation }: Props) => {
         numColumns={2}
         contentContainerStyle={styles.movieList}
         showsVerticalScrollIndicator={false}
+        onEndReached={loadMore}
+        onEndReachedThreshold={0.5}
+        ListFooterComponent={loadingMore ? <ActivityIndicator color="#E50914" style={styles.footer} /> : null}
       />
     </View>
   );
@@ -137,6 +160,9 @@ const styles = StyleSheet.create({
     width: CARD_WIDTH,
     margin: CARD_MARGIN,
   },
+  footer: {
+    marginVertical: 16,
+  },
 });
 
 export default GenreMoviesScreen;
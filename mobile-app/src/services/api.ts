@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { Movie, MovieDetails, BackendMovie, ApiResponse } from '../types';
+import { Movie, MovieDetails, BackendMovie, ApiResponse, MoviePage, Suggestions } from '../types';
 
 // API configuration
 // Use environment variable or default to local development URL
@@ -93,13 +93,24 @@ export const getPopularMovies = async (): Promise<Movie[]> => {
  * @returns Promise with an array of matching movies
  */
 export const searchMovies = async (query: string): Promise<Movie[]> => {
+  const page = await searchMoviesPage(query);
+  return page.results;
+};
+
+/**
+ * Fetches one page of search results
+ * @param query The search query
+ * @param cursor next_cursor of the previous page (omit for the first page)
+ * @returns Promise with the page's movies and the cursor of the next page
+ */
+export const searchMoviesPage = async (query: string, cursor?: string | null): Promise<MoviePage> => {
   try {
-    const response = await api.get<{ results: Movie[]; success: boolean }>('/movies/search', {
-      params: { q: query },
+    const response = await api.get<ApiResponse<Movie>>('/movies/search', {
+      params: { q: query, cursor: cursor || undefined },
     });
     
     if (response.data.success && Array.isArray(response.data.results)) {
-      return response.data.results;
+      return { results: response.data.results, nextCursor: response.data.next_cursor || null };
     }
     
     throw new Error('Invalid response format from server');
@@ -109,6 +120,68 @@ export const searchMovies = async (query: string): Promise<Movie[]> => {
   }
 };
 
+/**
+ * Fetches typeahead suggestions for a partially typed query.
+ * Cheap enough to call on every keystroke (answered from an in-memory index).
+ * @param query The text typed so far
+ * @returns Promise with the matching movie titles and actors
+ */
+export const suggestMovies = async (query: string): Promise<Suggestions> => {
+  if (!query.trim()) {
+    return { movies: [], actors: [] };
+  }
+  const response = await api.get<{
+    success: boolean;
+    results: Suggestions['movies'];
+    actors: Suggestions['actors'];
+    error?: string;
+  }>('/movies/suggest', { params: { q: query } });
+  if (!response.data.success) {
+    throw new Error(response.data.error || 'Failed to fetch suggestions');
+  }
+  return { movies: response.data.results, actors: response.data.actors };
+};
+
+/**
+ * Fetches one page of the movies in a genre
+ * @param genre The genre name
+ * @param cursor next_cursor of the previous page (omit for the first page)
+ * @param sort One of the listing sorts, e.g. 'rating_desc' or 'title_asc'
+ * @returns Promise with the page's movies and the cursor of the next page
+ */
+export const getGenreMovies = async (
+  genre: string,
+  cursor?: string | null,
+  sort: string = 'rating_desc'
+): Promise<MoviePage> => {
+  try {
+    const response = await api.get<ApiResponse<BackendMovie>>(`/genres/${encodeURIComponent(genre)}/movies`, {
+      params: { sort, cursor: cursor || undefined },
+    });
+    if (!response.data.success) {
+      throw new Error(response.data.error || 'Failed to fetch genre movies');
+    }
+    
+    // The listing returns card fields only; fill in the rest like getPopularMovies
+    const results = (response.data.results || []).map((movie: BackendMovie) => ({
+      ...movie,
+      overview: '',
+      release_date: movie.release_year ? movie.release_year.toString() : '',
+      poster_path: movie.poster_url,
+      backdrop_path: null,
+      vote_average: movie.rating || 0,
+      vote_count: 0,
+      popularity: 0,
+      original_language: 'en',
+      genres: [{ id: 0, name: genre }]
+    })) as unknown as Movie[];
+    return { results, nextCursor: response.data.next_cursor || null };
+  } catch (error) {
+    console.error('Error fetching genre movies:', error);
+    throw error;
+  }
+};
+
 /**
  * Fetches detailed information about a specific movie
  * @param movieId The ID of the movie
@@ -135,9 +208,9 @@ export const getMovieDetails = async (movieId: number): Promise<MovieDetails> =>
     const cast = (movie.cast || []).map(actor => ({
       id: actor.id,
       name: actor.name,
-      character: 'Actor', // Default value since not provided by backend
+      character: actor.character || 'Actor',
       profile_path: actor.profile_url,
-      order: 0 // Default order since not provided by backend
+      order: actor.order ?? 0
     }));
 
     // Debug log the raw similar_movies data
@@ -418,6 +491,9 @@ export const getTrendingData = async (): Promise<{
 const apiService = {
   getPopularMovies,
   searchMovies,
+  searchMoviesPage,
+  suggestMovies,
+  getGenreMovies,
   getMovieDetails,
   getTrendingData,
   getMovieRecommendations,
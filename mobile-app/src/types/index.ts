@@ -48,8 +48,9 @@ export interface BackendMovie {
   cast?: Array<{
     id: number;
     name: string;
-    character?: string;
+    character?: string | null;
     profile_url: string | null;
+    order?: number;
   }>;
   
   // Similar movies that might be included in the response
@@ -233,6 +234,19 @@ export interface ApiResponse<T> {
   result?: T;
   count?: number;
   error?: string;
+  next_cursor?: string | null;
+}
+
+// Typeahead suggestions from /movies/suggest, best matches first
+export interface Suggestions {
+  movies: Array<{ id: number; title: string; year: number | null; rating: number }>;
+  actors: Array<{ id: number; name: string }>;
+}
+
+// One page of a cursor-paginated listing; pass nextCursor back for the next page
+export interface MoviePage {
+  results: Movie[];
+  nextCursor: string | null;
 }
 
 export type RootStackParamList = {
@@ -27,6 +27,7 @@ class User(UserMixin, db.Model):
 
 class Movie(db.Model):
     id = db.Column(db.Integer, primary_key=True)
+    tmdb_id = db.Column(db.Integer, unique=True, index=True, nullable=True)  # Source id for CSV imports
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=True)
     release_year = db.Column(db.Integer, nullable=True)
@@ -44,11 +45,28 @@ class Movie(db.Model):
     watch_history = db.relationship('WatchHistory', backref='movie', lazy=True, cascade='all, delete-orphan')
     watchlist = db.relationship('Watchlist', backref='movie', lazy=True, cascade='all, delete-orphan')
     favorites = db.relationship('Favorite', backref='movie', lazy=True, cascade='all, delete-orphan')
-    actors = db.relationship('MovieActor', back_populates='movie', lazy=True, cascade='all, delete-orphan')
+    actors = db.relationship('MovieActor', back_populates='movie', lazy=True, cascade='all, delete-orphan',
+                             order_by='MovieActor.cast_order')
+    genres = db.relationship('MovieGenre', back_populates='movie', lazy=True, cascade='all, delete-orphan',
+                             order_by='MovieGenre.position')
+    video_package = db.relationship('VideoPackage', back_populates='movie', uselist=False,
+                                    cascade='all, delete-orphan')
+    
+    # Indexes for the genre rows, similar-movie, popular-movie and title lookups
+    __table_args__ = (
+        db.Index('ix_movie_genre_rating', 'genre', db.desc('rating')),
+        db.Index('ix_movie_title', 'title'),
+        db.Index('ix_movie_rating_year', db.desc('rating'), db.desc('release_year')),
+        db.Index('ix_movie_release_year', 'release_year'),
+    )
     
     def get_actors(self):
         """Get list of actors for this movie, ordered by cast order."""
-        return [ma.actor for ma in sorted(self.actors, key=lambda x: x.cast_order)]
+        return [ma.actor for ma in self.actors]
+    
+    def get_genre_names(self):
+        """Get the names of this movie's genres, in TMDB order."""
+        return [mg.genre.name for mg in self.genres]
     
     def __repr__(self):
         return f'<Movie {self.title} ({self.release_year})>'
@@ -93,37 +111,159 @@ class MovieActor(db.Model):
     movie = db.relationship('Movie', back_populates='actors')
     actor = db.relationship('Actor', back_populates='movies')
     
-    # Composite unique constraint
+    # Composite unique constraint, plus indexes for actor filmographies and ordered casts
     __table_args__ = (
         db.UniqueConstraint('movie_id', 'actor_id', name='_movie_actor_uc'),
+        db.Index('ix_movie_actor_actor_movie', 'actor_id', 'movie_id'),
+        db.Index('ix_movie_actor_movie_order', 'movie_id', 'cast_order'),
     )
     
     def __repr__(self):
         return f'<MovieActor {self.actor.name} as {self.character_name} in {self.movie.title}>'
 
 
+class Genre(db.Model):
+    """A TMDB genre; movies link to it through MovieGenre."""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    movies = db.relationship('MovieGenre', back_populates='genre', lazy=True, cascade='all, delete-orphan')
+    
+    def __repr__(self):
+        return f'<Genre {self.name}>'
+
+
+class MovieGenre(db.Model):
+    """Association table for many-to-many relationship between Movie and Genre."""
+    __tablename__ = 'movie_genre'
+    
+    movie_id = db.Column(db.Integer, db.ForeignKey('movie.id', ondelete='CASCADE'), primary_key=True)
+    genre_id = db.Column(db.Integer, db.ForeignKey('genre.id', ondelete='CASCADE'), primary_key=True)
+    position = db.Column(db.Integer, default=0)  # Order of the genre in the TMDB list
+    
+    # Relationships
+    movie = db.relationship('Movie', back_populates='genres')
+    genre = db.relationship('Genre', back_populates='movies')
+    
+    # The primary key serves movie -> genres; this one serves genre -> movies
+    __table_args__ = (
+        db.Index('ix_movie_genre_genre_movie', 'genre_id', 'movie_id'),
+    )
+    
+    def __repr__(self):
+        return f'<MovieGenre {self.movie_id} in {self.genre_id}>'
+
+
+class ImportCheckpoint(db.Model):
+    """Progress of a CSV import, committed together with each imported batch."""
+    __tablename__ = 'import_checkpoint'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(200), unique=True, nullable=False)  # Movies CSV file name
+    last_tmdb_id = db.Column(db.Integer, nullable=True)  # Last committed row of the movies CSV
+    rows_imported = db.Column(db.Integer, default=0)
+    completed = db.Column(db.Boolean, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ImportCheckpoint {self.source} at {self.last_tmdb_id}>'
+
+
+class VideoPackage(db.Model):
+    """HLS packaging of a movie's video (see utils/hls_packager.py)."""
+    __tablename__ = 'video_package'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    movie_id = db.Column(db.Integer, db.ForeignKey('movie.id', ondelete='CASCADE'), unique=True, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, ready or failed
+    source = db.Column(db.String(500), nullable=True)  # Movie.video_url that was packaged
+    version = db.Column(db.String(40), nullable=True)  # Output directory; changes with the source
+    master_playlist = db.Column(db.String(200), nullable=True)  # Relative to the version directory
+    segment_seconds = db.Column(db.Float, nullable=True)  # Target segment duration
+    duration = db.Column(db.Float, nullable=True)  # in seconds
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    movie = db.relationship('Movie', back_populates='video_package')
+    renditions = db.relationship('VideoRendition', back_populates='package', lazy=True,
+                                 cascade='all, delete-orphan', order_by='VideoRendition.bandwidth.desc()')
+    
+    @property
+    def ready(self):
+        return self.status == 'ready'
+    
+    def __repr__(self):
+        return f'<VideoPackage {self.movie_id} {self.status}>'
+
+
+class VideoRendition(db.Model):
+    """One bitrate of a VideoPackage: its media playlist and segments."""
+    __tablename__ = 'video_rendition'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    package_id = db.Column(db.Integer, db.ForeignKey('video_package.id', ondelete='CASCADE'), nullable=False)
+    name = db.Column(db.String(20), nullable=False)  # e.g. 720p
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    bandwidth = db.Column(db.Integer, nullable=False)  # Peak bits per second, as in the master playlist
+    playlist = db.Column(db.String(200), nullable=False)  # Relative to the version directory
+    segment_count = db.Column(db.Integer, default=0)
+    total_bytes = db.Column(db.BigInteger, default=0)
+    
+    # Relationships
+    package = db.relationship('VideoPackage', back_populates='renditions')
+    
+    __table_args__ = (
+        db.UniqueConstraint('package_id', 'name', name='_package_rendition_uc'),
+    )
+    
+    def __repr__(self):
+        return f'<VideoRendition {self.package_id} {self.name}>'
+
+
 class WatchHistory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     movie_id = db.Column(db.Integer, db.ForeignKey('movie.id'), nullable=False)
     watched_at = db.Column(db.DateTime, default=datetime.utcnow)
     progress = db.Column(db.Integer, default=0)  # in seconds
+    
+    # A user's history, newest first
+    __table_args__ = (
+        db.Index('ix_watch_history_user_watched', 'user_id', db.desc('watched_at')),
+    )
 
 class Watchlist(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     movie_id = db.Column(db.Integer, db.ForeignKey('movie.id'), nullable=False)
     added_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # One entry per user and movie; a unique index (rather than a table
+    # constraint) so migrate_db.py can add it to existing databases
+    __table_args__ = (
+        db.Index('ux_watchlist_user_movie', 'user_id', 'movie_id', unique=True),
+    )
 
 class Favorite(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     movie_id = db.Column(db.Integer, db.ForeignKey('movie.id'), nullable=False)
     added_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # One entry per user and movie; a unique index (rather than a table
+    # constraint) so migrate_db.py can add it to existing databases
+    __table_args__ = (
+        db.Index('ux_favorite_user_movie', 'user_id', 'movie_id', unique=True),
+    )
 
 class Subscription(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     plan = db.Column(db.String(50), nullable=False)  # e.g., 'basic', 'premium'
     start_date = db.Column(db.DateTime, default=datetime.utcnow)
     end_date = db.Column(db.DateTime)
@@ -0,0 +1,46 @@
+import argparse
+import os
+
+# Packaging needs the database, not the catalog import
+os.environ.setdefault('STREAMIFY_SKIP_MOVIE_IMPORT', '1')
+
+from app import create_app
+from models import Movie, VideoPackage
+from utils.hls_packager import PackagingQueue, MAX_CONCURRENT_JOBS
+from utils.media_files import is_local_media
+
+def package_videos(movie_ids=None, workers=MAX_CONCURRENT_JOBS, force=False):
+    """
+    Package movies' local video files as HLS, ``workers`` ffmpeg runs at a time.
+
+    With no ``movie_ids``, packages every movie with a local video file.
+    """
+    app = create_app()
+    with app.app_context():
+        if not movie_ids:
+            movie_ids = [movie_id for movie_id, video_url in
+                         Movie.query.with_entities(Movie.id, Movie.video_url).order_by(Movie.id)
+                         if is_local_media(video_url)]
+    print(f"Packaging {len(movie_ids)} movies with {workers} workers")
+
+    jobs = PackagingQueue(app, workers)
+    for movie_id in movie_ids:
+        jobs.submit(movie_id, force=force)
+    jobs.close()
+
+    with app.app_context():
+        packages = VideoPackage.query.filter(VideoPackage.movie_id.in_(movie_ids)).all()
+        for package in packages:
+            detail = ', '.join(r.name for r in package.renditions) if package.ready else package.error
+            print(f"Movie {package.movie_id}: {package.status} ({detail})")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Package movie videos as HLS')
+    parser.add_argument('movie_ids', type=int, nargs='*',
+                        help='Movies to package (default: every movie with a local video file)')
+    parser.add_argument('--workers', type=int, default=MAX_CONCURRENT_JOBS,
+                        help='ffmpeg processes to run at once')
+    parser.add_argument('--force', action='store_true',
+                        help='Package again even if the source has not changed')
+    args = parser.parse_args()
+    package_videos(args.movie_ids, args.workers, args.force)
@@ -0,0 +1,41 @@
+import argparse
+import os
+
+# Pre-warming needs the database, not the catalog import
+os.environ.setdefault('STREAMIFY_SKIP_MOVIE_IMPORT', '1')
+
+from app import create_app
+from models import Movie
+from utils.image_proxy import IMAGE_FORMATS, ImageCache, prewarm_images
+
+def iter_catalog_images(chunk_size=1000):
+    """('poster' | 'banner', URL) of every movie image, read in id order."""
+    last_id = 0
+    while True:
+        rows = Movie.query.with_entities(Movie.id, Movie.poster_url, Movie.banner_url).filter(
+            Movie.id > last_id
+        ).order_by(Movie.id).limit(chunk_size).all()
+        if not rows:
+            return
+        for _, poster_url, banner_url in rows:
+            yield 'poster', poster_url
+            yield 'banner', banner_url
+        last_id = rows[-1][0]
+
+def prewarm(formats=tuple(IMAGE_FORMATS), workers=os.cpu_count() or 1):
+    """Render every poster and banner variant of the catalog into the image cache."""
+    app = create_app()
+    with app.app_context():
+        sources = list(iter_catalog_images())
+    counts = prewarm_images(sources, ImageCache(), formats, workers)
+    print(f"Rendered {counts['rendered']} images from {counts['sources']} sources "
+          f"({counts['failed']} failed)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render the poster and banner variants of every movie')
+    parser.add_argument('--formats', nargs='+', choices=list(IMAGE_FORMATS), default=list(IMAGE_FORMATS),
+                        help='Output formats to render')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes fetching and resizing images')
+    args = parser.parse_args()
+    prewarm(args.formats, args.workers)
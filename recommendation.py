@@ -2,10 +2,37 @@ import numpy as np
 import pandas as pd
 from ast import literal_eval
 import os
+import sys
+import time
 import logging
-from typing import List, Optional, Tuple, Dict, Any, Union
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Dict, Any, Union, Iterable, Iterator
 import json
+import re
+import uuid
+import hashlib
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from datetime import datetime
 from pathlib import Path
+from recommendation_cache import make_result_cache, RESULT_CACHE_SIZE, RESULT_CACHE_TTL
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(
@@ -20,8 +47,58 @@ DEFAULT_RECOMMENDATIONS = [
     "Pulp Fiction", "Inception", "The Matrix", "Interstellar"
 ]
 SIMILARITY_THRESHOLD = 50  # Minimum confidence score for fuzzy matching
+FUZZY_CANDIDATES = 64  # Titles shortlisted by trigram overlap before fuzzy scoring
+TITLE_CACHE_SIZE = 4096  # Resolved queries kept per title index
 MAX_RECOMMENDATIONS = 20
 DEFAULT_LIMIT = 10
+BATCH_CHUNK_SIZE = 1024  # Titles resolved per vectorised neighbour lookup
+FEATURE_WORKERS = int(os.environ.get('RECOMMENDATION_FEATURE_WORKERS', os.cpu_count() or 1))
+PARALLEL_FEATURE_ROWS = 20_000  # Smaller catalogs parse faster in one process
+
+# Similarity model settings. 'topk' keeps only the K best neighbours per movie
+# (memory linear in catalog size); 'dense' keeps the full N x N matrix.
+SIMILARITY_MODE = os.environ.get('RECOMMENDATION_SIMILARITY_MODE', 'topk')
+# 'count' fits a vocabulary (terms unseen at build time are ignored by
+# incremental updates); 'hashing' maps every term into a fixed hashed space.
+VECTORIZER_KIND = os.environ.get('RECOMMENDATION_VECTORIZER', 'count')
+HASHING_FEATURES = 2 ** 20
+TOP_K_NEIGHBORS = 50  # Must stay >= MAX_RECOMMENDATIONS
+SIMILARITY_BLOCK_CELLS = 8_000_000  # ~32 MB of float32 scores per block
+
+# Source data and persisted model artifacts
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+CREDITS_CSV = os.path.join(DATA_DIR, "tmdb_5000_credits.csv")
+MOVIES_CSV = os.path.join(DATA_DIR, "tmdb_5000_movies.csv")
+
+# Columns read from the TMDB CSVs; everything else (homepage, tagline,
+# production_companies, ...) is skipped at parse time
+MOVIES_DTYPES = {
+    'id': 'int64',
+    'title': 'object',
+    'original_title': 'object',
+    'overview': 'object',
+    'release_date': 'object',
+    'vote_average': 'float64',
+    'genres': 'object',
+    'keywords': 'object',
+}
+CREDITS_DTYPES = {'movie_id': 'int64', 'cast': 'object', 'crew': 'object'}
+CSV_ENGINE = 'pyarrow' if os.environ.get('RECOMMENDATION_CSV_ENGINE') == 'pyarrow' else 'c'
+PARSED_CACHE_VERSION = 1  # Bump when parse_data's output changes
+# 'csv' builds the model from the TMDB CSVs, 'db' from the Movie/Actor tables
+RECOMMENDATION_SOURCE = os.environ.get('RECOMMENDATION_SOURCE', 'csv')
+DB_CHUNK_SIZE = 1000  # Movies fetched per database round trip
+MODEL_ARTIFACT_DIR = os.environ.get(
+    'RECOMMENDATION_MODEL_DIR', os.path.join(DATA_DIR, 'model_artifacts')
+)
+ARTIFACT_FORMAT_VERSION = 4
+# Result cache in front of get_movie_recommendations: 'memory' (per-process
+# LRU), 'sqlite' (a file shared by every worker) or 'none'
+RESULT_CACHE_BACKEND = os.environ.get('RECOMMENDATION_CACHE', 'memory')
+RESULT_CACHE_PATH = os.environ.get(
+    'RECOMMENDATION_CACHE_PATH', os.path.join(MODEL_ARTIFACT_DIR, 'results.sqlite3')
+)
+RESULT_CACHE_TTL = float(os.environ.get('RECOMMENDATION_CACHE_TTL', RESULT_CACHE_TTL))
 
 # Type aliases
 DataFrame = pd.DataFrame
@@ -40,6 +117,77 @@ class ModelBuildError(RecommendationError):
     """Raised when there's an error building the recommendation model."""
     pass
 
+class TopKSimilarity:
+    """
+    Sparse similarity index holding the top-K neighbours of every movie.
+    
+    Row ``i`` of ``neighbors`` lists the indices of the movies most similar to
+    movie ``i`` (best first, never ``i`` itself) and the same row of ``scores``
+    holds their cosine similarities as float32.
+    """
+    
+    __slots__ = ('neighbors', 'scores')
+    
+    def __init__(self, neighbors: NDArray, scores: NDArray):
+        self.neighbors = neighbors
+        self.scores = scores
+    
+    def __len__(self) -> int:
+        return self.neighbors.shape[0]
+    
+    @property
+    def k(self) -> int:
+        """Number of neighbours stored per movie."""
+        return self.neighbors.shape[1]
+    
+    @property
+    def nbytes(self) -> int:
+        return self.neighbors.nbytes + self.scores.nbytes
+
+class MovieRecords:
+    """
+    Index-aligned columnar store of the details returned with recommendations.
+    
+    Entry ``i`` of every column describes row ``i`` of the model frame, so
+    assembling a recommendation is plain integer indexing.
+    """
+    
+    __slots__ = ('movie_id', 'tmdb_id', 'title', 'year', 'genre', 'rating', 'description')
+    
+    def __init__(
+        self,
+        movie_id: NDArray,
+        tmdb_id: NDArray,
+        title: NDArray,
+        year: NDArray,
+        genre: NDArray,
+        rating: NDArray,
+        description: NDArray
+    ):
+        self.movie_id = movie_id
+        self.tmdb_id = tmdb_id
+        self.title = title
+        self.year = year
+        self.genre = genre
+        self.rating = rating
+        self.description = description
+    
+    def __len__(self) -> int:
+        return len(self.title)
+    
+    def to_dicts(self, rows: List[int], scores: List[float]) -> List[Dict[str, Any]]:
+        """Build recommendation dicts for the given rows and similarity scores."""
+        return [{
+            'id': int(self.movie_id[i]) if self.movie_id[i] >= 0 else None,
+            'tmdb_id': int(self.tmdb_id[i]) if self.tmdb_id[i] >= 0 else None,
+            'title': self.title[i],
+            'year': int(self.year[i]),
+            'genre': self.genre[i],
+            'rating': float(self.rating[i]),
+            'description': self.description[i],
+            'similarity_score': float(score)
+        } for i, score in zip(rows, scores)]
+
 def safe_literal_eval(x: str) -> Any:
     """Safely evaluate a string containing a Python literal."""
     try:
@@ -47,18 +195,42 @@ def safe_literal_eval(x: str) -> Any:
     except (ValueError, SyntaxError):
         return []
 
-def load_data() -> DataFrame:
-    """Load and merge the TMDB datasets with error handling."""
+def fast_literal_eval(x: str) -> Any:
+    """
+    Parse a JSON-ish list/dict string, trying a JSON parser before literal_eval.
+    
+    The TMDB columns are valid JSON, which orjson/json parse far faster than
+    ``ast.literal_eval``; anything they reject (such as single-quoted Python
+    reprs) falls back to safe_literal_eval.
+    """
+    if not isinstance(x, str):
+        return x
+    try:
+        return _json_loads(x)
+    except ValueError:
+        return safe_literal_eval(x)
+
+def _read_tmdb_csv(path: str, dtypes: Dict[str, str]) -> DataFrame:
+    """Read only the columns in ``dtypes`` that the file has, with those dtypes."""
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [col for col in dtypes if col in header]
+    return pd.read_csv(
+        path,
+        usecols=usecols,
+        dtype={col: dtypes[col] for col in usecols},
+        engine=CSV_ENGINE
+    )
+
+def load_data(credits_path: str = CREDITS_CSV, movies_path: str = MOVIES_CSV) -> DataFrame:
+    """
+    Load and merge the TMDB datasets with error handling.
+    
+    Only the columns the recommender uses are read (see MOVIES_DTYPES and
+    CREDITS_DTYPES), with explicit dtypes.
+    """
     try:
         logger.info("Loading TMDB datasets...")
         
-        # Get the directory of the current script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Define absolute paths to the CSV files
-        credits_path = os.path.join(script_dir, "tmdb_5000_credits.csv")
-        movies_path = os.path.join(script_dir, "tmdb_5000_movies.csv")
-        
         logger.info(f"Looking for CSV files at:\n- {credits_path}\n- {movies_path}")
         
         # Check if CSV files exist
@@ -69,8 +241,8 @@ def load_data() -> DataFrame:
         
         # Load and merge datasets
         logger.info("Reading CSV files...")
-        credits_df = pd.read_csv(credits_path)
-        movies_df = pd.read_csv(movies_path)
+        credits_df = _read_tmdb_csv(credits_path, CREDITS_DTYPES)
+        movies_df = _read_tmdb_csv(movies_path, MOVIES_DTYPES)
         
         if credits_df.empty:
             raise DataLoadError(f"Credits CSV is empty: {credits_path}")
@@ -119,82 +291,592 @@ def load_data() -> DataFrame:
         logger.error(error_msg, exc_info=True)
         raise DataLoadError(error_msg) from e
 
-def extract_features(df: DataFrame) -> DataFrame:
-    """Extract and process features from the raw DataFrame."""
-    if df.empty:
-        return df
-        
+def _parsed_cache_path(credits_path: str, movies_path: str) -> str:
+    """Cache file for the parsed frame of these CSVs, keyed by their size and mtime."""
+    key = f"{PARSED_CACHE_VERSION}"
+    for path in (credits_path, movies_path):
+        stat = os.stat(path)
+        key += f":{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    extension = 'parquet' if PARQUET_AVAILABLE else 'pkl'
+    return os.path.join(os.path.dirname(os.path.abspath(movies_path)), f".tmdb_parsed.{digest}.{extension}")
+
+def parse_data(df: DataFrame, workers: Optional[int] = None) -> DataFrame:
+    """
+    Reduce raw TMDB rows to the pre-parsed form extract_features accepts.
+    
+    ``genre`` (the first genre) is filled in, ``cast``/``keywords``/``genres``
+    become lists of their first three names, and ``crew`` is replaced by
+    the ``director`` name.
+    """
     df = df.copy()
+    if 'genre' not in df.columns and 'genres' in df.columns:
+        df['genre'] = df['genres'].apply(
+            lambda x: next((i.get("name", "") for i in fast_literal_eval(x) if isinstance(i, dict)), "")
+        )
+    if workers is None:
+        workers = FEATURE_WORKERS if len(df) >= PARALLEL_FEATURE_ROWS else 1
+    parsed = _parse_feature_columns(df, workers)
+    df = df.drop(columns=['crew'], errors='ignore')
+    for col, values in parsed.items():
+        df[col] = pd.Series(values, index=df.index, dtype=object)
+    return df
+
+def load_parsed_data(
+    credits_path: str = CREDITS_CSV,
+    movies_path: str = MOVIES_CSV,
+    use_cache: bool = True
+) -> DataFrame:
+    """
+    Load the TMDB datasets already parsed for feature extraction.
     
-    # Safely evaluate string representations of lists/dicts
-    for col in ['cast', 'crew', 'keywords', 'genres']:
-        if col in df.columns:
-            df[col] = df[col].apply(safe_literal_eval)
+    The first call parses the CSVs (load_data + parse_data) and caches the
+    result as a Parquet file (a pickle when pyarrow isn't installed) next to
+    the CSVs; later calls read that file instead and skip both the CSV
+    parsing and the JSON column parsing. The cache is invalidated whenever
+    either CSV's size or modification time changes.
+    """
+    for path in (credits_path, movies_path):
+        if not os.path.exists(path):
+            raise DataLoadError(f"File not found: {path}")
+    cache_path = _parsed_cache_path(credits_path, movies_path)
     
-    # Extract director
-    df['director'] = df['crew'].apply(
-        lambda x: next((i["name"] for i in x if isinstance(i, dict) and i.get("job") == "Director"), "")
+    if use_cache and os.path.exists(cache_path):
+        try:
+            df = pd.read_parquet(cache_path) if PARQUET_AVAILABLE else pd.read_pickle(cache_path)
+            logger.info(f"Loaded {len(df)} parsed movies from {cache_path}")
+            return df
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable parsed-data cache {cache_path}: {str(e)}")
+    
+    df = parse_data(load_data(credits_path, movies_path))
+    if use_cache:
+        _write_parsed_cache(df, cache_path)
+    return df
+
+def _write_parsed_cache(df: DataFrame, cache_path: str) -> None:
+    """Atomically write the parsed-data cache and drop caches of older CSVs."""
+    directory = os.path.dirname(cache_path)
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmdb_parsed.', suffix='.tmp', dir=directory)
+        os.close(fd)
+        try:
+            if PARQUET_AVAILABLE:
+                df.to_parquet(tmp_path, index=False)
+            else:
+                df.to_pickle(tmp_path)
+            os.replace(tmp_path, cache_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    except OSError as e:
+        logger.warning(f"Could not cache parsed data in {directory}: {str(e)}")
+        return
+    
+    for entry in os.listdir(directory):
+        stale = os.path.join(directory, entry)
+        if entry.startswith('.tmdb_parsed.') and stale != cache_path and not entry.endswith('.tmp'):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    logger.info(f"Cached parsed data in {cache_path}")
+
+def add_detail_columns(df: DataFrame) -> DataFrame:
+    """
+    Derive the display columns used in recommendations from the raw TMDB columns.
+    
+    Adds ``display_title`` (the title before feature normalisation) and fills
+    ``release_year``, ``genre``, ``rating`` and ``description`` from
+    ``release_date``, ``genres``, ``vote_average`` and ``overview`` when the
+    frame doesn't already have them.
+    """
+    df = df.copy()
+    df['display_title'] = df['title']
+    if 'release_year' not in df.columns and 'release_date' in df.columns:
+        df['release_year'] = pd.to_datetime(df['release_date'], errors='coerce').dt.year
+    if 'genre' not in df.columns and 'genres' in df.columns:
+        df['genre'] = df['genres'].apply(
+            lambda x: next((i.get("name", "") for i in fast_literal_eval(x) if isinstance(i, dict)), "")
+        )
+    if 'rating' not in df.columns and 'vote_average' in df.columns:
+        df['rating'] = df['vote_average']
+    if 'description' not in df.columns and 'overview' in df.columns:
+        df['description'] = df['overview']
+    return df
+
+def build_record_table(df: DataFrame) -> MovieRecords:
+    """Precompute the MovieRecords store for a model frame."""
+    def column(name: str, default: Any) -> Series:
+        return df[name] if name in df.columns else pd.Series(default, index=df.index)
+    
+    title = column('display_title', None).fillna(df['title'])
+    # CSV frames are keyed by the TMDB id; database frames carry Movie.id and Movie.tmdb_id
+    tmdb_id = column('tmdb_id', -1) if 'movie_id' in df.columns else column('id', -1)
+    return MovieRecords(
+        movie_id=column('movie_id', -1).fillna(-1).to_numpy(dtype=np.int64),
+        tmdb_id=pd.to_numeric(tmdb_id, errors='coerce').fillna(-1).to_numpy(dtype=np.int64),
+        title=title.to_numpy(dtype=object),
+        year=pd.to_numeric(column('release_year', 0), errors='coerce').fillna(0).to_numpy(dtype=np.int32),
+        genre=column('genre', '').fillna('').to_numpy(dtype=object),
+        rating=pd.to_numeric(column('rating', 0.0), errors='coerce').fillna(0.0).to_numpy(dtype=np.float64),
+        description=column('description', 'No description available')
+            .fillna('No description available').to_numpy(dtype=object)
     )
+
+def _db_frame_chunk(movies: List[Any], cast_by_movie: Dict[int, List[str]]) -> DataFrame:
+    """Shape a chunk of Movie rows like load_data() output, keyed by Movie.id."""
+    return pd.DataFrame({
+        'id': [m.id for m in movies],
+        'movie_id': [m.id for m in movies],
+        'tmdb_id': [m.tmdb_id for m in movies],
+        'title': [m.title for m in movies],
+        'overview': [m.description or '' for m in movies],
+        'description': [m.description for m in movies],
+        'release_year': [m.release_year for m in movies],
+        'rating': [m.rating for m in movies],
+        'genre': [m.genre for m in movies],
+        'genres': [[{'name': g.strip()} for g in (m.genre or '').split(',') if g.strip()] for m in movies],
+        'cast': [[{'name': name} for name in cast_by_movie.get(m.id, [])] for m in movies],
+        'keywords': [[] for _ in movies],
+        'crew': [[] for _ in movies],
+    })
+
+def iter_db_movie_chunks(chunk_size: int = DB_CHUNK_SIZE) -> Iterator[DataFrame]:
+    """
+    Stream the movie catalog from the database as TMDB-shaped frames.
     
-    # Extract top cast members
-    for col in ['cast', 'keywords', 'genres']:
-        df[col] = df[col].apply(
-            lambda x: [i.get("name", "") for i in x[:3]] if isinstance(x, list) else []
+    Movies are read in ``chunk_size`` partitions through a streaming
+    (server-side where the driver supports it) cursor, and each partition's
+    cast is fetched with one ordered range query over MovieActor joined to
+    Actor. Must be called inside a Flask application context.
+    """
+    from sqlalchemy import select
+    from models import db, Movie, MovieActor, Actor
+    
+    movie_stmt = select(
+        Movie.id, Movie.tmdb_id, Movie.title, Movie.description, Movie.release_year, Movie.genre, Movie.rating
+    ).order_by(Movie.id).execution_options(stream_results=True, yield_per=chunk_size)
+    
+    for movies in db.session.execute(movie_stmt).partitions():
+        cast_stmt = (
+            select(MovieActor.movie_id, Actor.name)
+            .join(Actor, Actor.id == MovieActor.actor_id)
+            .where(MovieActor.movie_id.between(movies[0].id, movies[-1].id))
+            .order_by(MovieActor.movie_id, MovieActor.cast_order)
         )
+        cast_by_movie: Dict[int, List[str]] = {}
+        for movie_id, name in db.session.execute(cast_stmt):
+            cast_by_movie.setdefault(movie_id, []).append(name)
+        yield _db_frame_chunk(movies, cast_by_movie)
+
+def load_data_from_db(chunk_size: int = DB_CHUNK_SIZE) -> DataFrame:
+    """Load the movie catalog from the database (see iter_db_movie_chunks)."""
+    chunks = list(iter_db_movie_chunks(chunk_size))
+    if not chunks:
+        raise DataLoadError("No movies found in the database")
+    return pd.concat(chunks, ignore_index=True)
+
+def db_fingerprint() -> str:
+    """Hash row counts, max ids and last update times of the tables the model reads."""
+    from sqlalchemy import select, func
+    from models import db, Movie, MovieActor
+    
+    movie_stats = db.session.execute(
+        select(func.count(Movie.id), func.max(Movie.id), func.max(Movie.updated_at))
+    ).one()
+    cast_stats = db.session.execute(
+        select(func.count(MovieActor.id), func.max(MovieActor.id), func.max(MovieActor.updated_at))
+    ).one()
+    return hashlib.sha256(repr((tuple(movie_stats), tuple(cast_stats))).encode('utf-8')).hexdigest()
+
+def _top_names(items: Any) -> List[str]:
+    """Names of the first three entries of a parsed cast/keywords/genres list."""
+    return [str(i.get("name", "")) for i in items[:3]] if isinstance(items, list) else []
+
+def _director(crew: Any) -> Any:
+    """Name of the first crew member whose job is Director, in a single pass."""
+    if isinstance(crew, list):
+        for member in crew:
+            if isinstance(member, dict) and member.get("job") == "Director":
+                return member["name"]
+    return ""
+
+def _parse_feature_chunk(chunk: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """
+    Parse one chunk of the JSON-ish feature columns down to the names the soup uses.
+    
+    Runs in worker processes, so only the small name lists travel back.
+    """
+    parsed = {
+        col: [_top_names(fast_literal_eval(x)) for x in chunk[col]]
+        for col in ('cast', 'keywords', 'genres')
+    }
+    parsed['director'] = [_director(fast_literal_eval(x)) for x in chunk['crew']]
+    return parsed
+
+def _parse_feature_columns(df: DataFrame, workers: int) -> Dict[str, List[Any]]:
+    """Parse the feature columns of ``df``, chunked across ``workers`` processes."""
+    columns = {
+        col: df[col].tolist() if col in df.columns else [None] * len(df)
+        for col in ('cast', 'crew', 'keywords', 'genres')
+    }
+    if workers <= 1:
+        return _parse_feature_chunk(columns)
+    
+    size = -(-len(df) // (workers * 4))
+    chunks = [
+        {col: values[start:start + size] for col, values in columns.items()}
+        for start in range(0, len(df), size)
+    ]
+    context = None
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    parsed: Dict[str, List[Any]] = {col: [] for col in ('cast', 'keywords', 'genres', 'director')}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        for result in executor.map(_parse_feature_chunk, chunks):
+            for col, values in result.items():
+                parsed[col].extend(values)
+    return parsed
+
+def _normalize_name_lists(names: Series) -> Series:
+    """Lowercase and de-space every name and join each row's names with spaces."""
+    # Names never contain NUL, so it can stand in for the separator while
+    # the whole column is normalised at once
+    joined = names.str.join("\x00")
+    return joined.str.lower().str.replace(" ", "", regex=False).str.replace("\x00", " ", regex=False)
+
+def _normalize_text(values: Series) -> Series:
+    """Lowercase and de-space a scalar text column; missing values become ''."""
+    text = values.astype(object).where(values.notna(), "").astype(str)
+    return text.str.lower().str.replace(" ", "", regex=False)
+
+def extract_features(df: DataFrame, workers: Optional[int] = None) -> DataFrame:
+    """
+    Extract and process features from the raw DataFrame.
+    
+    The JSON-ish columns are parsed with a JSON parser (orjson when
+    installed) and reduced to names in one pass; with ``workers > 1`` the
+    parsing is spread over a process pool (by default only for catalogs of
+    at least PARALLEL_FEATURE_ROWS movies). Frames from parse_data (no
+    ``crew``, a ``director`` column) skip parsing. Text normalisation is
+    done with vectorised ``.str`` operations. The parsed crew lists are not
+    kept.
+    """
+    if df.empty:
+        return df
+    
+    df = df.copy()
+    if 'crew' not in df.columns and 'director' in df.columns:
+        # Already reduced to names by parse_data
+        parsed = {col: df[col].tolist() for col in ('cast', 'keywords', 'genres', 'director')}
+    else:
+        if workers is None:
+            workers = FEATURE_WORKERS if len(df) >= PARALLEL_FEATURE_ROWS else 1
+        parsed = _parse_feature_columns(df, workers)
+        df = df.drop(columns=['crew'], errors='ignore')
+    
+    # Top cast members, keywords and genres, and the director
+    for col in ['cast', 'keywords', 'genres']:
+        df[col] = _normalize_name_lists(pd.Series(parsed[col], index=df.index, dtype=object))
+    df['director'] = _normalize_text(pd.Series(parsed['director'], index=df.index, dtype=object))
     
     # Clean text data
-    text_columns = ['cast', 'keywords', 'director', 'genres', 'overview', 'title']
-    for col in text_columns:
+    for col in ['overview', 'title']:
         if col in df.columns:
-            df[col] = df[col].apply(
-                lambda x: " ".join(str(i).lower().replace(" ", "") for i in x) 
-                if isinstance(x, list) 
-                else str(x).lower().replace(" ", "") if pd.notnull(x) 
-                else ""
-            )
+            df[col] = _normalize_text(df[col])
     
     return df
 
-def build_recommendation_model(df: DataFrame) -> Tuple[DataFrame, NDArray, Series]:
-    """Build the recommendation model with error handling."""
+def top_k_rows(rows: NDArray, k: int) -> Tuple[NDArray, NDArray]:
+    """
+    Select the ``k`` largest entries of every row of a 2-D score array.
+    
+    Uses ``np.partition`` to find each row's k-th score and a small sort of
+    the survivors instead of sorting whole rows. Ties are broken
+    deterministically in favour of the lower column index, both at the
+    k-th boundary and in the final order.
+    
+    Args:
+        rows: (B x N) array of scores
+        k: Number of entries to keep per row (at most N)
+        
+    Returns:
+        Tuple of (B x k) column indices and (B x k) scores, best first
+    """
+    n_rows, n_cols = rows.shape
+    if k <= 0:
+        return np.empty((n_rows, 0), dtype=np.int64), np.empty((n_rows, 0), dtype=rows.dtype)
+    
+    threshold = -np.partition(-rows, k - 1, axis=1)[:, k - 1:k]
+    keep = rows > threshold
+    ties = rows == threshold
+    # Number of boundary ties each row still needs, taken lowest index first
+    needed = k - keep.sum(axis=1)
+    ambiguous = np.flatnonzero(ties.sum(axis=1) > needed)
+    if len(ambiguous):
+        tie_rows, tie_cols = np.nonzero(ties[ambiguous])
+        rank = np.arange(len(tie_rows)) - np.searchsorted(tie_rows, tie_rows)
+        drop = rank >= needed[ambiguous][tie_rows]
+        ties[ambiguous[tie_rows[drop]], tie_cols[drop]] = False
+    keep |= ties
+    
+    columns = np.nonzero(keep)[1].reshape(n_rows, k)
+    values = np.take_along_axis(rows, columns, axis=1)
+    order = np.argsort(-values, axis=1, kind='stable')
+    return np.take_along_axis(columns, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+def normalize_features(count_matrix: Any) -> Any:
+    """
+    L2-normalise the rows of a sparse term-count matrix as float32 CSR.
+    
+    This is the only place model features are normalised: the similarity
+    builders below take its output and compute cosine scores as plain dot
+    products.
+    """
+    from sklearn.preprocessing import normalize
+    return normalize(count_matrix.astype(np.float32), norm='l2').tocsr()
+
+def build_topk_similarity(
+    features: Any,
+    top_k: int = TOP_K_NEIGHBORS,
+    block_cells: int = SIMILARITY_BLOCK_CELLS
+) -> TopKSimilarity:
+    """
+    Compute the top-K cosine neighbours of every row of a feature matrix.
+    
+    Rows are multiplied against the whole matrix one block at a time, so at
+    most ``block_cells`` dense scores exist at any moment and the full
+    N x N matrix is never materialised.
+    
+    Args:
+        features: L2-normalised (N x V) features, from normalize_features
+        top_k: Number of neighbours to keep per movie
+        block_cells: Upper bound on dense cells computed per block
+        
+    Returns:
+        TopKSimilarity with (N x K) int32 neighbours and float32 scores
+    """
+    features = features.tocsr()
+    features_t = features.T.tocsc()
+    n_rows = features.shape[0]
+    k = max(0, min(top_k, n_rows - 1))
+    block_rows = max(1, block_cells // max(n_rows, 1))
+    
+    neighbors = np.empty((n_rows, k), dtype=np.int32)
+    scores = np.empty((n_rows, k), dtype=np.float32)
+    if k == 0:
+        return TopKSimilarity(neighbors, scores)
+    
+    for start in range(0, n_rows, block_rows):
+        stop = min(start + block_rows, n_rows)
+        block = (features[start:stop] @ features_t).toarray()
+        rows = np.arange(stop - start)
+        # A movie is never its own neighbour
+        block[rows, rows + start] = -np.inf
+        neighbors[start:stop], scores[start:stop] = top_k_rows(block, k)
+    
+    return TopKSimilarity(neighbors, scores)
+
+def prepare_model_frame(df: DataFrame) -> DataFrame:
+    """Turn raw TMDB rows into model rows with detail columns and a feature soup."""
+    df = extract_features(add_detail_columns(df))
+    
+    # Create feature soup
+    df['soup'] = (
+        df['keywords'] + " " + 
+        df['cast'] + " " + 
+        df['director'] + " " + 
+        df['genres']
+    )
+    return df.reset_index(drop=True)
+
+def make_vectorizer(kind: str = VECTORIZER_KIND) -> Any:
+    """Create the (unfitted) vectorizer used to turn soups into term counts."""
+    from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+    if kind == 'count':
+        return CountVectorizer(stop_words="english")
+    if kind == 'hashing':
+        return HashingVectorizer(
+            stop_words="english", n_features=HASHING_FEATURES, alternate_sign=False, norm=None
+        )
+    raise ModelBuildError(f"Unknown vectorizer: {kind}")
+
+def title_indices(df: DataFrame) -> Series:
+    """Map model titles to their row indices."""
+    return pd.Series(df.index, index=df['title']).drop_duplicates()
+
+def movie_id_indices(df: DataFrame) -> Series:
+    """Map database Movie.id values to row indices (empty for models built from the CSVs)."""
+    if 'movie_id' not in df.columns:
+        return pd.Series([], dtype=np.int64)
+    ids = df['movie_id'].dropna().astype(np.int64)
+    return pd.Series(ids.index, index=ids.to_numpy())
+
+def _fit_model(
+    df: DataFrame,
+    mode: str,
+    top_k: int,
+    vectorizer_kind: str
+) -> Tuple[DataFrame, Union[NDArray, TopKSimilarity], Series, Any, Any]:
+    """Build every model component, including the fitted vectorizer and normalised features."""
+    if mode not in ('topk', 'dense'):
+        raise ModelBuildError(f"Unknown similarity mode: {mode}")
     if df.empty:
         raise ModelBuildError("Cannot build model with empty DataFrame")
     
     try:
         logger.info("Building recommendation model...")
-        df = extract_features(df)
-        
-        # Create feature soup
-        df['soup'] = (
-            df['keywords'] + " " + 
-            df['cast'] + " " + 
-            df['director'] + " " + 
-            df['genres']
-        )
+        df = prepare_model_frame(df)
         
         # Vectorize features
-        from sklearn.feature_extraction.text import CountVectorizer
-        count_vectorizer = CountVectorizer(stop_words="english")
-        count_matrix = count_vectorizer.fit_transform(df['soup'])
+        vectorizer = make_vectorizer(vectorizer_kind)
+        count_matrix = vectorizer.fit_transform(df['soup'])
+        features = normalize_features(count_matrix)
         
         # Calculate similarity
-        from sklearn.metrics.pairwise import cosine_similarity
-        cosine_sim = cosine_similarity(count_matrix, count_matrix)
+        if mode == 'topk':
+            cosine_sim = build_topk_similarity(features, top_k)
+        else:
+            from sklearn.metrics.pairwise import cosine_similarity
+            cosine_sim = cosine_similarity(count_matrix, count_matrix)
         
         # Create indices
-        df = df.reset_index(drop=True)
-        indices = pd.Series(df.index, index=df['title']).drop_duplicates()
+        indices = title_indices(df)
         
         logger.info("Successfully built recommendation model")
-        return df, cosine_sim, indices
+        return df, cosine_sim, indices, vectorizer, features
         
+    except ModelBuildError:
+        raise
     except Exception as e:
         raise ModelBuildError(f"Error building recommendation model: {str(e)}") from e
 
+def extend_topk_similarity(
+    similarity: TopKSimilarity,
+    features: Any,
+    n_new: int,
+    top_k: int = TOP_K_NEIGHBORS,
+    block_cells: int = SIMILARITY_BLOCK_CELLS
+) -> TopKSimilarity:
+    """
+    Add the last ``n_new`` rows of ``features`` to an existing top-K index.
+    
+    Only the similarities involving new movies are computed: each block of
+    new rows is scored against the whole catalog, which yields the new rows'
+    neighbour lists and, transposed, the new columns that are merged into
+    the neighbour lists of existing movies whose K-th score they beat.
+    
+    Args:
+        similarity: Index over the first ``N - n_new`` rows of ``features``
+        features: L2-normalised (N x V) features of the whole updated catalog,
+            from normalize_features
+        n_new: Number of movies appended at the end of ``features``
+        top_k: Number of neighbours to keep per movie
+        block_cells: Upper bound on dense cells computed per block
+        
+    Returns:
+        TopKSimilarity over all N movies
+    """
+    n_total = features.shape[0]
+    n_old = n_total - n_new
+    k = max(0, min(top_k, n_total - 1))
+    
+    # Widen the existing lists if the catalog used to be smaller than K
+    neighbors = np.full((n_total, k), -1, dtype=np.int32)
+    scores = np.full((n_total, k), -np.inf, dtype=np.float32)
+    neighbors[:n_old, :similarity.k] = similarity.neighbors[:, :k]
+    scores[:n_old, :similarity.k] = similarity.scores[:, :k]
+    if k == 0:
+        return TopKSimilarity(neighbors, scores)
+    
+    features_t = features.T.tocsc()
+    block_rows = max(1, block_cells // max(n_total, 1))
+    for start in range(n_old, n_total, block_rows):
+        stop = min(start + block_rows, n_total)
+        block = (features[start:stop] @ features_t).toarray()
+        rows = np.arange(stop - start)
+        block[rows, rows + start] = -np.inf
+        neighbors[start:stop], scores[start:stop] = top_k_rows(block, k)
+        
+        # Existing movies whose K-th neighbour is beaten by one of the new ones
+        new_columns = block[:, :n_old].T
+        affected = np.flatnonzero(new_columns.max(axis=1) > scores[:n_old, -1])
+        if len(affected):
+            candidates = np.hstack([
+                neighbors[affected],
+                np.broadcast_to(np.arange(start, stop, dtype=np.int32), (len(affected), stop - start))
+            ])
+            selected, merged = top_k_rows(np.hstack([scores[affected], new_columns[affected]]), k)
+            neighbors[affected] = np.take_along_axis(candidates, selected, axis=1)
+            scores[affected] = merged
+    
+    return TopKSimilarity(neighbors, scores)
+
+def build_recommendation_model(
+    df: DataFrame,
+    mode: str = SIMILARITY_MODE,
+    top_k: int = TOP_K_NEIGHBORS,
+    vectorizer_kind: str = VECTORIZER_KIND
+) -> Tuple[DataFrame, Union[NDArray, TopKSimilarity], Series]:
+    """
+    Build the recommendation model with error handling.
+    
+    In 'topk' mode the similarity is a TopKSimilarity index built block by
+    block from the sparse count matrix; in 'dense' mode it is the full cosine
+    similarity matrix.
+    """
+    return _fit_model(df, mode, top_k, vectorizer_kind)[:3]
+
+def _title_to_index(indices: Series, title: str) -> int:
+    """Resolve a title to its row index, using the first row for duplicate titles."""
+    idx = indices[title]
+    if isinstance(idx, Series):
+        idx = idx.iloc[0]
+    return int(idx)
+
+def get_similar_indices(
+    query_indices: Union[int, List[int], NDArray],
+    cosine_sim: Union[NDArray, TopKSimilarity],
+    limit: int = DEFAULT_LIMIT
+) -> Tuple[NDArray, NDArray]:
+    """
+    Find the most similar movies for one or many query rows at once.
+    
+    Each query movie is excluded by its index (not by assuming it sorts
+    first), so duplicate titles with a perfect score are still returned.
+    
+    Args:
+        query_indices: Row index or 1-D batch of row indices
+        cosine_sim: Dense similarity matrix or TopKSimilarity index
+        limit: Maximum number of neighbours per query
+        
+    Returns:
+        Tuple of (B x limit) neighbour indices and (B x limit) scores, best
+        first; fewer columns if the catalog or index holds fewer neighbours
+    """
+    queries = np.atleast_1d(np.asarray(query_indices, dtype=np.int64))
+    if isinstance(cosine_sim, TopKSimilarity):
+        return cosine_sim.neighbors[queries, :limit], cosine_sim.scores[queries, :limit]
+    
+    # Fancy indexing copies the rows, so the matrix itself is never modified
+    rows = cosine_sim[queries].astype(np.float64)
+    rows[np.arange(len(queries)), queries] = -np.inf
+    return top_k_rows(rows, min(limit, rows.shape[1] - 1))
+
+def _similar_movie_scores(
+    idx: int,
+    cosine_sim: Union[NDArray, TopKSimilarity],
+    limit: int
+) -> Tuple[List[int], List[float]]:
+    """Return the row indices and similarity scores of the movies closest to ``idx``."""
+    neighbors, scores = get_similar_indices(idx, cosine_sim, limit)
+    return neighbors[0].tolist(), scores[0].tolist()
+
 def get_similar_movies(
     title: str,
     df: DataFrame,
-    cosine_sim: NDArray,
+    cosine_sim: Union[NDArray, TopKSimilarity],
     indices: Series,
     limit: int = DEFAULT_LIMIT
 ) -> List[str]:
@@ -204,7 +886,7 @@ def get_similar_movies(
     Args:
         title: Title of the movie to find similar movies for
         df: DataFrame containing movie data
-        cosine_sim: Precomputed cosine similarity matrix
+        cosine_sim: Precomputed cosine similarity matrix or TopKSimilarity index
         indices: Series mapping movie titles to indices
         limit: Maximum number of recommendations to return (default: 10)
         
@@ -212,13 +894,8 @@ def get_similar_movies(
         List of similar movie titles
     """
     try:
-        idx = indices[title]
-        # Get similarity scores for all movies
-        sim_scores = list(enumerate(cosine_sim[idx]))
-        # Sort by similarity score in descending order, skip the first one (itself)
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)[1:limit+1]
-        # Get the movie indices
-        movie_indices = [i[0] for i in sim_scores]
+        idx = _title_to_index(indices, title)
+        movie_indices, _ = _similar_movie_scores(idx, cosine_sim, limit)
         # Return the movie titles
         return df['title'].iloc[movie_indices].tolist()
     except KeyError as e:
@@ -231,23 +908,114 @@ def get_similar_movies(
         logger.error(f"Unexpected error finding similar movies: {str(e)}")
         return []
 
-def find_best_match(query: str, titles: List[str]) -> Optional[Tuple[str, int]]:
+_NON_ALNUM = re.compile(r'[\W_]+')
+
+def normalize_title(title: str) -> str:
+    """Casefold a title and strip whitespace and punctuation ("The Dark Knight" -> "thedarkknight")."""
+    return _NON_ALNUM.sub('', str(title).casefold())
+
+def _trigrams(text: str) -> set:
+    """Character trigrams of a normalised title, padded so short titles still have some."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TitleIndex:
+    """
+    Prebuilt index for resolving free-text queries to catalog titles.
+    
+    Exact and normalised matches are answered from dicts. Anything else is
+    shortlisted through a character-trigram inverted index and only the
+    shortlist is scored with fuzzywuzzy, so a lookup no longer scores the
+    query against every title. Resolved queries are kept in an LRU cache.
+    """
+    
+    def __init__(self, titles: List[str], candidates: int = FUZZY_CANDIDATES, cache_size: int = TITLE_CACHE_SIZE):
+        self.titles = [str(t) for t in titles]
+        self.candidates = candidates
+        self.exact: Dict[str, str] = {}
+        self.normalized: Dict[str, str] = {}
+        postings: Dict[str, List[int]] = {}
+        self.trigram_counts = np.zeros(len(self.titles), dtype=np.int32)
+        
+        for i, title in enumerate(self.titles):
+            self.exact.setdefault(title, title)
+            key = normalize_title(title)
+            self.normalized.setdefault(key, title)
+            grams = _trigrams(key)
+            self.trigram_counts[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+    
+    def __len__(self) -> int:
+        return len(self.titles)
+    
+    def shortlist(self, query: str) -> List[str]:
+        """Titles with the highest trigram Jaccard overlap with the query, in catalog order."""
+        grams = _trigrams(normalize_title(query))
+        hits = [self.postings[g] for g in grams if g in self.postings]
+        if not hits:
+            return []
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.titles))
+        overlap = shared / (len(grams) + self.trigram_counts - shared)
+        
+        matched = np.flatnonzero(shared)
+        if len(matched) > self.candidates:
+            top = np.argpartition(-overlap[matched], self.candidates - 1)[:self.candidates]
+            matched = np.sort(matched[top])
+        return [self.titles[i] for i in matched]
+    
+    def _resolve(self, query: str) -> Optional[Tuple[str, int]]:
+        if query in self.exact:
+            return self.exact[query], 100
+        key = normalize_title(query)
+        if key in self.normalized:
+            return self.normalized[key], 100
+        
+        candidates = self.shortlist(query)
+        if not candidates:
+            return None
+        try:
+            from fuzzywuzzy import process
+        except ImportError:
+            logger.warning("fuzzywuzzy not available, using exact matching")
+            return None
+        result = process.extractOne(query, candidates)
+        return result if result and result[1] >= SIMILARITY_THRESHOLD else None
+
+def find_best_match(query: str, titles: Union[List[str], TitleIndex]) -> Optional[Tuple[str, int]]:
     """Find the best matching movie title using fuzzy matching."""
     try:
-        from fuzzywuzzy import process
-        result = process.extractOne(query, titles)
-        return result if result and result[1] >= SIMILARITY_THRESHOLD else None
-    except ImportError:
-        logger.warning("fuzzywuzzy not available, using exact matching")
-        return next((t, 100) for t in titles if query.lower() == t.lower())
+        index = titles if isinstance(titles, TitleIndex) else TitleIndex(titles, cache_size=0)
+        return index.resolve(query)
     except Exception as e:
         logger.error(f"Error in fuzzy matching: {str(e)}")
         return None
 
+_QUERY_WORDS = re.compile(r'[^\W_]+')
+
+def cache_query(title: str) -> str:
+    """
+    Normalise a query for the result cache ("The Dark-Knight!" -> "the dark knight").
+    
+    Unlike normalize_title this keeps word boundaries, which fuzzy scoring
+    takes into account; queries that differ only in case and punctuation
+    resolve to the same title.
+    """
+    return ' '.join(_QUERY_WORDS.findall(str(title).casefold()))
+
+# Results of get_movie_recommendations, keyed by (cache_query, limit, result_version)
+result_cache = make_result_cache(RESULT_CACHE_BACKEND, RESULT_CACHE_PATH, RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+
 def get_movie_recommendations(movie_title: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
     """
     Get movie recommendations based on a movie title.
     
+    Results are served from result_cache while the model version is
+    unchanged; concurrent requests for an uncached query compute it once.
+    
     Args:
         movie_title: Title of the movie to get recommendations for
         limit: Maximum number of recommendations to return (default: 10, max: 20)
@@ -270,57 +1038,580 @@ def get_movie_recommendations(movie_title: str, limit: int = DEFAULT_LIMIT) -> L
     limit = max(1, min(limit, MAX_RECOMMENDATIONS))
     
     try:
-        # Load data and models if not already loaded
-        if 'df' not in globals() or 'cosine_sim' not in globals() or 'indices' not in globals():
-            load_models()
-        
-        # Find the closest matching title
-        best_match, _ = find_best_match(movie_title, df['title'].tolist())
-        if not best_match:
-            logger.warning(f"No close match found for movie: {movie_title}")
-            return []
-        
-        # Get similar movies based on content
-        similar_movies = get_similar_movies(best_match, df, cosine_sim, indices, limit)
-        
-        # Get additional details for each recommended movie
-        recommendations = []
-        for title in similar_movies:
-            try:
-                movie_data = df[df['title'] == title].iloc[0]
-                recommendations.append({
-                    'title': title,
-                    'year': int(movie_data.get('release_year', 0)) if pd.notna(movie_data.get('release_year')) else 0,
-                    'genre': movie_data.get('genre', ''),
-                    'rating': float(movie_data.get('rating', 0)) if pd.notna(movie_data.get('rating')) else 0.0,
-                    'description': movie_data.get('description', 'No description available'),
-                    'similarity_score': float(cosine_sim[indices[title]][indices[best_match]])
-                })
-            except Exception as e:
-                logger.warning(f"Error processing movie '{title}': {str(e)}")
-                continue
-        
-        # Sort by similarity score in descending order
-        recommendations.sort(key=lambda x: x['similarity_score'], reverse=True)
-        
-        return recommendations
+        _ensure_model_loaded()
+        key = (cache_query(movie_title), limit, result_version)
+        recommendations = result_cache.get_or_compute(key, lambda: _recommend(movie_title, limit))
+        # Callers may modify what they get back; the cached entries must not change
+        return [dict(rec) for rec in recommendations]
         
     except Exception as e:
         logger.error(f"Error in get_movie_recommendations: {str(e)}")
         return []
 
-def load_models():
-    """Load or build the recommendation models."""
-    global df, cosine_sim, indices
+def _recommend(movie_title: str, limit: int) -> List[Dict[str, Any]]:
+    """Uncached get_movie_recommendations."""
+    result = get_batch_recommendations([movie_title], limit)[0]
+    if result['match'] is None:
+        logger.warning(f"No close match found for movie: {movie_title}")
+    return result['recommendations']
+
+def model_loaded() -> bool:
+    """Whether a model is installed (set_model assigns result_version last)."""
+    return result_version is not None
+
+# Serialises model loads, so concurrent first requests build the model once
+_load_lock = threading.Lock()
+
+def _ensure_model_loaded() -> None:
+    """Load data and models if not already loaded."""
+    if not model_loaded():
+        with _load_lock:
+            if not model_loaded():
+                load_models()
+
+def get_recommendations_for_movie(movie_id: int, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Get recommendations for a database movie by its Movie.id.
+    
+    Only available for models built with the 'db' source; returns an empty
+    list if the movie isn't part of the model.
+    """
+    limit = max(1, min(limit, MAX_RECOMMENDATIONS))
+    try:
+        _ensure_model_loaded()
+        if movie_id not in id_index.index:
+            logger.warning(f"Movie id {movie_id} not found in the recommendation model")
+            return []
+        neighbors, scores = get_similar_indices(int(id_index[movie_id]), cosine_sim, limit)
+        return records.to_dicts(neighbors[0].tolist(), scores[0].tolist())
+    except Exception as e:
+        logger.error(f"Error in get_recommendations_for_movie: {str(e)}")
+        return []
+
+def hydrate_recommendations(recommendations: List[Dict[str, Any]], id_column: str = 'id') -> List[Any]:
+    """
+    Load the Movie rows for recommendations with one IN query.
+    
+    Returns the movies in recommendation order, skipping entries without an
+    id or whose movie no longer exists. Must be called inside a Flask
+    application context.
+    
+    Args:
+        recommendations: Recommendation dicts
+        id_column: Movie column to match them on, read from the dict key of
+            the same name: 'id' for models built from the database,
+            'tmdb_id' for models built from the CSVs
+    """
+    from models import Movie
+    
+    ids = [rec[id_column] for rec in recommendations if rec.get(id_column) is not None]
+    if not ids:
+        return []
+    column = getattr(Movie, id_column)
+    movies = {getattr(movie, id_column): movie for movie in Movie.query.filter(column.in_(ids))}
+    return [movies[movie_id] for movie_id in ids if movie_id in movies]
+
+def get_batch_recommendations(movie_titles: List[str], limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Get recommendations for many titles with one vectorised neighbour lookup.
+    
+    Args:
+        movie_titles: Titles to get recommendations for
+        limit: Maximum number of recommendations per title (default: 10, max: 20)
+        
+    Returns:
+        One dict per input title, in input order:
+        {'query': str, 'match': Optional[str], 'recommendations': [...]}
+        where ``recommendations`` has the same shape as in
+        get_movie_recommendations and ``match`` is None if no title matched.
+    """
+    limit = max(1, min(limit, MAX_RECOMMENDATIONS))
+    _ensure_model_loaded()
+    
+    matches = [find_best_match(title, title_index) for title in movie_titles]
+    rows = [_title_to_index(indices, match[0]) for match in matches if match]
+    if rows:
+        neighbors, scores = get_similar_indices(rows, cosine_sim, limit)
+    
+    results = []
+    matched = 0
+    for title, match in zip(movie_titles, matches):
+        if not match:
+            results.append({'query': title, 'match': None, 'recommendations': []})
+            continue
+        results.append({
+            'query': title,
+            'match': records.title[rows[matched]],
+            'recommendations': records.to_dicts(neighbors[matched].tolist(), scores[matched].tolist())
+        })
+        matched += 1
+    return results
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def stream_batch_recommendations(
+    movie_titles: Iterable[str],
+    limit: int = DEFAULT_LIMIT,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+    workers: int = 1
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream batch recommendations for an arbitrarily long iterable of titles.
+    
+    Titles are processed ``chunk_size`` at a time. With ``workers > 1`` the
+    chunks are spread over a process pool. The model is loaded before the
+    pool starts, so forked workers share its memory-mapped arrays and
+    spawned workers map the same artifact files. At most two chunks per
+    worker are in flight and results are yielded in input order.
+    """
+    chunks = _chunked(movie_titles, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from get_batch_recommendations(chunk, limit)
+        return
+    
+    _ensure_model_loaded()
+    context = None
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(get_batch_recommendations, chunk, limit))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def run_batch(
+    input_path: str,
+    output_path: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+    workers: int = 1
+) -> Tuple[int, float]:
+    """
+    Recommend for every title in a file (one per line, '-' for stdin) and write JSONL.
+    
+    Returns:
+        Tuple of (number of titles processed, elapsed seconds)
+    """
+    source = sys.stdin if input_path == '-' else open(input_path, encoding='utf-8')
+    sink = open(output_path, 'w', encoding='utf-8') if output_path else sys.stdout
+    try:
+        titles = (line.strip() for line in source if line.strip())
+        start = time.perf_counter()
+        count = 0
+        for result in stream_batch_recommendations(titles, limit, chunk_size, workers):
+            sink.write(json.dumps(result) + "\n")
+            count += 1
+        return count, time.perf_counter() - start
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+def source_fingerprint(paths: List[str]) -> str:
+    """Hash the contents of the source files a model is built from."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+def _artifact_key(source_hash: str, mode: str, top_k: int, vectorizer_kind: str) -> str:
+    """Key an artifact by its sources and every setting that changes its contents."""
+    key = f"{ARTIFACT_FORMAT_VERSION}:{source_hash}:{mode}:{top_k}:{vectorizer_kind}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+@contextmanager
+def _artifact_lock(artifact_dir: str):
+    """Serialise artifact builds across processes (no-op where fcntl is unavailable)."""
+    os.makedirs(artifact_dir, exist_ok=True)
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(os.path.join(artifact_dir, '.build.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def save_model_artifact(
+    path: str,
+    df: DataFrame,
+    cosine_sim: Union[NDArray, TopKSimilarity],
+    indices: Series,
+    manifest: Dict[str, Any],
+    vectorizer: Any = None,
+    features: Any = None
+) -> None:
+    """
+    Write a model to ``path`` as a frame pickle, .npy arrays and a manifest.
+    
+    The fitted vectorizer and normalised feature matrix are stored as well
+    when given, so the model can later be updated incrementally. The files
+    are written to a temporary sibling directory that is renamed into place
+    (replacing any previous artifact at ``path``), so readers never observe
+    a half-written artifact.
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=parent)
     try:
-        data = load_data()
+        # The parsed crew lists are only needed to extract the director
+        df.drop(columns=['crew'], errors='ignore').to_pickle(os.path.join(tmp_dir, 'frame.pkl'))
+        indices.to_pickle(os.path.join(tmp_dir, 'indices.pkl'))
+        if isinstance(cosine_sim, TopKSimilarity):
+            np.save(os.path.join(tmp_dir, 'neighbors.npy'), cosine_sim.neighbors)
+            np.save(os.path.join(tmp_dir, 'scores.npy'), cosine_sim.scores)
+        else:
+            np.save(os.path.join(tmp_dir, 'cosine_sim.npy'), cosine_sim)
+        if vectorizer is not None and features is not None:
+            pd.to_pickle(vectorizer, os.path.join(tmp_dir, 'vectorizer.pkl'))
+            from scipy import sparse
+            sparse.save_npz(os.path.join(tmp_dir, 'features.npz'), features)
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        
+        if os.path.exists(path):
+            old_dir = tempfile.mkdtemp(prefix='.old-', dir=parent)
+            os.rename(path, os.path.join(old_dir, 'artifact'))
+            os.rename(tmp_dir, path)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        else:
+            os.rename(tmp_dir, path)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+def load_model_artifact(
+    path: str,
+    mmap: bool = True
+) -> Tuple[DataFrame, Union[NDArray, TopKSimilarity], Series, Dict[str, Any]]:
+    """
+    Open a model artifact written by save_model_artifact.
+    
+    With ``mmap`` the similarity arrays are memory-mapped read-only, so every
+    worker process shares the same pages through the OS page cache.
+    """
+    mmap_mode = 'r' if mmap else None
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    df = pd.read_pickle(os.path.join(path, 'frame.pkl'))
+    indices = pd.read_pickle(os.path.join(path, 'indices.pkl'))
+    if manifest['mode'] == 'topk':
+        cosine_sim = TopKSimilarity(
+            np.load(os.path.join(path, 'neighbors.npy'), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, 'scores.npy'), mmap_mode=mmap_mode)
+        )
+    else:
+        cosine_sim = np.load(os.path.join(path, 'cosine_sim.npy'), mmap_mode=mmap_mode)
+    return df, cosine_sim, indices, manifest
+
+def load_model_features(path: str) -> Tuple[Any, Any]:
+    """Load the fitted vectorizer and normalised feature matrix stored with an artifact."""
+    from scipy import sparse
+    vectorizer_path = os.path.join(path, 'vectorizer.pkl')
+    if not os.path.exists(vectorizer_path):
+        raise ModelBuildError(f"Artifact at {path} has no stored features; rebuild it")
+    vectorizer = pd.read_pickle(vectorizer_path)
+    features = sparse.load_npz(os.path.join(path, 'features.npz')).tocsr()
+    return vectorizer, features
+
+def build_model_artifact(
+    artifact_dir: str = MODEL_ARTIFACT_DIR,
+    credits_path: str = CREDITS_CSV,
+    movies_path: str = MOVIES_CSV,
+    mode: str = SIMILARITY_MODE,
+    top_k: int = TOP_K_NEIGHBORS,
+    force: bool = False,
+    vectorizer_kind: str = VECTORIZER_KIND,
+    source: str = RECOMMENDATION_SOURCE
+) -> str:
+    """
+    Make sure an up-to-date model artifact exists and return its path.
+    
+    The artifact is keyed by a hash of the source data (the CSV contents, or
+    the database table fingerprint for ``source='db'``) and the model
+    settings; it is only rebuilt when that key changes (or when ``force``
+    is set). Artifacts for older keys are removed once the new one is in
+    place. Incremental updates (see update_model) are kept until then; a
+    database-sourced artifact changes key with every catalog change, so it
+    is always rebuilt instead.
+    """
+    if source == 'db':
+        source_hash = 'db:' + db_fingerprint()
+    elif source == 'csv':
+        for source_path in (credits_path, movies_path):
+            if not os.path.exists(source_path):
+                raise DataLoadError(f"File not found: {source_path}")
+        source_hash = source_fingerprint([credits_path, movies_path])
+    else:
+        raise DataLoadError(f"Unknown recommendation source: {source}")
+    key = _artifact_key(source_hash, mode, top_k, vectorizer_kind)
+    path = os.path.join(artifact_dir, key)
+    
+    with _artifact_lock(artifact_dir):
+        if os.path.exists(os.path.join(path, 'manifest.json')) and not force:
+            return path
+        
+        logger.info(f"Building model artifact {key} in {artifact_dir}")
+        data = load_data_from_db() if source == 'db' else load_parsed_data(credits_path, movies_path)
         if data.empty:
             raise DataLoadError("No movie data available")
-        df, cosine_sim, indices = build_recommendation_model(data)
+        model_df, model_sim, model_indices, vectorizer, features = _fit_model(
+            data, mode, top_k, vectorizer_kind
+        )
+        
+        save_model_artifact(path, model_df, model_sim, model_indices, {
+            'format': ARTIFACT_FORMAT_VERSION,
+            'version': key,
+            'revision': 0,
+            'source_hash': source_hash,
+            'mode': mode,
+            'top_k': top_k,
+            'vectorizer': vectorizer_kind,
+            'source': source,
+            'n_movies': len(model_df),
+            'built_at': datetime.utcnow().isoformat()
+        }, vectorizer, features)
+        
+        for entry in os.listdir(artifact_dir):
+            stale = os.path.join(artifact_dir, entry)
+            if entry != key and not entry.startswith('.') and os.path.isdir(stale):
+                shutil.rmtree(stale, ignore_errors=True)
+    
+    return path
+
+def update_model(
+    new_data: DataFrame,
+    artifact_dir: str = MODEL_ARTIFACT_DIR,
+    credits_path: str = CREDITS_CSV,
+    movies_path: str = MOVIES_CSV,
+    mode: str = SIMILARITY_MODE,
+    top_k: int = TOP_K_NEIGHBORS,
+    vectorizer_kind: str = VECTORIZER_KIND,
+    source: str = RECOMMENDATION_SOURCE
+) -> str:
+    """
+    Add movies to the persisted model without refitting it.
+    
+    New rows are vectorised with the artifact's fitted vectorizer (with the
+    'count' vectorizer, terms outside its vocabulary are ignored; the
+    'hashing' vectorizer keeps them), only their similarity rows and columns
+    are computed, and the result is saved as the next revision of the
+    artifact with a bumped model version. Movies whose ``id`` is already in
+    the model are skipped. A full rebuild only happens when the source CSVs
+    change or ``build_model_artifact(force=True)`` is called.
+    
+    Only CSV-sourced models can be updated: database-sourced artifacts are
+    keyed on the table fingerprint, so they are always rebuilt after the
+    catalog changes.
+    
+    Args:
+        new_data: Raw TMDB-shaped rows, as returned by load_data
+        
+    Returns:
+        Path of the updated artifact
+        
+    Raises:
+        ModelBuildError: For ``source='db'``
+    """
+    from scipy import sparse
+    
+    if source != 'csv':
+        raise ModelBuildError("Incremental updates are only supported for CSV-sourced models")
+    
+    path = build_model_artifact(
+        artifact_dir, credits_path, movies_path, mode, top_k,
+        vectorizer_kind=vectorizer_kind, source=source
+    )
+    with _artifact_lock(artifact_dir):
+        old_df, old_sim, _, manifest = load_model_artifact(path, mmap=False)
+        if manifest['mode'] != 'topk':
+            raise ModelBuildError("Incremental updates require the 'topk' similarity mode")
+        vectorizer, features = load_model_features(path)
+        
+        if 'id' in new_data.columns and 'id' in old_df.columns:
+            new_data = new_data[~new_data['id'].isin(old_df['id'])]
+        if new_data.empty:
+            logger.info("No new movies to add to the model")
+            return path
+        
+        new_df = prepare_model_frame(new_data).drop(columns=['crew'], errors='ignore')
+        new_features = normalize_features(vectorizer.transform(new_df['soup']))
+        all_features = sparse.vstack([features, new_features]).tocsr()
+        similarity = extend_topk_similarity(old_sim, all_features, len(new_df), manifest['top_k'])
+        model_df = pd.concat([old_df, new_df], ignore_index=True)
+        
+        revision = manifest.get('revision', 0) + 1
+        manifest.update({
+            'version': f"{os.path.basename(path)}-r{revision}",
+            'revision': revision,
+            'n_movies': len(model_df),
+            'updated_at': datetime.utcnow().isoformat()
+        })
+        save_model_artifact(path, model_df, similarity, title_indices(model_df), manifest, vectorizer, all_features)
+        logger.info(f"Added {len(new_df)} movies to the model (version {manifest['version']})")
+    
+    if 'df' in globals():
+        set_model(*load_model_artifact(path)[:3], manifest['version'])
+    return path
+
+# Version key of the artifact the loaded model came from (None if built in memory)
+model_version: Optional[str] = None
+# Model version in result cache keys; models built in memory get a unique one
+result_version: Optional[str] = None
+
+def set_model(
+    model_df: DataFrame,
+    model_sim: Union[NDArray, TopKSimilarity],
+    model_indices: Series,
+    version: Optional[str] = None
+) -> None:
+    """
+    Install a model as the module's active model, building its lookup structures.
+    
+    Cached results of any other model version are dropped.
+    """
+    global df, cosine_sim, indices, records, title_index, id_index, model_version, result_version
+    df, cosine_sim, indices = model_df, model_sim, model_indices
+    records = build_record_table(model_df)
+    id_index = movie_id_indices(model_df)
+    title_index = TitleIndex(model_df['title'])
+    model_version = version
+    cache_version = version or f"memory-{uuid.uuid4().hex[:12]}"
+    result_cache.retain(cache_version)
+    result_version = cache_version
+
+def load_models():
+    """
+    Load the recommendation models from the persisted artifact.
+    
+    The artifact is (re)built first if the source CSVs changed; if it can't
+    be written at all the model is built in memory instead.
+    """
+    try:
+        try:
+            path = build_model_artifact(source=RECOMMENDATION_SOURCE)
+        except OSError as e:
+            logger.warning(f"Model artifact unavailable, building in memory: {str(e)}")
+            data = load_data_from_db() if RECOMMENDATION_SOURCE == 'db' else load_parsed_data()
+            if data.empty:
+                raise DataLoadError("No movie data available")
+            set_model(*build_recommendation_model(data))
+            return
+        model_df, model_sim, model_indices, manifest = load_model_artifact(path)
+        set_model(model_df, model_sim, model_indices, manifest['version'])
+        logger.info(f"Loaded recommendation model {model_version} ({manifest['n_movies']} movies)")
     except Exception as e:
         logger.error(f"Error loading models: {str(e)}")
         raise
 
+class ModelManager:
+    """
+    Loads the recommendation model in a background thread.
+    
+    The server entry points start the load up front, and any other host
+    starts it with the first request that asks for the model
+    (start_if_idle); requests get a fallback until the model is ready,
+    rather than building it inside the request. A child forked while a load
+    is running (``gunicorn --preload``) doesn't inherit the loading thread,
+    so it goes back to idle and loads the model itself.
+    """
+    
+    def __init__(self):
+        self.state = 'idle'  # idle -> loading -> ready or failed
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        if self.state == 'loading':
+            self.state, self._thread = 'idle', None
+    
+    @property
+    def ready(self) -> bool:
+        return model_loaded()
+    
+    def start(self, context: Any = None) -> bool:
+        """
+        Start loading the model unless it is loaded or a load is running.
+        
+        Args:
+            context: Callable returning a context manager to load the model
+                in, such as ``app.app_context`` (needed for the 'db' source)
+            
+        Returns:
+            True if a load was started
+        """
+        with self._lock:
+            if self.state == 'loading' or self.ready:
+                return False
+            self.state, self.error = 'loading', None
+            self._thread = threading.Thread(
+                target=self._load, args=(context,), name='recommendation-model', daemon=True
+            )
+            self._thread.start()
+        return True
+    
+    def start_if_idle(self, context: Any = None) -> bool:
+        """Start loading the model if no load has been started in this process (see start)."""
+        if self.state != 'idle' or self.ready:
+            return False
+        return self.start(context)
+    
+    def _load(self, context: Any) -> None:
+        start = time.perf_counter()
+        try:
+            with context() if context is not None else nullcontext():
+                _ensure_model_loaded()
+        except Exception as e:
+            logger.error(f"Recommendation model failed to load: {str(e)}")
+            self.error, self.state = str(e), 'failed'
+        else:
+            self.load_seconds = time.perf_counter() - start
+            self.state = 'ready'
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a running load to finish; returns whether the model is ready."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.ready
+    
+    def status(self) -> Dict[str, Any]:
+        """Readiness of the model, its version and the result cache counters."""
+        return {
+            'ready': self.ready,
+            'state': 'ready' if self.ready else self.state,
+            'model_version': model_version,
+            'error': self.error,
+            'load_seconds': self.load_seconds,
+            'cache': result_cache.stats()
+        }
+
+model_manager = ModelManager()
+if hasattr(os, 'register_at_fork'):  # Not on Windows
+    os.register_at_fork(after_in_child=model_manager._after_fork)
+
 # Example usage
 if __name__ == "__main__":
     import argparse
@@ -329,10 +1620,49 @@ if __name__ == "__main__":
     parser.add_argument("--movie", type=str, help="Movie title to get recommendations for")
     parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, 
                        help=f"Number of recommendations (1-{MAX_RECOMMENDATIONS})")
+    parser.add_argument("--source", choices=["csv", "db"], default=RECOMMENDATION_SOURCE,
+                       help="Build the model from the TMDB CSVs or from the application database")
+    parser.add_argument("--build-model", action="store_true",
+                       help="Build the persisted model artifact and exit")
+    parser.add_argument("--force", action="store_true",
+                       help="With --build-model, rebuild even if the artifact is current")
+    parser.add_argument("--add-movies", type=str, metavar="MOVIES_CSV",
+                       help="Add the movies in a TMDB movies CSV to the model incrementally")
+    parser.add_argument("--add-credits", type=str, metavar="CREDITS_CSV",
+                       help="TMDB credits CSV matching --add-movies")
+    parser.add_argument("--batch", type=str, metavar="FILE",
+                       help="File of movie titles, one per line ('-' for stdin); writes JSONL results")
+    parser.add_argument("--output", type=str, metavar="FILE",
+                       help="With --batch, write results to FILE instead of stdout")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="With --batch, number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE,
+                       help="With --batch, titles per vectorised chunk")
     args = parser.parse_args()
     
+    RECOMMENDATION_SOURCE = args.source
+    if args.source == 'db':
+        # Database access needs an application context
+        from app import app
+        app.app_context().push()
+    
     try:
-        if args.movie:
+        if args.build_model:
+            path = build_model_artifact(force=args.force, source=args.source)
+            print(f"Model artifact ready at {path}")
+        elif args.add_movies:
+            if not args.add_credits:
+                parser.error("--add-movies requires --add-credits")
+            if args.source == 'db':
+                parser.error("--add-movies only updates CSV-sourced models; "
+                             "database models are rebuilt with --build-model")
+            path = update_model(load_data(args.add_credits, args.add_movies), source=args.source)
+            print(f"Model artifact updated at {path}")
+        elif args.batch:
+            count, elapsed = run_batch(args.batch, args.output, args.limit, args.chunk_size, args.workers)
+            rate = count / elapsed if elapsed > 0 else float('inf')
+            print(f"Processed {count} titles in {elapsed:.2f}s ({rate:.1f} titles/s)", file=sys.stderr)
+        elif args.movie:
             recs = get_movie_recommendations(args.movie, args.limit)
             print(f"\nRecommendations for '{args.movie}':")
             for i, rec in enumerate(recs, 1):
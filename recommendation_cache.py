@@ -0,0 +1,308 @@
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the result cache in front of get_movie_recommendations
+RESULT_CACHE_SIZE = 2048  # Entries kept by the in-process cache
+RESULT_CACHE_TTL = 3600.0  # Seconds a cached result is served
+SHARED_CACHE_PRUNE_EVERY = 256  # Writes between size/expiry sweeps of the SQLite cache
+
+# (normalized query, limit, model version)
+CacheKey = Tuple[str, int, str]
+
+class MemoryCache:
+    """
+    In-process LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Entries are kept in an OrderedDict in least- to most-recently-used
+    order, so a hit is a move-to-end and an eviction pops the front.
+    """
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: 'OrderedDict[CacheKey, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """The cached value of ``key``, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: CacheKey, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def retain(self, version: str) -> None:
+        """Drop the entries of every model version but ``version``."""
+        with self._lock:
+            for key in [key for key in self._entries if key[2] != version]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class SQLiteCache:
+    """
+    Result cache in a local SQLite file, shared by every process that opens it.
+
+    Values are stored as JSON. Entries expire after ``ttl`` seconds; every
+    SHARED_CACHE_PRUNE_EVERY writes, expired entries are deleted and the
+    oldest ones beyond ``maxsize`` are evicted. Entries of old model
+    versions are kept until they expire, since other processes may still be
+    serving that version; retain() then drops them. Hits don't write, so
+    readers in different processes never contend for the file's write lock.
+    Database errors are logged and treated as misses: the cache must never
+    fail a recommendation.
+    """
+
+    def __init__(self, path: str, maxsize: int = 10 * RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = itertools.count(1)  # next() is atomic across threads
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS recommendation_cache ("
+            "key TEXT PRIMARY KEY, version TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        # Expiry sweeps and evictions walk entries by expiry time
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_recommendation_cache_expires ON recommendation_cache (expires_at)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        This thread's connection.
+
+        sqlite3 connections can't be shared across threads, nor used in a
+        process forked after they were opened.
+        """
+        pid, conn = getattr(self._local, 'conn', (None, None))
+        if pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = (os.getpid(), conn)
+        return conn
+
+    @staticmethod
+    def _key(key: CacheKey) -> str:
+        return json.dumps(key, separators=(',', ':'))
+
+    def __len__(self) -> int:
+        try:
+            return self._connection().execute("SELECT count(*) FROM recommendation_cache").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"Recommendation cache count failed: {str(e)}")
+            return 0
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM recommendation_cache WHERE key = ? AND expires_at > ?",
+                (self._key(key), time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Recommendation cache read failed: {str(e)}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: CacheKey, value: Any) -> None:
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO recommendation_cache (key, version, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self._key(key), key[2], json.dumps(value), time.time() + self.ttl)
+            )
+            if next(self._writes) % SHARED_CACHE_PRUNE_EVERY == 0:
+                self._prune(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Recommendation cache write failed: {str(e)}")
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM recommendation_cache WHERE expires_at <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM recommendation_cache WHERE key IN ("
+            "SELECT key FROM recommendation_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,)
+        )
+
+    def retain(self, version: str) -> None:
+        """
+        Drop the expired entries of every model version but ``version``.
+
+        Unexpired ones are kept: the file is shared with processes that may
+        not have switched to ``version`` yet.
+        """
+        try:
+            self._connection().execute(
+                "DELETE FROM recommendation_cache WHERE version != ? AND expires_at <= ?", (version, time.time())
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Recommendation cache cleanup failed: {str(e)}")
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM recommendation_cache")
+
+class _Flight:
+    """A computation in progress that concurrent misses of the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+class RecommendationCache:
+    """
+    Read-through cache of recommendation results with stampede protection.
+
+    Entries live in a pluggable backend (MemoryCache or SQLiteCache, or
+    anything with their get/set/retain/clear methods). Keys carry the model
+    version, so a new model never serves results of the old one; retain()
+    additionally frees the old entries (at once in memory, once expired in
+    the shared file). Concurrent misses for one key in a process compute it
+    once: the first caller computes, the others wait for its result (or its
+    exception).
+    """
+
+    def __init__(self, backend: Any = None):
+        self.backend = backend if backend is not None else MemoryCache()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # Misses answered by another thread's computation
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: CacheKey, compute: Callable[[], Any]) -> Any:
+        """
+        The cached value of ``key``, computing and storing it on a miss.
+
+        Args:
+            key: (normalized query, limit, model version)
+            compute: Called without arguments to produce the value on a miss;
+                its exceptions propagate and nothing is cached
+
+        Returns:
+            The cached or newly computed value (never None)
+        """
+        value = self.backend.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            with self._lock:
+                self.coalesced += 1
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            # Another flight may have finished between the lookup and now
+            value = self.backend.get(key)
+            if value is None:
+                with self._lock:
+                    self.misses += 1
+                value = compute()
+                self.backend.set(key, value)
+            else:
+                with self._lock:
+                    self.hits += 1
+            flight.value = value
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def retain(self, version: str) -> None:
+        """Drop cached results of every model version but ``version``."""
+        self.backend.retain(version)
+
+    def clear(self) -> None:
+        """Drop every cached result and reset the counters."""
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = self.coalesced = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this process and the backend's size."""
+        with self._lock:
+            hits, misses, coalesced = self.hits, self.misses, self.coalesced
+        lookups = hits + misses + coalesced
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'hits': hits,
+            'misses': misses,
+            'coalesced': coalesced,
+            'hit_rate': (hits + coalesced) / lookups if lookups else 0.0,
+        }
+
+def make_result_cache(backend: str = 'memory', path: Optional[str] = None,
+                      maxsize: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL) -> RecommendationCache:
+    """
+    Build the result cache for a backend name.
+
+    Args:
+        backend: 'memory' (in-process LRU), 'sqlite' (shared file at
+            ``path``) or 'none' (no caching, but still coalesces concurrent
+            misses)
+        path: SQLite file of the 'sqlite' backend
+
+    If the SQLite file can't be opened, the in-process cache is used instead.
+
+    Raises:
+        ValueError: For an unknown backend, or 'sqlite' without a path
+    """
+    if backend == 'memory':
+        return RecommendationCache(MemoryCache(maxsize, ttl))
+    if backend == 'sqlite':
+        if not path:
+            raise ValueError("The sqlite recommendation cache needs a path")
+        try:
+            return RecommendationCache(SQLiteCache(path, ttl=ttl))
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Shared recommendation cache unavailable, using memory: {str(e)}")
+            return RecommendationCache(MemoryCache(maxsize, ttl))
+    if backend == 'none':
+        return RecommendationCache(MemoryCache(0, ttl))
+    raise ValueError(f"Unknown recommendation cache backend: {backend}")
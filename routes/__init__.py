@@ -5,12 +5,16 @@ def init_app(app):
     from .main_routes import main_routes
     from .api_routes import api_routes
     from .search_routes import search_routes
+    from .recommendation_routes import recommendation_routes
+    from .media_routes import media_routes
     
     # List of all blueprints
     blueprints = [
         main_routes,
         api_routes,
         search_routes,
+        recommendation_routes,
+        media_routes,
         # Add other blueprints here
     ]
     
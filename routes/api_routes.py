@@ -1,10 +1,71 @@
 from flask import Blueprint, jsonify, request
-from models import Movie, db
+from models import Movie, MovieActor, db
 from sqlalchemy import desc, or_
+from sqlalchemy.orm import selectinload
+from utils.movie_queries import genre_movies_page, normalize_sort, InvalidCursor, PAGE_SIZE, MAX_PAGE_SIZE
+from utils.movie_suggest import suggest, SUGGESTION_LIMIT
+from .media_routes import image_src
 
 # Create a Blueprint for API routes
 api_routes = Blueprint('api', __name__, url_prefix='/api')
 
+@api_routes.route('/genres/<path:genre>/movies', methods=['GET'])
+def get_genre_movies(genre):
+    """One page of a genre's movies; pass ``next_cursor`` back as ``cursor`` for the next."""
+    try:
+        sort = normalize_sort(request.args.get('sort'))
+        limit = max(1, min(request.args.get('limit', PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+        movies, next_cursor = genre_movies_page(genre, sort, request.args.get('cursor'), limit)
+        
+        return jsonify({
+            'success': True,
+            'genre': genre,
+            'sort': sort,
+            'results': [{
+                'id': movie.id,
+                'title': movie.title,
+                'poster_url': movie.poster_url,
+                'poster_src': image_src(movie),
+                'release_year': movie.release_year,
+                'rating': movie.rating
+            } for movie in movies],
+            'count': len(movies),
+            'next_cursor': next_cursor
+        })
+        
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_routes.route('/movies/suggest', methods=['GET'])
+def suggest_movies():
+    """Typeahead suggestions (movie titles and actors) for a partially typed query."""
+    try:
+        query = request.args.get('q', '').strip()
+        limit = max(1, min(request.args.get('limit', SUGGESTION_LIMIT, type=int), SUGGESTION_LIMIT))
+        suggestions = suggest(query, limit)
+        
+        return jsonify({
+            'success': True,
+            'query': query,
+            'results': suggestions['movies'],
+            'actors': suggestions['actors'],
+            'count': len(suggestions['movies'])
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @api_routes.route('/movies/popular', methods=['GET'])
 def get_popular_movies():
     try:
@@ -23,7 +84,9 @@ def get_popular_movies():
             'genre': movie.genre,
             'rating': movie.rating,
             'poster_url': movie.poster_url,
+            'poster_src': image_src(movie),
             'banner_url': movie.banner_url,
+            'banner_src': image_src(movie, 'banner'),
             'trailer_url': movie.trailer_url
         } for movie in popular_movies]
         
@@ -42,20 +105,16 @@ def get_popular_movies():
 @api_routes.route('/movies/<int:movie_id>', methods=['GET'])
 def get_movie(movie_id):
     try:
-        # Query the movie with a join to the actors table
-        from sqlalchemy.orm import joinedload
-        from sqlalchemy import and_
-        from models import Movie, Actor  # Import the models
-        
-        # Get the requested movie
-        movie = Movie.query.options(joinedload(Movie.actors)).get_or_404(movie_id)
+        # Load the movie, then its credits and their actors in one more
+        # query, already in billing order (Movie.actors is ordered by cast_order)
+        movie = Movie.query.options(
+            selectinload(Movie.actors).joinedload(MovieActor.actor)
+        ).get_or_404(movie_id)
         
         # Get 4 similar movies (same genre, excluding the current movie)
         similar_movies = Movie.query.filter(
-            and_(
-                Movie.genre == movie.genre,
-                Movie.id != movie.id
-            )
+            Movie.genre == movie.genre,
+            Movie.id != movie.id
         ).order_by(Movie.rating.desc()).limit(4).all()
         
         # Format similar movies data
@@ -63,6 +122,7 @@ def get_movie(movie_id):
             'id': m.id,
             'title': m.title,
             'poster_url': m.poster_url,
+            'poster_src': image_src(m),
             'rating': m.rating,
             'release_year': m.release_year
         } for m in similar_movies]
@@ -77,15 +137,19 @@ def get_movie(movie_id):
                 'genre': movie.genre,
                 'rating': movie.rating,
                 'poster_url': movie.poster_url,
+                'poster_src': image_src(movie),
                 'banner_url': movie.banner_url,
+                'banner_src': image_src(movie, 'banner'),
                 'trailer_url': getattr(movie, 'trailer_url', None),  # Handle missing trailer_url
                 'duration': movie.duration,
                 'director': getattr(movie, 'director', 'Unknown'),  # Handle missing director
                 'cast': [{
-                    'id': actor.id,
-                    'name': getattr(actor, 'name', 'Unknown'),
-                    'profile_url': getattr(actor, 'profile_url', None)
-                } for actor in movie.actors],
+                    'id': credit.actor.id,
+                    'name': credit.actor.name,
+                    'profile_url': credit.actor.profile_url,
+                    'character': credit.character_name,
+                    'order': credit.cast_order
+                } for credit in movie.actors],
                 'similar_movies': similar_movies_data  # Add similar movies to the response
             }
         })
@@ -1,14 +1,24 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, make_response
 from flask_login import login_required, current_user, login_user, logout_user
 from extensions import db
+from sqlalchemy.orm import joinedload
 from models import Movie, User, WatchHistory, Watchlist, Favorite, Subscription, Payment, Notification
-from recommendation import get_movie_recommendations
+from .recommendation_routes import recommended_movies_for_user
+from .media_routes import image_src, video_src
+from utils.movie_queries import (
+    genre_names, genre_movies_page, top_movies_per_genre, top_movies_per_primary_genre,
+    normalize_sort, encode_cursor, PAGE_SIZE, MAX_PAGE_SIZE
+)
+from utils.movie_search import search_movies
 from datetime import datetime
 from functools import wraps
 
 # Create a Blueprint for main routes
 main_routes = Blueprint('main', __name__, template_folder='../templates')
 
+MOVIES_PER_GENRE_ROW = 20  # Movies per genre row on /movies
+MOVIES_PER_HOME_GENRE = 8  # Movies per genre row on the home page
+
 def json_response(f):
     @wraps(f)
     def wrapped(*args, **kwargs):
@@ -42,8 +52,10 @@ def api_popular_movies():
             'genre': m.genre,
             'rating': float(m.rating) if m.rating else 0.0,
             'poster_url': m.poster_url or '',
+            'poster_src': image_src(m),
             'banner_url': m.banner_url or '',
-            'video_url': m.video_url or ''
+            'banner_src': image_src(m, 'banner'),
+            'video_url': video_src(m)
         } for m in movies]
     }
 
@@ -56,24 +68,13 @@ def index():
     # Get recently added movies
     recent_movies = Movie.query.order_by(Movie.id.desc()).limit(8).all()
     
-    # Get recommended movies if user is logged in
+    # Get recommended movies if user is logged in (popular picks while the model loads)
     recommended_movies = []
     if current_user.is_authenticated:
-        recommended_movies = get_movie_recommendations(current_user.id)
-    
-    # Get movies grouped by genre for the home page
-    all_movies = Movie.query.all()
-    movies_by_genre = {}
-    
-    for movie in all_movies:
-        if movie.genre:  # Only process movies with a genre
-            if movie.genre not in movies_by_genre:
-                movies_by_genre[movie.genre] = []
-            movies_by_genre[movie.genre].append(movie)
+        recommended_movies = recommended_movies_for_user(current_user.id, 8)
     
-    # Limit the number of movies per genre to 8
-    for genre in movies_by_genre:
-        movies_by_genre[genre] = movies_by_genre[genre][:8]
+    # Get the top movies of each genre for the home page
+    movies_by_genre = top_movies_per_primary_genre(MOVIES_PER_HOME_GENRE)
     
     # Check if the request wants JSON (for API)
     if request.path.startswith('/api/'):
@@ -98,78 +99,29 @@ def index():
 @main_routes.route('/movies')
 def all_movies():
     # Get query parameters for filtering and sorting
-    page = request.args.get('page', 1, type=int)
-    per_page = 12  # Number of movies per page
     selected_genre = request.args.get('genre', '')
-    sort = request.args.get('sort', 'rating_desc')
+    sort = normalize_sort(request.args.get('sort', 'rating_desc'))
     
-    # Get all unique genres for the filter dropdown
-    all_genres = db.session.query(Movie.genre).distinct().all()
-    all_genres = [g[0] for g in all_genres if g[0]]  # Flatten and remove None values
+    # Get all genres with movies for the filter dropdown
+    all_genres = genre_names()
     
-    # If a specific genre is selected, show only that genre
+    # If a specific genre is selected, show the first page of that genre
     if selected_genre and selected_genre.lower() != 'all':
-        query = Movie.query.filter(Movie.genre.ilike(f'%{selected_genre}%'))
-        
-        # Apply sorting
-        if sort == 'rating_asc':
-            query = query.order_by(Movie.rating.asc())
-        elif sort == 'title_asc':
-            query = query.order_by(Movie.title.asc())
-        elif sort == 'title_desc':
-            query = query.order_by(Movie.title.desc())
-        elif sort == 'year_asc':
-            query = query.order_by(Movie.release_year.asc())
-        elif sort == 'year_desc':
-            query = query.order_by(Movie.release_year.desc())
-        else:  # Default: rating_desc
-            query = query.order_by(Movie.rating.desc())
-        
-        # Get all movies for the selected genre
-        movies = query.all()
-        
-        # Group by genre (will be a single genre in this case)
+        movies, next_cursor = genre_movies_page(selected_genre, sort, limit=PAGE_SIZE)
         movies_by_genre = {selected_genre: movies}
+        next_cursors = {selected_genre: next_cursor}
     else:
-        # Group all movies by genre
-        movies_by_genre = {}
-        
-        # Get all movies with their genres
-        all_movies = Movie.query.all()
-        
-        for movie in all_movies:
-            if not movie.genre:
-                continue
-                
-            # Split the genre string into individual genres
-            movie_genres = [g.strip() for g in movie.genre.split(',')]
-            
-            # Add movie to each of its genre groups
-            for genre in movie_genres:
-                if genre not in movies_by_genre:
-                    movies_by_genre[genre] = []
-                movies_by_genre[genre].append(movie)
-        
-        # Sort movies within each genre
-        for genre, movies in movies_by_genre.items():
-            if sort == 'rating_asc':
-                movies.sort(key=lambda x: (x.rating or 0, x.title))
-            elif sort == 'title_asc':
-                movies.sort(key=lambda x: (x.title or '', x.rating or 0))
-            elif sort == 'title_desc':
-                movies.sort(key=lambda x: (x.title or '', x.rating or 0), reverse=True)
-            elif sort == 'year_asc':
-                movies.sort(key=lambda x: (x.release_year or 0, x.rating or 0))
-            elif sort == 'year_desc':
-                movies.sort(key=lambda x: (x.release_year or 0, x.rating or 0), reverse=True)
-            else:  # Default: rating_desc
-                movies.sort(key=lambda x: (x.rating or 0, x.title or ''), reverse=True)
-    
-    # For pagination, we'll handle it client-side since we're grouping by genre
-    # We'll pass all movies and let the template handle the display
+        # One row of the best-sorted movies per genre; the rest load on demand
+        movies_by_genre = top_movies_per_genre(MOVIES_PER_GENRE_ROW, sort)
+        next_cursors = {
+            genre: encode_cursor(sort, movies[-1].sort_key, movies[-1].id)
+            if len(movies) == MOVIES_PER_GENRE_ROW else None
+            for genre, movies in movies_by_genre.items()
+        }
     
     return render_template('movies.html',
                          movies_by_genre=movies_by_genre,
+                         next_cursors=next_cursors,
                          all_genres=all_genres,
                          current_genre=selected_genre,
                          current_sort=sort)
@@ -192,11 +144,8 @@ def search():
     if not query:
         return redirect(url_for('index'))
     
-    # Search in movie titles and descriptions
-    movies = Movie.query.filter(
-        (Movie.title.ilike(f'%{query}%')) | 
-        (Movie.description.ilike(f'%{query}%'))
-    ).all()
+    # Best full-text matches first, bounded to one page
+    movies, _, _ = search_movies(query, limit=MAX_PAGE_SIZE)
     
     return render_template('search_results.html', query=query, results=movies)
 
@@ -204,16 +153,17 @@ def search():
 @main_routes.route('/profile')
 @login_required
 def profile():
-    # Get user's watch history
-    watch_history = WatchHistory.query.filter_by(user_id=current_user.id).order_by(
+    # Get user's watch history, watchlist and favorites, each with its
+    # movies joined in so the template doesn't load them one at a time
+    watch_history = WatchHistory.query.options(joinedload(WatchHistory.movie)).filter_by(
+        user_id=current_user.id
+    ).order_by(
         WatchHistory.watched_at.desc()
     ).limit(10).all()
     
-    # Get user's watchlist
-    watchlist = Watchlist.query.filter_by(user_id=current_user.id).all()
+    watchlist = Watchlist.query.options(joinedload(Watchlist.movie)).filter_by(user_id=current_user.id).all()
     
-    # Get user's favorites
-    favorites = Favorite.query.filter_by(user_id=current_user.id).all()
+    favorites = Favorite.query.options(joinedload(Favorite.movie)).filter_by(user_id=current_user.id).all()
     
     # Get subscription status
     subscription = Subscription.query.filter_by(user_id=current_user.id).first()
@@ -0,0 +1,109 @@
+from flask import Blueprint, abort, redirect, request, send_file, url_for
+from models import Movie, db
+from utils.hls_packager import package_file_path
+from utils.image_proxy import IMAGE_FORMATS, IMAGE_VARIANTS, ImageCache, ImageError, get_image
+from utils.media_files import FileCache, is_local_media, local_media_path, send_cached_file, send_media_file
+
+# Create a Blueprint for media routes
+media_routes = Blueprint('media', __name__)
+
+# Seconds clients may cache an HLS file. Packages live in version
+# directories that change with their contents, so this can be a year.
+HLS_MAX_AGE = 365 * 24 * 3600
+
+# Seconds clients may use a resized image before revalidating its ETag
+IMAGE_MAX_AGE = 7 * 24 * 3600
+
+# Hot HLS segments and playlists, shared by every request in this process
+segment_cache = FileCache()
+
+# Resized posters and banners, shared by every process (see utils/image_proxy.py)
+image_cache = ImageCache()
+
+@media_routes.app_template_global()
+def video_src(movie):
+    """URL to play a movie from: its stream route for local files, else video_url."""
+    if is_local_media(movie.video_url):
+        return url_for('media.stream_movie', movie_id=movie.id)
+    return movie.video_url or ''
+
+@media_routes.app_template_global()
+def hls_src(movie):
+    """URL of a movie's HLS master playlist, or '' if it hasn't been packaged."""
+    package = movie.video_package
+    if package is None or not package.ready:
+        return ''
+    return url_for('media.hls_file', movie_id=movie.id, version=package.version,
+                   filename=package.master_playlist)
+
+@media_routes.app_template_global()
+def image_src(movie, variant='poster'):
+    """URL of a resized poster or banner of a movie, or '' if it has none."""
+    kind = IMAGE_VARIANTS[variant][0]
+    if not getattr(movie, f'{kind}_url', None):
+        return ''
+    return url_for('media.movie_image', movie_id=movie.id, variant=variant)
+
+def image_format() -> str:
+    """Output format for this request: ``?format=``, else WebP if accepted, else JPEG."""
+    fmt = request.args.get('format')
+    if fmt in IMAGE_FORMATS:
+        return fmt
+    # Only an explicit image/webp counts; */* and image/* come from browsers without it too
+    return 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+
+@media_routes.route('/movie/<int:movie_id>/stream', methods=['GET'])
+def stream_movie(movie_id):
+    """
+    A movie's local video file, with byte ranges so players can seek
+    without downloading it again.
+    """
+    video_url = db.session.execute(
+        db.select(Movie.video_url).where(Movie.id == movie_id)
+    ).scalar_one_or_none()
+    path = local_media_path(video_url)
+    if path is None:
+        abort(404)
+    return send_media_file(path)
+
+@media_routes.route('/movie/<int:movie_id>/hls/<version>/<path:filename>', methods=['GET'])
+def hls_file(movie_id, version, filename):
+    """
+    A playlist or segment of a packaged movie (see utils/hls_packager.py).
+
+    Served straight from the package directory without a database query.
+    """
+    path = package_file_path(movie_id, version, filename)
+    if path is None:
+        abort(404)
+    return send_cached_file(path, segment_cache, max_age=HLS_MAX_AGE, immutable=True)
+
+@media_routes.route('/img/<int:movie_id>/<variant>', methods=['GET'])
+def movie_image(movie_id, variant):
+    """
+    A movie's poster or banner at one of the IMAGE_VARIANTS widths, as WebP
+    or JPEG.
+
+    Images are rendered on first request and served from the disk cache
+    after that. If the source can't be fetched, remote sources are
+    redirected to.
+    """
+    if variant not in IMAGE_VARIANTS:
+        abort(404)
+    column = Movie.poster_url if IMAGE_VARIANTS[variant][0] == 'poster' else Movie.banner_url
+    source_url = db.session.execute(db.select(column).where(Movie.id == movie_id)).scalar_one_or_none()
+    if not source_url:
+        abort(404)
+
+    fmt = image_format()
+    try:
+        path, etag = get_image(source_url, variant, fmt, image_cache)
+    except ImageError:
+        if is_local_media(source_url):
+            abort(404)
+        return redirect(source_url)
+
+    response = send_file(path, mimetype=IMAGE_FORMATS[fmt][1], etag=etag, conditional=True,
+                         max_age=IMAGE_MAX_AGE)
+    response.vary.add('Accept')
+    return response
@@ -0,0 +1,110 @@
+from typing import Any, Dict, List, Optional
+from flask import Blueprint, current_app, jsonify, request
+from models import Movie, WatchHistory, Favorite
+from .media_routes import image_src
+import recommendation
+from recommendation import (
+    get_movie_recommendations, get_recommendations_for_movie, hydrate_recommendations,
+    model_manager, DEFAULT_RECOMMENDATIONS, DEFAULT_LIMIT, MAX_RECOMMENDATIONS
+)
+
+# Create a Blueprint for recommendation routes
+recommendation_routes = Blueprint('recommendations', __name__)
+
+def _model_id_column() -> str:
+    """Movie column the model's ids refer to (see hydrate_recommendations)."""
+    return 'id' if recommendation.RECOMMENDATION_SOURCE == 'db' else 'tmdb_id'
+
+def model_ready() -> bool:
+    """Whether the model is loaded; starts loading it in the background if nothing has yet."""
+    if model_manager.ready:
+        return True
+    model_manager.start_if_idle(current_app._get_current_object().app_context)
+    return False
+
+def fallback_movies(limit: int = DEFAULT_LIMIT, exclude: Optional[List[int]] = None) -> List[Movie]:
+    """
+    Movies to show while the recommendation model isn't ready.
+
+    The DEFAULT_RECOMMENDATIONS titles that are in the catalog come first,
+    then the best-rated movies.
+    """
+    exclude = set(exclude or [])
+    order = {title: i for i, title in enumerate(DEFAULT_RECOMMENDATIONS)}
+    picks = {}
+    for movie in Movie.query.filter(Movie.title.in_(DEFAULT_RECOMMENDATIONS)).order_by(Movie.id):
+        if movie.id not in exclude:
+            picks.setdefault(movie.title, movie)
+    movies = sorted(picks.values(), key=lambda movie: order[movie.title])[:limit]
+
+    if len(movies) < limit:
+        exclude.update(movie.id for movie in movies)
+        movies += Movie.query.filter(Movie.id.notin_(exclude)).order_by(
+            Movie.rating.desc(), Movie.release_year.desc()
+        ).limit(limit - len(movies)).all()
+    return movies
+
+def recommended_movies_for_user(user_id: int, limit: int = DEFAULT_LIMIT) -> List[Movie]:
+    """
+    Movies like the one a user watched (or favourited) last.
+
+    Falls back to fallback_movies while the model is loading and for users
+    without any history.
+    """
+    last = WatchHistory.query.filter_by(user_id=user_id).order_by(WatchHistory.watched_at.desc()).first() \
+        or Favorite.query.filter_by(user_id=user_id).order_by(Favorite.added_at.desc()).first()
+    if not model_ready() or last is None:
+        return fallback_movies(limit, exclude=[last.movie_id] if last else None)
+
+    if _model_id_column() == 'id':
+        recommendations = get_recommendations_for_movie(last.movie_id, limit)
+    else:
+        recommendations = get_movie_recommendations(last.movie.title, limit)
+    return hydrate_recommendations(recommendations, _model_id_column()) or fallback_movies(limit, [last.movie_id])
+
+def movie_json(movie: Movie) -> Dict[str, Any]:
+    """The fields static/js/recommendations.js renders a card from."""
+    return {
+        'id': movie.id,
+        'title': movie.title,
+        'poster': image_src(movie) or None,
+        'year': movie.release_year,
+        'rating': movie.rating,
+        'genre': movie.genre
+    }
+
+@recommendation_routes.route('/get_recommendations', methods=['GET'])
+def get_recommendations():
+    """
+    Movies similar to ``title``.
+
+    While the model is still loading this answers at once with
+    fallback_movies and ``ready: false`` instead of waiting for it (and
+    starts the load if no one has).
+    """
+    title = request.args.get('title', '').strip()
+    if not title:
+        return jsonify({'error': 'Please enter a movie title'}), 400
+    limit = max(1, min(request.args.get('limit', DEFAULT_LIMIT, type=int), MAX_RECOMMENDATIONS))
+
+    try:
+        ready = model_ready()
+        if ready:
+            movies = hydrate_recommendations(get_movie_recommendations(title, limit), _model_id_column())
+        else:
+            movies = fallback_movies(limit)
+        return jsonify({
+            'query': title,
+            'ready': ready,
+            'recommendations': [movie_json(movie) for movie in movies]
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'Failed to get recommendations: {str(e)}'}), 500
+
+@recommendation_routes.route('/api/recommendations/status', methods=['GET'])
+def recommendations_status():
+    """Readiness probe: 200 once the model is loaded, 503 until then (starting the load if needed)."""
+    model_ready()
+    status = model_manager.status()
+    return jsonify(status), 200 if status['ready'] else 503
@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
-from models import Movie, db
-from sqlalchemy import or_
+from utils.movie_queries import InvalidCursor, PAGE_SIZE, MAX_PAGE_SIZE
+from utils.movie_search import search_movies as run_search, RELEVANCE_SORT
+from .media_routes import image_src
 
 # Create a Blueprint for search routes
 search_routes = Blueprint('search', __name__)
@@ -14,16 +15,19 @@ def search_movies():
                 'success': True,
                 'results': [],
                 'count': 0,
-                'query': query
+                'query': query,
+                'next_cursor': None
             })
         
-        # Search in movie titles and descriptions
-        movies = Movie.query.filter(
-            or_(
-                Movie.title.ilike(f'%{query}%'),
-                Movie.description.ilike(f'%{query}%')
-            )
-        ).all()
+        limit = max(1, min(request.args.get('limit', PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+        
+        # Full-text search (best matches first by default), one keyset page at a time
+        movies, next_cursor, sort = run_search(
+            query,
+            request.args.get('sort') or RELEVANCE_SORT,
+            request.args.get('cursor'),
+            limit
+        )
         
         # Format the response
         movies_data = [{
@@ -34,7 +38,9 @@ def search_movies():
             'genre': movie.genre,
             'rating': float(movie.rating) if movie.rating else 0.0,
             'poster_url': movie.poster_url or '',
+            'poster_src': image_src(movie),
             'banner_url': movie.banner_url or '',
+            'banner_src': image_src(movie, 'banner'),
             'trailer_url': getattr(movie, 'trailer_url', None)
         } for movie in movies]
         
@@ -42,9 +48,17 @@ def search_movies():
             'success': True,
             'results': movies_data,
             'count': len(movies_data),
-            'query': query
+            'query': query,
+            'sort': sort,
+            'next_cursor': next_cursor
         })
         
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'query': request.args.get('q', '')
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
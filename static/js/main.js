@@ -123,13 +123,14 @@ function initSearch() {
         elements.closeSearch.addEventListener('click', () => toggleSearch(false));
     }
     
-    // Handle search input
-    let searchTimeout;
+    // Handle search input: typeahead suggestions while typing
+    let suggestTimeout;
+    let suggestRequest;
     elements.movieSearchInput.addEventListener('input', (e) => {
-        clearTimeout(searchTimeout);
+        clearTimeout(suggestTimeout);
         const query = e.target.value.trim();
         
-        if (query.length < 2) {
+        if (!query) {
             const suggestions = document.querySelector('.search-suggestions');
             if (suggestions) suggestions.innerHTML = '';
             const searchResults = document.getElementById('search-results');
@@ -137,16 +138,70 @@ function initSearch() {
             return;
         }
         
-        searchTimeout = setTimeout(() => {
-            fetch(`/search?q=${encodeURIComponent(query)}`)
+        suggestTimeout = setTimeout(() => {
+            // Only the latest keystroke's suggestions matter
+            if (suggestRequest) suggestRequest.abort();
+            suggestRequest = new AbortController();
+            fetch(`/api/movies/suggest?q=${encodeURIComponent(query)}`, { signal: suggestRequest.signal })
                 .then(response => response.json())
                 .then(data => {
-                    displaySearchResults(data);
+                    if (data.success) displaySuggestions(data);
                 })
                 .catch(error => {
-                    console.error('Search error:', error);
+                    if (error.name !== 'AbortError') console.error('Suggestion error:', error);
                 });
-        }, 300);
+        }, 100);
+    });
+    
+    // Full search results on Enter or the search button
+    const runSearch = () => {
+        const query = elements.movieSearchInput.value.trim();
+        if (query.length < 2) return;
+        fetch(`/search?q=${encodeURIComponent(query)}`)
+            .then(response => response.json())
+            .then(data => {
+                displaySearchResults(data);
+            })
+            .catch(error => {
+                console.error('Search error:', error);
+            });
+    };
+    elements.movieSearchInput.addEventListener('keydown', (e) => {
+        if (e.key === 'Enter') {
+            e.preventDefault();
+            runSearch();
+        }
+    });
+    const searchActionBtn = document.getElementById('search-btn-main');
+    if (searchActionBtn) searchActionBtn.addEventListener('click', runSearch);
+}
+
+// Display typeahead suggestions (movies, then actors) under the search box
+function displaySuggestions(data) {
+    const suggestions = document.querySelector('.search-suggestions');
+    if (!suggestions) return;
+    suggestions.innerHTML = '';
+    
+    const addItem = (icon, label, onSelect) => {
+        const item = document.createElement('div');
+        item.className = 'suggestion-item';
+        item.innerHTML = `<i class="fas ${icon}"></i><span class="search-term"></span>`;
+        // Names go in as text, never as HTML
+        item.querySelector('.search-term').textContent = label;
+        item.addEventListener('click', onSelect);
+        suggestions.appendChild(item);
+    };
+    
+    data.results.forEach(movie => {
+        addItem('fa-film', movie.year ? `${movie.title} (${movie.year})` : movie.title, () => {
+            window.location.href = `/movie/${movie.id}`;
+        });
+    });
+    data.actors.forEach(actor => {
+        addItem('fa-user', actor.name, () => {
+            elements.movieSearchInput.value = actor.name;
+            elements.movieSearchInput.dispatchEvent(new KeyboardEvent('keydown', { key: 'Enter' }));
+        });
     });
 }
 
@@ -0,0 +1,79 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const PLACEHOLDER_POSTER = 'https://via.placeholder.com/300x450?text=No+Poster';
+
+    document.querySelectorAll('.load-more-btn').forEach(button => {
+        button.addEventListener('click', function(e) {
+            e.preventDefault();
+            loadMore(button);
+        });
+    });
+
+    function loadMore(button) {
+        const genre = button.dataset.genre;
+        const row = document.querySelector(`.movie-scroll[data-genre-row="${CSS.escape(genre)}"]`);
+        const params = new URLSearchParams({
+            sort: button.dataset.sort,
+            cursor: button.dataset.cursor
+        });
+
+        // Show loading state
+        button.innerHTML = '<i class="fas fa-spinner fa-spin"></i>';
+        button.disabled = true;
+
+        fetch(`/api/genres/${encodeURIComponent(genre)}/movies?${params}`)
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) {
+                    throw new Error(data.error);
+                }
+                data.results.forEach(movie => row.appendChild(createMovieCard(movie)));
+
+                // The last page has no next cursor
+                if (data.next_cursor) {
+                    button.dataset.cursor = data.next_cursor;
+                } else {
+                    button.remove();
+                }
+            })
+            .catch(error => {
+                console.error('Error loading movies:', error);
+            })
+            .finally(() => {
+                // Reset button state
+                button.innerHTML = 'Load more';
+                button.disabled = false;
+            });
+    }
+
+    function createMovieCard(movie) {
+        const card = document.createElement('div');
+        card.className = 'movie-card';
+        card.innerHTML = `
+            <a href="/movie/${movie.id}" class="movie-link">
+                <div class="movie-poster">
+                    <img alt="">
+                    <div class="movie-overlay">
+                        <div class="play-btn"><i class="fas fa-play"></i></div>
+                        <div class="movie-info">
+                            <h3></h3>
+                            <div class="movie-meta">
+                                <span class="year"></span>
+                                <span class="rating"><i class="fas fa-star"></i> </span>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            </a>
+        `;
+
+        // Text goes in through the DOM so titles are never parsed as HTML
+        const img = card.querySelector('img');
+        // poster_src is the resized, cached copy served by /img/
+        img.src = movie.poster_src || PLACEHOLDER_POSTER;
+        img.alt = movie.title;
+        card.querySelector('h3').textContent = movie.title;
+        card.querySelector('.year').textContent = movie.release_year || 'N/A';
+        card.querySelector('.rating').append(movie.rating ? movie.rating.toFixed(1) : 'N/A');
+        return card;
+    }
+});
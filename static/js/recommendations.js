@@ -59,15 +59,17 @@ document.addEventListener('DOMContentLoaded', function() {
             container.innerHTML = `
                 <div class="section">
                     <div class="container">
-                        <h2 class="section-title">Recommendations for "${data.query}"</h2>
+                        <h2 class="section-title"></h2>
                         <div class="recommendations-grid"></div>
                     </div>
                 </div>
             `;
             document.querySelector('main').prepend(container);
-        } else {
-            container.querySelector('.section-title').textContent = `Recommendations for "${data.query}"`;
         }
+        // The model is still loading: the server sent popular picks instead
+        container.querySelector('.section-title').textContent = data.ready === false
+            ? 'Popular picks while recommendations load'
+            : `Recommendations for "${data.query}"`;
         
         const grid = container.querySelector('.recommendations-grid');
         grid.innerHTML = '';
@@ -91,21 +93,35 @@ document.addEventListener('DOMContentLoaded', function() {
         card.innerHTML = `
             <a href="/movie/${movie.id}" class="movie-link">
                 <div class="movie-poster">
-                    <img src="${movie.poster || 'https://via.placeholder.com/300x450?text=No+Poster'}" alt="${movie.title}">
+                    <img alt="">
                     <div class="movie-overlay">
                         <div class="play-btn"><i class="fas fa-play"></i></div>
                         <div class="movie-info">
-                            <h3>${movie.title}</h3>
+                            <h3></h3>
                             <div class="movie-meta">
-                                <span class="year">${movie.year || 'N/A'}</span>
-                                <span class="rating"><i class="fas fa-star"></i> ${movie.rating ? movie.rating.toFixed(1) : 'N/A'}</span>
+                                <span class="year"></span>
+                                <span class="rating"><i class="fas fa-star"></i> </span>
                             </div>
-                            ${movie.genre ? `<div class="movie-genre">${movie.genre}</div>` : ''}
+                            <div class="movie-genre"></div>
                         </div>
                     </div>
                 </div>
             </a>
         `;
+        
+        // Text goes in through the DOM so titles are never parsed as HTML
+        const img = card.querySelector('img');
+        img.src = movie.poster || 'https://via.placeholder.com/300x450?text=No+Poster';
+        img.alt = movie.title;
+        card.querySelector('h3').textContent = movie.title;
+        card.querySelector('.year').textContent = movie.year || 'N/A';
+        card.querySelector('.rating').append(movie.rating ? movie.rating.toFixed(1) : 'N/A');
+        const genre = card.querySelector('.movie-genre');
+        if (movie.genre) {
+            genre.textContent = movie.genre;
+        } else {
+            genre.remove();
+        }
         return card;
     }
     
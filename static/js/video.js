@@ -5,6 +5,19 @@ document.addEventListener('DOMContentLoaded', function() {
     const playButton = document.getElementById('play-movie');
     const closeVideo = document.querySelector('.close-video');
     
+    // Play the adaptive-bitrate HLS package when the movie has one; the
+    // <source> MP4 stays as the fallback
+    const hlsSrc = moviePlayer && moviePlayer.dataset.hlsSrc;
+    if (hlsSrc) {
+        if (moviePlayer.canPlayType('application/vnd.apple.mpegurl')) {
+            moviePlayer.src = hlsSrc;
+        } else if (window.Hls && Hls.isSupported()) {
+            const hls = new Hls();
+            hls.loadSource(hlsSrc);
+            hls.attachMedia(moviePlayer);
+        }
+    }
+    
     // Open video modal when play button is clicked
     if (playButton) {
         playButton.addEventListener('click', function() {
@@ -0,0 +1,89 @@
+import pytest
+from jinja2 import TemplateNotFound
+from sqlalchemy import event, inspect, text
+
+from conftest import seed_catalog
+from extensions import db
+from models import Watchlist
+from migrate_db import upgrade_schema
+from routes import main_routes
+
+
+def capture_selects(client, path):
+    """Run a request, which must succeed, and return the SELECT statements (with parameters) it issued."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200, path
+    return statements
+
+
+def query_plan(statement, parameters):
+    with db.engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+@pytest.fixture
+def missing_templates_render_empty(monkeypatch):
+    """Render pages whose template doesn't exist yet as empty; only their queries matter here."""
+    render = main_routes.render_template
+
+    def render_template(template, **context):
+        try:
+            return render(template, **context)
+        except TemplateNotFound:
+            return ''
+
+    monkeypatch.setattr(main_routes, 'render_template', render_template)
+
+
+@pytest.mark.parametrize('path, index_ordered', [
+    ('/movie/{movie_id}', True),
+    ('/api/movies/{movie_id}', True),
+    ('/api/movies/popular', True),
+    ('/profile', True),
+    ('/', False),
+    # Genre listings join through movie_genre and sort the (indexed) matches
+    ('/movies', False),
+    ('/movies?genre=Action&sort=title_asc', False),
+])
+def test_route_queries_use_indexes(logged_in_client, missing_templates_render_empty, path, index_ordered):
+    client, movies = logged_in_client
+    statements = capture_selects(client, path.format(movie_id=movies[7].id))
+    assert statements
+
+    for statement, parameters in statements:
+        plan = query_plan(statement, parameters)
+        # Walking the rowid backwards for ORDER BY id DESC LIMIT n is not a full scan
+        rowid_ordered = 'ORDER BY movie.id DESC' in statement and 'LIMIT' in statement
+        full_scans = [step for step in plan if step.startswith('SCAN') and not rowid_ordered
+                      and 'USING' not in step and 'subquery' not in step and 'anon_' not in step]
+        assert not full_scans, f"{statement}\n{plan}"
+        if index_ordered and 'ORDER BY' in statement:
+            assert not any('TEMP B-TREE' in step for step in plan), f"{statement}\n{plan}"
+
+
+def test_migration_adds_indexes_and_removes_duplicates(app):
+    user, movies = seed_catalog()
+    with db.engine.connect() as conn:
+        for name in ('ix_movie_genre_rating', 'ix_watch_history_user_watched', 'ux_watchlist_user_movie'):
+            conn.execute(text(f'DROP INDEX {name}'))
+        conn.execute(text('INSERT INTO watchlist (user_id, movie_id) VALUES (:u, :m)'),
+                     {'u': user.id, 'm': movies[0].id})
+        conn.commit()
+
+    created = upgrade_schema()
+
+    assert sorted(created) == ['ix_movie_genre_rating', 'ix_watch_history_user_watched', 'ux_watchlist_user_movie']
+    assert Watchlist.query.count() == 5
+    names = {index['name'] for index in inspect(db.engine).get_indexes('watchlist')}
+    assert 'ux_watchlist_user_movie' in names
+    assert upgrade_schema() == []
@@ -0,0 +1,213 @@
+import shutil
+import subprocess
+import threading
+import time
+
+import pytest
+
+from extensions import db
+from models import Movie, VideoPackage
+from routes import media_routes
+from utils import hls_packager, media_files
+from utils.hls_packager import (
+    PackagingQueue, Rendition, build_ffmpeg_args, package_movie, parse_master_playlist,
+    parse_media_playlist, select_renditions
+)
+from utils.media_files import FileCache
+
+# Small enough for a test to encode in a second or two
+TINY_LADDER = (Rendition('240p', 240, 300, 64), Rendition('120p', 120, 100, 32))
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which(hls_packager.FFMPEG_BIN) is None, reason="ffmpeg not installed")
+
+
+@pytest.fixture
+def media_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_files, 'MEDIA_DIR', str(tmp_path / 'media'))
+    monkeypatch.setattr(hls_packager, 'HLS_DIR', str(tmp_path / 'hls'))
+    monkeypatch.setattr(media_routes, 'segment_cache', FileCache())
+    (tmp_path / 'media').mkdir()
+    return tmp_path
+
+
+def make_video(path, seconds=3, size='320x240', audio=True):
+    inputs = ['-f', 'lavfi', '-i', f'testsrc=duration={seconds}:size={size}:rate=24']
+    if audio:
+        inputs += ['-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}']
+    subprocess.run([hls_packager.FFMPEG_BIN, '-hide_banner', '-loglevel', 'error', '-y'] + inputs
+                   + ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-shortest', str(path)], check=True)
+
+
+def test_ladder_never_upscales():
+    assert [r.name for r in select_renditions(720)] == ['720p', '480p', '360p']
+    assert [r.name for r in select_renditions(1080)] == ['1080p', '720p', '480p', '360p']
+    assert [(r.name, r.height) for r in select_renditions(241)] == [('240p', 240)]
+
+
+def test_one_ffmpeg_pass_encodes_every_rendition():
+    args = build_ffmpeg_args('in.mp4', 'out', list(TINY_LADDER), has_audio=False, segment_seconds=2)
+    assert args.count('-i') == 1
+    assert args[args.index('-filter_complex') + 1] == (
+        '[0:v:0]split=2[s0][s1];[s0]scale=-2:240[v0];[s1]scale=-2:120[v1]'
+    )
+    assert args[args.index('-var_stream_map') + 1] == 'v:0,name:240p v:1,name:120p'
+    assert '0:a:0' not in args
+
+    with_audio = build_ffmpeg_args('in.mp4', 'out', list(TINY_LADDER), has_audio=True)
+    assert with_audio[with_audio.index('-var_stream_map') + 1] == 'v:0,a:0,name:240p v:1,a:1,name:120p'
+
+
+def test_playlists_are_parsed():
+    master = ("#EXTM3U\n#EXT-X-VERSION:3\n"
+              "#EXT-X-STREAM-INF:BANDWIDTH=420000,RESOLUTION=320x240,CODECS=\"avc1.64000d,mp4a.40.2\"\n"
+              "240p/index.m3u8\n")
+    assert parse_master_playlist(master) == [
+        {'uri': '240p/index.m3u8', 'bandwidth': 420000, 'width': 320, 'height': 240}
+    ]
+    media = "#EXTM3U\n#EXT-X-TARGETDURATION:2\n#EXTINF:2.000000,\nsegment_00000.ts\n#EXTINF:1.5,\nsegment_00001.ts\n"
+    assert parse_media_playlist(media) == [('segment_00000.ts', 2.0), ('segment_00001.ts', 1.5)]
+
+
+def test_failures_are_recorded_on_the_package(app, media_dirs):
+    movie = Movie(title="Remote", video_url='https://example.com/trailer.mp4')
+    db.session.add(movie)
+    db.session.commit()
+
+    package = package_movie(movie.id)
+    assert package.status == 'failed' and 'No local video file' in package.error
+    assert VideoPackage.query.filter_by(movie_id=movie.id).one().status == 'failed'
+    assert package_movie(12345) is None
+
+
+def test_unexpected_errors_are_recorded_and_raised(app, media_dirs, monkeypatch):
+    (media_dirs / 'media' / 'broken.mp4').write_bytes(b'not a video')
+    movie = Movie(title="Broken", video_url='broken.mp4')
+    db.session.add(movie)
+    db.session.commit()
+
+    def run_ffmpeg(args, timeout=None):
+        assert VideoPackage.query.filter_by(movie_id=movie.id).one().status == 'running'
+        raise ValueError("unexpected encoder output")
+    monkeypatch.setattr(hls_packager, 'probe_video', lambda path: hls_packager.SourceInfo(320, 240, 3.0, False))
+    monkeypatch.setattr(hls_packager, 'run_ffmpeg', run_ffmpeg)
+
+    with pytest.raises(ValueError):
+        package_movie(movie.id, ladder=TINY_LADDER)
+    package = VideoPackage.query.filter_by(movie_id=movie.id).one()
+    assert package.status == 'failed' and package.error == "unexpected encoder output"
+    assert not list((media_dirs / 'hls' / str(movie.id)).iterdir())
+
+
+@pytest.mark.parametrize('error', [hls_packager.PackagingError("ffmpeg failed"), ValueError("unexpected")])
+def test_movies_deleted_while_packaging_keep_the_original_error(app, media_dirs, monkeypatch, error):
+    (media_dirs / 'media' / 'gone.mp4').write_bytes(b'not a video')
+    movie = Movie(title="Gone", video_url='gone.mp4')
+    db.session.add(movie)
+    db.session.commit()
+    movie_id = movie.id
+
+    def run_ffmpeg(args, timeout=None):
+        db.session.execute(db.delete(VideoPackage).where(VideoPackage.movie_id == movie_id))
+        db.session.execute(db.delete(Movie).where(Movie.id == movie_id))
+        db.session.commit()
+        raise error
+    monkeypatch.setattr(hls_packager, 'probe_video', lambda path: hls_packager.SourceInfo(320, 240, 3.0, False))
+    monkeypatch.setattr(hls_packager, 'run_ffmpeg', run_ffmpeg)
+
+    if isinstance(error, hls_packager.PackagingError):
+        assert package_movie(movie_id, ladder=TINY_LADDER) is None
+    else:
+        with pytest.raises(ValueError):
+            package_movie(movie_id, ladder=TINY_LADDER)
+
+
+def test_queue_limits_concurrent_jobs(app):
+    running, peak, lock = [0], [0], threading.Lock()
+    done = []
+
+    def runner(movie_id, force=False):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+            done.append(movie_id)
+
+    jobs = PackagingQueue(app, workers=2, runner=runner)
+    assert all(jobs.submit(movie_id) for movie_id in range(6))
+    jobs.join()
+    assert sorted(done) == list(range(6)) and peak[0] == 2
+    jobs.close()
+
+
+def test_file_cache_evicts_least_recently_used(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f'{i}.ts'
+        path.write_bytes(bytes([i]) * 100)
+        paths.append(str(path))
+    cache = FileCache(max_bytes=250, max_file=200)
+
+    cache.get(paths[0]), cache.get(paths[1]), cache.get(paths[0]), cache.get(paths[2])
+    assert cache.stats() == {'hits': 1, 'misses': 3, 'entries': 2, 'bytes': 200}
+    assert cache.get(paths[0])[0] == bytes([0]) * 100
+    assert cache.stats()['hits'] == 2
+
+    big = tmp_path / 'big.ts'
+    big.write_bytes(b'x' * 201)
+    assert cache.get(str(big)) is None
+
+
+def test_segments_are_served_with_long_lived_cache_headers(client, media_dirs):
+    version_dir = media_dirs / 'hls' / '7' / 'abc123' / '240p'
+    version_dir.mkdir(parents=True)
+    (version_dir / 'segment_00000.ts').write_bytes(b'\x47' * 1880)
+    (media_dirs / 'hls' / '7' / '.abc123.tmp').mkdir()
+    (media_dirs / 'hls' / '7' / '.abc123.tmp' / 'master.m3u8').write_text('#EXTM3U\n')
+
+    url = '/movie/7/hls/abc123/240p/segment_00000.ts'
+    response = client.get(url)
+    assert response.status_code == 200 and response.data == b'\x47' * 1880
+    assert response.mimetype == 'video/mp2t'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'max-age=31536000' in response.headers['Cache-Control']
+
+    again = client.get(url, headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+    assert client.get(url, headers={'Range': 'bytes=0-187'}).data == b'\x47' * 188
+    assert media_routes.segment_cache.stats()['hits'] == 2
+
+    # Unfinished output and paths outside the package are not served
+    assert client.get('/movie/7/hls/.abc123.tmp/master.m3u8').status_code == 404
+    assert client.get('/movie/7/hls/abc123/../../8/x.ts').status_code == 404
+
+
+@needs_ffmpeg
+def test_package_movie_writes_and_records_every_rendition(client, media_dirs):
+    make_video(media_dirs / 'media' / 'tiny.mp4')
+    movie = Movie(title="Tiny", video_url='tiny.mp4')
+    db.session.add(movie)
+    db.session.commit()
+
+    package = package_movie(movie.id, ladder=TINY_LADDER, segment_seconds=1)
+    assert package.status == 'ready', package.error
+    assert [r.name for r in package.renditions] == ['240p', '120p']
+    assert [r.height for r in package.renditions] == [240, 120]
+    assert all(r.segment_count >= 3 and r.total_bytes > 0 for r in package.renditions)
+    assert package.duration == pytest.approx(3, abs=0.2)
+
+    master = client.get(f'/movie/{movie.id}/hls/{package.version}/master.m3u8')
+    assert master.status_code == 200 and b'240p/index.m3u8' in master.data
+    assert master.mimetype == 'application/vnd.apple.mpegurl'
+    playlist = client.get(f'/movie/{movie.id}/hls/{package.version}/120p/index.m3u8').get_data(as_text=True)
+    first_segment = parse_media_playlist(playlist)[0][0]
+    assert client.get(f'/movie/{movie.id}/hls/{package.version}/120p/{first_segment}').status_code == 200
+
+    # An unchanged source isn't packaged again; a changed one gets a new version
+    version = package.version
+    assert package_movie(movie.id, ladder=TINY_LADDER, segment_seconds=1).version == version
+    make_video(media_dirs / 'media' / 'tiny.mp4', seconds=2, audio=False)
+    repackaged = package_movie(movie.id, ladder=TINY_LADDER, segment_seconds=1)
+    assert repackaged.status == 'ready' and repackaged.version != version
+    assert not (media_dirs / 'hls' / str(movie.id) / version).exists()
@@ -0,0 +1,150 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from extensions import db
+from migrate_db import sync_movie_genres
+from models import Movie
+from routes import media_routes
+from utils.image_proxy import ImageCache, cache_key, prewarm_images, render_image
+
+
+def jpeg_bytes(size, color=(200, 40, 40)):
+    out = io.BytesIO()
+    Image.new('RGB', size, color).save(out, 'JPEG')
+    return out.getvalue()
+
+
+@pytest.fixture
+def image_server():
+    """A local stand-in for image.tmdb.org that counts its requests."""
+    images = {
+        '/t/p/w500/poster.jpg': jpeg_bytes((500, 750)),
+        '/t/p/original/backdrop.jpg': jpeg_bytes((1920, 1080), (30, 30, 200)),
+    }
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            body = images.get(self.path)
+            self.send_response(200 if body else 404)
+            self.send_header('Content-Length', str(len(body or b'')))
+            self.end_headers()
+            self.wfile.write(body or b'')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f'http://127.0.0.1:{server.server_port}'
+    server.requests_seen = requests_seen
+    yield server
+    server.shutdown()
+    thread.join()
+
+
+@pytest.fixture
+def movie(app, image_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(media_routes, 'image_cache', ImageCache(str(tmp_path / 'images')))
+    movie = Movie(title="Poster Test", poster_url=f'{image_server.base_url}/t/p/w500/poster.jpg',
+                  banner_url=f'{image_server.base_url}/t/p/original/backdrop.jpg')
+    db.session.add(movie)
+    db.session.commit()
+    return movie
+
+
+def test_variants_are_resized_and_negotiated(client, movie, image_server):
+    webp = client.get(f'/img/{movie.id}/poster', headers={'Accept': 'image/avif,image/webp,*/*'})
+    assert webp.status_code == 200 and webp.mimetype == 'image/webp'
+    assert Image.open(io.BytesIO(webp.data)).size == (342, 513)
+    assert 'Accept' in webp.headers['Vary']
+
+    jpeg = client.get(f'/img/{movie.id}/banner', headers={'Accept': 'image/*,*/*;q=0.8'})
+    assert jpeg.mimetype == 'image/jpeg'
+    assert Image.open(io.BytesIO(jpeg.data)).size == (780, 439)
+    assert client.get(f'/img/{movie.id}/poster?format=jpeg').mimetype == 'image/jpeg'
+
+    assert client.get(f'/img/{movie.id}/huge').status_code == 404
+    assert client.get('/img/999/poster').status_code == 404
+
+
+def test_cached_images_have_strong_etags_and_skip_the_source(client, movie, image_server):
+    url = f'/img/{movie.id}/poster-small'
+    first = client.get(url, headers={'Accept': 'image/webp'})
+    etag = first.headers['ETag']
+    assert not etag.startswith('W/')
+    assert etag.strip('"') == hashlib.sha256(first.data).hexdigest()
+
+    again = client.get(url, headers={'Accept': 'image/webp'})
+    assert again.data == first.data and again.headers['ETag'] == etag
+    assert client.get(url, headers={'Accept': 'image/webp', 'If-None-Match': etag}).status_code == 304
+    assert image_server.requests_seen == ['/t/p/w500/poster.jpg']
+
+
+def test_unavailable_sources_redirect_to_the_original(client, movie, image_server):
+    movie.poster_url = f'{image_server.base_url}/missing.jpg'
+    db.session.commit()
+    response = client.get(f'/img/{movie.id}/poster')
+    assert response.status_code == 302 and response.location == movie.poster_url
+
+
+def test_small_images_are_not_upscaled():
+    image = Image.open(io.BytesIO(render_image(jpeg_bytes((100, 150)), 342, 'jpeg')))
+    assert image.size == (100, 150) and image.format == 'JPEG'
+
+
+def test_identical_images_share_one_blob(tmp_path):
+    cache = ImageCache(str(tmp_path))
+    path_a, etag_a = cache.put('a' * 64, b'same bytes', 'webp')
+    path_b, etag_b = cache.put('b' * 64, b'same bytes', 'webp')
+    assert (path_a, etag_a) == (path_b, etag_b)
+    assert cache.get('a' * 64) == cache.get('b' * 64) == (path_a, etag_a)
+    assert cache.get('c' * 64) is None
+
+
+def test_cache_evicts_least_recently_used_images(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=250)
+    paths = [cache.put(f'{i}' * 64, bytes([i]) * 100, 'jpg')[0] for i in range(3)]
+    now = time.time()
+    for age, path in zip((300, 100, 200), paths):
+        os.utime(path, (now - age, now - age))
+
+    assert cache.prune() == 1
+    assert cache.get('0' * 64) is None
+    assert cache.get('1' * 64) and cache.get('2' * 64)
+    assert cache.size() == 200
+    assert not os.path.exists(cache._key_path('0' * 64))
+
+
+def test_prewarm_renders_every_variant_once(client, movie, image_server, tmp_path):
+    cache = media_routes.image_cache
+    sources = [('poster', movie.poster_url), ('banner', movie.banner_url), ('poster', movie.poster_url)]
+    counts = prewarm_images(sources, cache, formats=['webp', 'jpeg'], workers=2)
+    assert counts == {'sources': 2, 'rendered': 10, 'failed': 0}
+    assert sorted(image_server.requests_seen) == ['/t/p/original/backdrop.jpg', '/t/p/w500/poster.jpg']
+    assert cache.get(cache_key(movie.poster_url, 'poster-large', 'jpeg')) is not None
+
+    assert prewarm_images(sources, cache, workers=2)['rendered'] == 0
+    client.get(f'/img/{movie.id}/banner-large', headers={'Accept': 'image/webp'})
+    assert len(image_server.requests_seen) == 2
+
+
+def test_json_endpoints_point_posters_at_the_proxy(client, movie):
+    movie.genre = 'Drama'
+    db.session.flush()
+    sync_movie_genres(db.session.connection())
+    db.session.commit()
+    poster_src = f'/img/{movie.id}/poster'
+    assert client.get('/api/genres/Drama/movies').get_json()['results'][0]['poster_src'] == poster_src
+    assert client.get('/api/movies/popular').get_json()['results'][0]['poster_src'] == poster_src
+    detail = client.get(f'/api/movies/{movie.id}').get_json()['data']
+    assert (detail['poster_src'], detail['banner_src']) == (poster_src, f'/img/{movie.id}/banner')
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+from werkzeug.wsgi import FileWrapper
+
+from extensions import db, login_manager
+from models import Movie, User
+from utils import media_files
+from utils.media_files import FileRange, local_media_path
+
+CONTENT = bytes(range(256)) * 64
+
+
+@pytest.fixture
+def movie(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(media_files, 'MEDIA_DIR', str(tmp_path))
+    (tmp_path / 'movies').mkdir()
+    (tmp_path / 'movies' / 'clip.mp4').write_bytes(CONTENT)
+    movie = Movie(title="Clip", video_url='movies/clip.mp4')
+    db.session.add(movie)
+    db.session.commit()
+    return movie
+
+
+def test_full_file_is_served_with_validators(client, movie):
+    response = client.get(f'/movie/{movie.id}/stream')
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.mimetype == 'video/mp4'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.headers['ETag'] and response.headers['Last-Modified']
+
+    again = client.get(f'/movie/{movie.id}/stream', headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304 and again.data == b''
+
+
+def test_range_requests_get_partial_content(client, movie):
+    url = f'/movie/{movie.id}/stream'
+    response = client.get(url, headers={'Range': 'bytes=1000-1999'})
+    assert response.status_code == 206
+    assert response.data == CONTENT[1000:2000]
+    assert response.headers['Content-Range'] == f'bytes 1000-1999/{len(CONTENT)}'
+    assert response.headers['Content-Length'] == '1000'
+
+    assert client.get(url, headers={'Range': 'bytes=-10'}).data == CONTENT[-10:]
+    assert client.get(url, headers={'Range': f'bytes={len(CONTENT)}-'}).status_code == 416
+
+    # A range of a file that changed since is answered with the whole file
+    stale = client.get(url, headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+    assert stale.status_code == 200 and stale.data == CONTENT
+
+
+def test_ranges_are_handed_to_the_server_file_wrapper(client, movie):
+    wrapped = []
+
+    class RecordingWrapper(FileWrapper):
+        def __init__(self, file, buffer_size=8192):
+            # What a sendfile()-capable server would use: the descriptor and its offset
+            wrapped.append((file, os.lseek(file.fileno(), 0, os.SEEK_CUR)))
+            super().__init__(file, buffer_size)
+
+    response = client.get(f'/movie/{movie.id}/stream', headers={'Range': 'bytes=300-'},
+                          environ_overrides={'wsgi.file_wrapper': RecordingWrapper})
+    assert response.data == CONTENT[300:]
+    file_range, offset = wrapped[-1]
+    assert isinstance(file_range, FileRange) and offset == 300
+
+
+def test_only_files_under_the_media_dir_are_served(client, movie, tmp_path):
+    (tmp_path / 'secret.txt').write_text('secret')
+    assert local_media_path('../secret.txt') is None
+    assert local_media_path('https://example.com/clip.mp4') is None
+    assert local_media_path('/movies/clip.mp4') == str(tmp_path / 'movies' / 'clip.mp4')
+
+    movie.video_url = '../secret.txt'
+    db.session.commit()
+    assert client.get(f'/movie/{movie.id}/stream').status_code == 404
+    assert client.get('/movie/999/stream').status_code == 404
+
+
+def test_detail_page_plays_local_files_through_the_stream_route(client, movie):
+    login_manager.user_loader(lambda user_id: db.session.get(User, int(user_id)))
+    page = client.get(f'/movie/{movie.id}').get_data(as_text=True)
+    assert f'src="/movie/{movie.id}/stream"' in page
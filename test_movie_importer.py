@@ -0,0 +1,82 @@
+import json
+
+from conftest import make_synthetic_movies, write_synthetic_csvs
+from models import Movie, Actor, MovieActor
+from utils.movie_importer import import_movies_from_csv
+from utils.movie_search import search_movies
+
+
+def test_bulk_import_writes_movies_cast_and_shared_actors(app, tmp_path):
+    data = make_synthetic_movies(120)
+    # The same actor with different capitalisation, credited twice in one movie
+    data.loc[0, 'cast'] = json.dumps([
+        {"name": "Jane Doe", "character": "A", "order": 0},
+        {"name": "jane doe", "character": "B", "order": 1},
+    ])
+    data.loc[1, 'cast'] = json.dumps([{"name": "JANE DOE", "character": "C", "order": 0}])
+    credits_path, movies_path = write_synthetic_csvs(str(tmp_path), data=data)
+
+    assert import_movies_from_csv(movies_path, credits_path, batch_size=50) is True
+
+    assert Movie.query.count() == 120
+    assert Actor.query.filter(Actor.name.ilike('jane doe')).count() == 1
+    first = Movie.query.filter_by(title="Movie 0").one()
+    assert [a.name for a in first.get_actors()] == ["Jane Doe"]
+    assert MovieActor.query.count() == 2 + 5 * 118
+    # Every TMDB genre is linked, not just the first one stored on Movie.genre
+    assert len(first.get_genre_names()) == 2
+    assert first.genre == first.get_genre_names()[0]
+    # Imported movies are searchable by their cast
+    assert {m.title for m in search_movies('jane doe')[0]} == {"Movie 0", "Movie 1"}
+
+    # A populated database is left alone
+    assert import_movies_from_csv(movies_path, credits_path) is False
+    assert Movie.query.count() == 120
+
+
+def test_interrupted_import_resumes_and_reimport_is_idempotent(app, tmp_path, monkeypatch):
+    from models import ImportCheckpoint
+    from utils import movie_importer
+
+    credits_path, movies_path = write_synthetic_csvs(str(tmp_path), n=100)
+    write = movie_importer.BulkMovieWriter.write
+    calls = []
+
+    def crash_on_third_batch(self, batch):
+        calls.append(len(batch))
+        if len(calls) == 3:
+            raise RuntimeError("simulated crash")
+        return write(self, batch)
+
+    monkeypatch.setattr(movie_importer.BulkMovieWriter, 'write', crash_on_third_batch)
+    try:
+        import_movies_from_csv(movies_path, credits_path, batch_size=20, progress=False)
+    except RuntimeError:
+        pass
+    checkpoint = ImportCheckpoint.query.one()
+    assert (checkpoint.last_tmdb_id, checkpoint.rows_imported, checkpoint.completed) == (40, 40, False)
+    assert Movie.query.count() == 40
+
+    monkeypatch.setattr(movie_importer.BulkMovieWriter, 'write', write)
+    import_movies_from_csv(movies_path, credits_path, batch_size=20, progress=False)
+    assert Movie.query.count() == 100
+    assert sorted(m.tmdb_id for m in Movie.query) == list(range(1, 101))
+    assert MovieActor.query.count() == 500
+    assert ImportCheckpoint.query.one().completed
+    assert import_movies_from_csv(movies_path, credits_path, progress=False) is False
+
+    import_movies_from_csv(movies_path, credits_path, batch_size=20, progress=False, force=True)
+    assert Movie.query.count() == 100
+    assert MovieActor.query.count() == 500
+    # Re-imported movies keep their cast in the search index
+    movie = Movie.query.filter_by(tmdb_id=7).one()
+    assert movie in search_movies(movie.get_actors()[0].name, limit=100)[0]
+
+
+def test_parallel_parse_workers_feed_a_single_writer(app, tmp_path):
+    credits_path, movies_path = write_synthetic_csvs(str(tmp_path), n=150)
+
+    import_movies_from_csv(movies_path, credits_path, batch_size=16, progress=False, workers=2)
+
+    assert sorted(m.tmdb_id for m in Movie.query) == list(range(1, 151))
+    assert MovieActor.query.count() == 750
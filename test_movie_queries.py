@@ -0,0 +1,97 @@
+from sqlalchemy import select
+
+from extensions import db
+from models import Movie
+from migrate_db import sync_movie_genres
+from utils.movie_queries import (
+    genre_names, genre_movies_page, top_movies_per_genre, top_movies_per_primary_genre, paginate
+)
+
+
+def seed_genres():
+    movies = [
+        Movie(title="Heat", genre="Action, Crime", rating=8.0, release_year=1995),
+        Movie(title="Ronin", genre="Action", rating=7.0, release_year=1998),
+        Movie(title="Se7en", genre="Crime, Thriller", rating=8.5, release_year=1995),
+        Movie(title="Up", genre="Animation", rating=8.2, release_year=2009),
+        Movie(title="Actionland", genre="Comedy", rating=5.0, release_year=2001),
+    ]
+    db.session.add_all(movies)
+    db.session.flush()
+    sync_movie_genres(db.session.connection())
+    db.session.commit()
+
+
+def test_top_movies_per_genre_ranks_within_every_genre(app):
+    seed_genres()
+
+    grouped = top_movies_per_genre(1, 'rating_desc')
+    assert {genre: [m.title for m in rows] for genre, rows in grouped.items()} == {
+        'Action': ['Heat'], 'Animation': ['Up'], 'Comedy': ['Actionland'],
+        'Crime': ['Se7en'], 'Thriller': ['Se7en'],
+    }
+    assert [m.title for m in top_movies_per_genre(5, 'title_asc')['Action']] == ['Heat', 'Ronin']
+
+
+def test_genre_filter_matches_whole_genre_names(app):
+    seed_genres()
+
+    assert genre_names() == ['Action', 'Animation', 'Comedy', 'Crime', 'Thriller']
+    # A substring of a genre name no longer matches it
+    assert genre_movies_page('Act') == ([], None)
+    assert [m.title for m in genre_movies_page('Action', 'year_desc')[0]] == ['Ronin', 'Heat']
+
+
+def test_home_page_rows_keep_the_top_rated_movies_per_primary_genre(app):
+    db.session.add_all(
+        [Movie(title=f"Action {i}", genre="Action", rating=i) for i in range(12)]
+        + [Movie(title="Quiet", genre="Drama", rating=6.0), Movie(title="Untagged", genre=None)]
+    )
+    db.session.commit()
+
+    rows = top_movies_per_primary_genre(8)
+
+    assert list(rows) == ['Action', 'Drama']
+    assert [m.title for m in rows['Action']] == [f"Action {i}" for i in range(11, 3, -1)]
+    assert rows['Drama'][0]._fields == ('id', 'title', 'poster_url', 'release_year', 'rating', 'genre')
+
+
+def test_keyset_pages_cover_the_listing_once_in_order(app, client):
+    # Many rating ties (and NULLs) so pages must break ties on id
+    db.session.add_all([
+        Movie(title=f"Drama {i:02d}", genre="Drama", rating=None if i % 7 == 0 else i % 4)
+        for i in range(50)
+    ])
+    db.session.flush()
+    sync_movie_genres(db.session.connection())
+    db.session.commit()
+
+    for sort in ('rating_desc', 'title_asc', 'year_asc'):
+        expected = [row.id for row in paginate(select(Movie.id), sort, limit=1000)[0]]
+        seen, cursor = [], None
+        while True:
+            response = client.get('/api/genres/Drama/movies',
+                                  query_string={'sort': sort, 'limit': 7, 'cursor': cursor or ''})
+            payload = response.get_json()
+            seen += [movie['id'] for movie in payload['results']]
+            cursor = payload['next_cursor']
+            if cursor is None:
+                break
+        assert seen == expected
+
+    ratings = [row.sort_key for row in paginate(select(Movie.id), 'rating_desc', limit=1000)[0]]
+    assert ratings == sorted(ratings, reverse=True)
+
+
+def test_search_pages_and_rejects_foreign_cursors(app, client):
+    seed_genres()
+    first = client.get('/api/movies/search', query_string={'q': 'action', 'limit': 2}).get_json()
+    assert first['count'] == 2 and first['next_cursor']
+    second = client.get('/api/movies/search',
+                        query_string={'q': 'action', 'limit': 2, 'cursor': first['next_cursor']}).get_json()
+    assert not {m['id'] for m in first['results']} & {m['id'] for m in second['results']}
+
+    response = client.get('/api/movies/search',
+                          query_string={'q': 'action', 'sort': 'title_asc', 'cursor': first['next_cursor']})
+    assert response.status_code == 400
+    assert client.get('/api/genres/Action/movies', query_string={'cursor': 'garbage'}).status_code == 400
@@ -0,0 +1,80 @@
+from extensions import db
+from models import Actor, Movie, MovieActor
+from utils import movie_search
+from utils.movie_search import index_cast_names, match_expression, search_movies, RELEVANCE_SORT
+
+
+def seed_catalog():
+    movies = [
+        Movie(title="The Matrix", description="A hacker learns the truth", genre="Action", rating=8.7),
+        Movie(title="Hackers", description="Teenagers and a matrix of phones", genre="Crime", rating=6.2),
+        Movie(title="Speed", description="A bus that cannot slow down", genre="Action", rating=7.2),
+        Movie(title="Point Break", description="Surfers rob banks", genre="Action, Crime", rating=7.3),
+    ]
+    db.session.add_all(movies)
+    db.session.flush()
+    keanu = Actor(name="Keanu Reeves")
+    db.session.add(keanu)
+    db.session.flush()
+    db.session.add_all([MovieActor(movie_id=m.id, actor_id=keanu.id) for m in (movies[0], movies[2])])
+    db.session.flush()
+    index_cast_names(db.session.connection(), [movies[0].id, movies[2].id])
+    db.session.commit()
+    return movies
+
+
+def titles(query, **kwargs):
+    return [movie.title for movie in search_movies(query, **kwargs)[0]]
+
+
+def test_search_ranks_matches_across_indexed_columns(app):
+    seed_catalog()
+
+    assert movie_search.search_index_available()
+    # A title match outranks a description match
+    assert titles('matrix') == ['The Matrix', 'Hackers']
+    # The last word matches as a prefix, for typeahead
+    assert titles('hack') == ['Hackers', 'The Matrix']
+    assert titles('keanu reev', sort='title_asc') == ['Speed', 'The Matrix']
+    assert titles('crime', sort='rating_desc') == ['Point Break', 'Hackers']
+    # FTS5 syntax in the text is searched as plain words
+    assert titles('speed OR "break') == []
+    assert match_expression('  ') is None
+
+
+def test_search_index_follows_catalog_changes(app):
+    movies = seed_catalog()
+
+    movies[2].title = "Dash"
+    db.session.delete(movies[0])
+    db.session.execute(db.delete(MovieActor).where(MovieActor.movie_id == movies[2].id))
+    index_cast_names(db.session.connection(), [movies[2].id])
+    db.session.commit()
+
+    assert titles('speed') == []
+    assert titles('dash') == ['Dash']
+    assert titles('keanu') == []
+    assert titles('matrix') == ['Hackers']
+
+
+def test_relevance_pages_cover_every_match_once(app):
+    db.session.add_all([Movie(title=f"Heist {i}", description="heist " * (i % 4)) for i in range(9)])
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        movies, cursor, sort = search_movies('heist', cursor=cursor, limit=4)
+        seen.extend(movie.id for movie in movies)
+        if cursor is None:
+            break
+    assert sort == RELEVANCE_SORT
+    assert sorted(seen) == sorted(m.id for m in Movie.query.all())
+
+
+def test_search_falls_back_to_like_without_fts5(app, monkeypatch):
+    seed_catalog()
+    monkeypatch.setattr(movie_search, 'search_index_available', lambda: False)
+
+    movies, _, sort = search_movies('atri')
+    assert sort == 'rating_desc'
+    assert [movie.title for movie in movies] == ['The Matrix', 'Hackers']
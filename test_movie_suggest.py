@@ -0,0 +1,116 @@
+import random
+
+from extensions import db
+from models import Actor, Movie, MovieActor
+from utils import movie_suggest
+from utils.movie_suggest import PrefixIndex, normalize, refresh_suggestion_index
+
+
+def seed_catalog():
+    movies = [
+        Movie(title="The Dark Knight", rating=9.0, release_year=2008),
+        Movie(title="Dark City", rating=7.6, release_year=1998),
+        Movie(title="Darkman", rating=6.4, release_year=1990),
+        Movie(title="Amélie", rating=8.3, release_year=2001),
+        Movie(title="Knight and Day", rating=6.3, release_year=2010),
+    ]
+    actors = [Actor(name="Christian Bale"), Actor(name="Christina Ricci")]
+    db.session.add_all(movies + actors)
+    db.session.flush()
+    db.session.add_all([MovieActor(movie_id=m.id, actor_id=actors[0].id) for m in movies[:2]]
+                       + [MovieActor(movie_id=movies[2].id, actor_id=actors[1].id)])
+    db.session.commit()
+    return movies
+
+
+def wait_for_rebuilds():
+    for thread in list(movie_suggest._rebuilds.values()):
+        thread.join(5)
+
+
+def titles(client, query):
+    response = client.get('/api/movies/suggest', query_string={'q': query})
+    assert response.status_code == 200
+    return [movie['title'] for movie in response.get_json()['results']]
+
+
+def test_suggest_matches_word_prefixes_best_rated_first(app, client):
+    seed_catalog()
+
+    assert titles(client, 'dar') == ['The Dark Knight', 'Dark City', 'Darkman']
+    assert titles(client, 'dark k') == ['The Dark Knight']
+    assert titles(client, 'knig') == ['The Dark Knight', 'Knight and Day']
+    assert titles(client, 'AME') == ['Amélie']
+    assert titles(client, 'zzz') == []
+    assert titles(client, '') == []
+
+    body = client.get('/api/movies/suggest', query_string={'q': 'christ'}).get_json()
+    # Actors are ranked by how many movies credit them
+    assert [actor['name'] for actor in body['actors']] == ["Christian Bale", "Christina Ricci"]
+    assert body['results'] == []
+
+
+def test_suggestion_index_picks_up_imported_movies(app, client, monkeypatch):
+    seed_catalog()
+    assert titles(client, 'heat') == []
+
+    db.session.add(Movie(title="Heat", rating=8.3))
+    db.session.commit()
+    with db.engine.connect() as conn:
+        refresh_suggestion_index(conn)
+    assert titles(client, 'heat') == ['Heat']
+
+    # Movies added by another process show up after REFRESH_INTERVAL
+    db.session.add(Movie(title="Heathers", rating=7.0))
+    db.session.commit()
+    assert titles(client, 'heat') == ['Heat']
+    monkeypatch.setattr(movie_suggest, 'REFRESH_INTERVAL', 0)
+    assert titles(client, 'heat') == ['Heat', 'Heathers']
+
+
+
+def test_edited_and_deleted_movies_leave_the_index(app, client, monkeypatch):
+    movies = seed_catalog()
+    assert titles(client, 'dark') == ['The Dark Knight', 'Dark City', 'Darkman']
+
+    movies[1].title = "Bright City"
+    db.session.delete(movies[2])
+    db.session.commit()
+    # The old index answers while the new one is built in the background
+    assert titles(client, 'dark') == ['The Dark Knight', 'Dark City', 'Darkman']
+    wait_for_rebuilds()
+    assert titles(client, 'dark') == ['The Dark Knight']
+    assert titles(client, 'bright') == ['Bright City']
+
+    # Edits by another process are dropped by the periodic rebuild
+    with db.engine.begin() as conn:
+        conn.execute(Movie.__table__.update().where(Movie.id == movies[0].id).values(title="Batman Begins"))
+    assert titles(client, 'dark') == ['The Dark Knight']
+    monkeypatch.setattr(movie_suggest, 'REBUILD_INTERVAL', 0)
+    titles(client, 'dark')
+    wait_for_rebuilds()
+    monkeypatch.setattr(movie_suggest, 'REBUILD_INTERVAL', 600)
+    assert titles(client, 'dark') == []
+    assert titles(client, 'batm') == ['Batman Begins']
+
+def test_prefix_rankings_match_a_full_scan(monkeypatch):
+    # Small enough that short prefixes are ranked at build time
+    monkeypatch.setattr(movie_suggest, 'SCAN_LIMIT', 8)
+    rnd = random.Random(0)
+    syllables = ['an', 'bo', 'ca', 'da', 'el', 'fi', 'ga']
+    records = [
+        (i, " ".join("".join(rnd.sample(syllables, 2)) for _ in range(rnd.randint(1, 3))),
+         rnd.uniform(0, 10), None)
+        for i in range(1, 300)
+    ]
+    index = PrefixIndex().with_records(records[:200]).with_records(records[200:])
+    assert any(len(prefix) > 1 for prefix in index.top)
+
+    def keys(name):
+        words = normalize(name).split()
+        return [' '.join(words[i:]) for i in range(len(words))]
+
+    for prefix in ['a', 'bo', 'cad', 'an b', 'elfi']:
+        matching = [r for r in records if any(key.startswith(prefix) for key in keys(r[1]))]
+        expected = [r[0] for r in sorted(matching, key=lambda r: (-r[2], r[0]))[:10]]
+        assert [index.ids[r] for r in index.match(prefix)] == expected
@@ -0,0 +1,50 @@
+from extensions import db
+from models import Actor, MovieActor
+from routes import main_routes
+
+
+def add_cast(movie, size=8):
+    actors = [Actor(name=f"Actor {i}") for i in range(size)]
+    db.session.add_all(actors)
+    db.session.flush()
+    # Credited in reverse so the response order has to come from cast_order
+    db.session.add_all([MovieActor(movie_id=movie.id, actor_id=actor.id, character_name=f"Role {i}",
+                                   cast_order=i) for i, actor in reversed(list(enumerate(actors)))])
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_movie_api_loads_cast_in_a_fixed_number_of_queries(logged_in_client, query_budget):
+    client, movies = logged_in_client
+    movie_id = movies[7].id
+    add_cast(movies[7])
+
+    # The movie, its credits with their actors, and the similar movies
+    with query_budget(3):
+        body = client.get(f'/api/movies/{movie_id}').get_json()
+
+    assert body['success']
+    assert [actor['name'] for actor in body['data']['cast']] == [f"Actor {i}" for i in range(8)]
+    assert body['data']['cast'][0]['character'] == "Role 0"
+
+
+def test_profile_loads_each_list_with_its_movies(logged_in_client, query_budget, monkeypatch):
+    client, movies = logged_in_client
+    titles = [movie.title for movie in movies]
+    db.session.expunge_all()
+    rendered = {}
+
+    def render_template(template, **context):
+        # What the profile template shows of every entry
+        for name in ('watch_history', 'watchlist', 'favorites'):
+            rendered[name] = [entry.movie.title for entry in context[name]]
+        return ''
+
+    monkeypatch.setattr(main_routes, 'render_template', render_template)
+    # The logged-in user, the three lists and the subscription
+    with query_budget(5):
+        assert client.get('/profile').status_code == 200
+
+    assert len(rendered['watch_history']) == 10
+    assert rendered['watchlist'] == titles[:5]
+    assert rendered['favorites'] == titles[5:10]
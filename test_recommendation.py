@@ -1,7 +1,22 @@
 import os
 import sys
+import json
 import logging
-from recommendation import get_movie_recommendations, load_data
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from recommendation import (
+    get_movie_recommendations, load_data, build_recommendation_model,
+    build_model_artifact, load_model_artifact, get_similar_indices, TopKSimilarity,
+    TitleIndex, run_batch, update_model, load_data_from_db, hydrate_recommendations,
+    get_recommendations_for_movie
+)
+import recommendation
+from routes import recommendation_routes
+from recommendation_cache import MemoryCache, RecommendationCache, SQLiteCache
+from conftest import make_synthetic_movies, write_synthetic_csvs
 
 # Configure logging
 logging.basicConfig(
@@ -9,6 +24,23 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+# Module globals set_model and the result cache replace
+MODEL_GLOBALS = ('df', 'cosine_sim', 'indices', 'records', 'title_index', 'id_index',
+                 'model_version', 'result_version')
+
+@pytest.fixture
+def no_model(monkeypatch):
+    """Start without a loaded model; the module's model, result cache and manager are restored afterwards."""
+    for name in MODEL_GLOBALS:
+        monkeypatch.setattr(recommendation, name, None, raising=False)
+    monkeypatch.setattr(recommendation, 'result_cache', RecommendationCache(MemoryCache()))
+    manager = recommendation.ModelManager()
+    monkeypatch.setattr(recommendation, 'model_manager', manager)
+    monkeypatch.setattr(recommendation_routes, 'model_manager', manager)
+    yield manager
+    manager.wait(5)
+
+@pytest.mark.usefixtures('no_model')
 def test_recommendation():
     print("=== Testing Movie Recommendation System ===")
     
@@ -60,6 +92,358 @@ def test_recommendation():
         import traceback
         traceback.print_exc()
 
+def legacy_extract_features(df: pd.DataFrame) -> pd.DataFrame:
+    """The original row-by-row extract_features, kept as the reference output."""
+    df = df.copy()
+    for col in ['cast', 'crew', 'keywords', 'genres']:
+        df[col] = df[col].apply(recommendation.safe_literal_eval)
+    df['director'] = df['crew'].apply(
+        lambda x: next((i["name"] for i in x if isinstance(i, dict) and i.get("job") == "Director"), "")
+    )
+    for col in ['cast', 'keywords', 'genres']:
+        df[col] = df[col].apply(
+            lambda x: [i.get("name", "") for i in x[:3]] if isinstance(x, list) else []
+        )
+    for col in ['cast', 'keywords', 'director', 'genres', 'overview', 'title']:
+        df[col] = df[col].apply(
+            lambda x: " ".join(str(i).lower().replace(" ", "") for i in x)
+            if isinstance(x, list)
+            else str(x).lower().replace(" ", "") if pd.notnull(x)
+            else ""
+        )
+    return df
+
+def test_extract_features_soup_is_identical_to_legacy_parser():
+    df = make_synthetic_movies(300, seed=3)
+    # Python-literal reprs, missing values, non-ASCII names and a crew without a director
+    df.loc[0, 'cast'] = "[{'name': 'Zoë Saldaña', 'order': 0}, {'name': 'Sam  Worthington'}]"
+    df.loc[1, 'overview'] = np.nan
+    df.loc[2, 'keywords'] = "not a literal"
+    df.loc[3, 'crew'] = json.dumps([{"job": "Producer", "name": "Nobody"}])
+    df.loc[4, 'genres'] = "[]"
+    df.loc[5, 'crew'] = np.nan
+    
+    def soup(frame):
+        return frame['keywords'] + " " + frame['cast'] + " " + frame['director'] + " " + frame['genres']
+    
+    expected = legacy_extract_features(df.assign(crew=df['crew'].fillna("[]")))
+    for workers in (1, 3):
+        actual = recommendation.extract_features(df, workers=workers)
+        assert soup(actual).tolist() == soup(expected).tolist()
+        assert actual['title'].tolist() == expected['title'].tolist()
+        assert actual['overview'].tolist() == expected['overview'].tolist()
+
+def test_topk_similarity_matches_dense():
+    data = make_synthetic_movies(300)
+    _, dense, _ = build_recommendation_model(data, mode='dense')
+    _, topk, _ = build_recommendation_model(data, mode='topk', top_k=20)
+    
+    assert topk.neighbors.shape == (300, 20)
+    assert topk.scores.dtype == np.float32
+    assert not (topk.neighbors == np.arange(300)[:, None]).any()
+    
+    np.fill_diagonal(dense, -np.inf)
+    expected = -np.sort(-dense, axis=1)[:, :20]
+    assert np.allclose(topk.scores, expected, atol=1e-5)
+
+def test_get_similar_indices_batch_excludes_query_and_breaks_ties():
+    # Movies 0 and 1 are duplicates; 2, 3 and 4 tie against movie 0
+    sim = np.array([
+        [1.0, 1.0, 0.5, 0.5, 0.5],
+        [1.0, 1.0, 0.2, 0.5, 0.5],
+        [0.5, 0.2, 1.0, 0.1, 0.9],
+        [0.5, 0.5, 0.1, 1.0, 0.3],
+        [0.5, 0.5, 0.9, 0.3, 1.0],
+    ])
+    neighbors, scores = get_similar_indices([0, 1, 2], sim, limit=3)
+    assert neighbors.shape == scores.shape == (3, 3)
+    assert neighbors.tolist() == [[1, 2, 3], [0, 3, 4], [4, 0, 1]]
+    assert scores[0].tolist() == [1.0, 0.5, 0.5]
+    
+    topk = TopKSimilarity(neighbors.astype(np.int32), scores.astype(np.float32))
+    assert get_similar_indices(1, topk, limit=2)[0].tolist() == [[0, 3]]
+
+def test_recommendations_are_assembled_from_record_table(no_model):
+    data = make_synthetic_movies(100)
+    recommendation.set_model(*build_recommendation_model(data, top_k=10))
+    
+    recs = get_movie_recommendations("Movie 7", limit=5)
+    assert len(recs) == 5
+    expected = data.set_index('title')
+    for rec in recs:
+        row = expected.loc[rec['title']]
+        assert rec['year'] == int(row['release_date'][:4])
+        assert rec['rating'] == row['vote_average']
+        assert rec['description'] == row['overview']
+        assert rec['genre'] == json.loads(row['genres'])[0]['name']
+    assert [r['similarity_score'] for r in recs] == sorted((r['similarity_score'] for r in recs), reverse=True)
+
+def test_title_index_resolves_exact_normalized_and_fuzzy_queries():
+    index = TitleIndex(["The Dark Knight", "The Dark Knight Rises", "Inception", "Se7en", "Up"])
+    assert index.resolve("Inception") == ("Inception", 100)
+    assert index.resolve("the dark-knight!") == ("The Dark Knight", 100)
+    assert index.resolve("Incepshun")[0] == "Inception"
+    assert index.resolve("Dark Knight Rises")[0] == "The Dark Knight Rises"
+    assert index.resolve("zzzzqqqq") is None
+    
+    index.resolve("Incepshun")
+    assert index.resolve.cache_info().hits >= 1
+
+def test_batch_run_streams_jsonl_in_input_order(tmp_path, no_model):
+    data = make_synthetic_movies(120)
+    recommendation.set_model(*build_recommendation_model(data, top_k=10))
+    input_path = tmp_path / "titles.txt"
+    output_path = tmp_path / "recs.jsonl"
+    input_path.write_text("Movie 3\n\nzzzzqqqq\nMovie 42\n")
+    
+    count, _ = run_batch(str(input_path), str(output_path), limit=4, chunk_size=2, workers=2)
+    results = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert count == 3
+    assert [r['query'] for r in results] == ["Movie 3", "zzzzqqqq", "Movie 42"]
+    assert results[1]['match'] is None and results[1]['recommendations'] == []
+    assert results[2]['match'] == "Movie 42"
+    assert results[2]['recommendations'] == get_movie_recommendations("Movie 42", limit=4)
+
+def test_model_artifact_is_reused_until_sources_change(tmp_path):
+    credits_path, movies_path = write_synthetic_csvs(str(tmp_path))
+    artifact_dir = str(tmp_path / "artifacts")
+    
+    path = build_model_artifact(artifact_dir, credits_path, movies_path, top_k=10)
+    df, sim, indices, manifest = load_model_artifact(path)
+    assert isinstance(sim.neighbors, np.memmap)
+    assert manifest['n_movies'] == len(df) == 200
+    
+    mtime = os.path.getmtime(os.path.join(path, 'manifest.json'))
+    assert build_model_artifact(artifact_dir, credits_path, movies_path, top_k=10) == path
+    assert os.path.getmtime(os.path.join(path, 'manifest.json')) == mtime
+    
+    pd.read_csv(movies_path).head(150).to_csv(movies_path, index=False)
+    new_path = build_model_artifact(artifact_dir, credits_path, movies_path, top_k=10)
+    assert new_path != path
+    assert not os.path.exists(path)
+    assert load_model_artifact(new_path)[3]['n_movies'] == 150
+
+def test_parsed_data_cache_skips_csv_parsing(tmp_path, monkeypatch):
+    credits_path, movies_path = write_synthetic_csvs(str(tmp_path))
+    first = recommendation.load_parsed_data(credits_path, movies_path)
+    assert 'crew' not in first.columns
+    cached = [p for p in os.listdir(tmp_path) if p.startswith('.tmdb_parsed.')]
+    assert len(cached) == 1
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("CSV parsed despite a valid cache")
+    monkeypatch.setattr(recommendation, 'load_data', fail)
+    second = recommendation.load_parsed_data(credits_path, movies_path)
+    pd.testing.assert_frame_equal(first, second)
+    
+    # load_data here is the module's original, imported before the patch
+    raw = recommendation.prepare_model_frame(load_data(credits_path, movies_path))
+    assert recommendation.prepare_model_frame(second)['soup'].tolist() == raw['soup'].tolist()
+
+def test_incremental_update_matches_full_rebuild(tmp_path):
+    data = make_synthetic_movies(200)
+    credits_path, movies_path = write_synthetic_csvs(str(tmp_path), data=data.head(170))
+    new_credits, new_movies = write_synthetic_csvs(str(tmp_path), data=data.tail(30), prefix="new_")
+    artifact_dir = str(tmp_path / "artifacts")
+    settings = dict(artifact_dir=artifact_dir, credits_path=credits_path, movies_path=movies_path,
+                    top_k=15, vectorizer_kind='hashing')
+    
+    base_path = build_model_artifact(**settings)
+    base_version = load_model_artifact(base_path)[3]['version']
+    path = update_model(load_data(new_credits, new_movies), **settings)
+    df, sim, _, manifest = load_model_artifact(path)
+    assert manifest['version'] != base_version and manifest['revision'] == 1
+    assert len(df) == 200
+    
+    _, expected, _ = build_recommendation_model(data, top_k=15, vectorizer_kind='hashing')
+    assert np.allclose(sim.scores, expected.scores, atol=1e-5)
+    assert (sim.neighbors == expected.neighbors).all()
+    
+    # Re-adding the same movies is a no-op
+    update_model(load_data(new_credits, new_movies), **settings)
+    assert load_model_artifact(path)[3]['revision'] == 1
+    
+    # Database models are keyed by Movie.id and rebuilt on catalog changes instead
+    with pytest.raises(recommendation.ModelBuildError):
+        update_model(load_data(new_credits, new_movies), **dict(settings, source='db'))
+
+def test_model_built_from_database_is_keyed_by_movie_id(app, no_model):
+    from models import db, Movie, Actor, MovieActor
+    
+    actors = [Actor(name=f"Person {i}") for i in range(12)]
+    db.session.add_all(actors)
+    for i in range(30):
+        movie = Movie(id=100 + i, title=f"Movie {i}", genre=["Action", "Drama", "Comedy"][i % 3],
+                      rating=5.0 + i % 4, release_year=1990 + i, description=f"Plot {i}")
+        db.session.add(movie)
+        for order in range(3):
+            db.session.add(MovieActor(movie=movie, actor=actors[(i + order * 4) % 12], cast_order=order))
+    db.session.commit()
+    
+    data = load_data_from_db(chunk_size=7)
+    assert data['movie_id'].tolist() == list(range(100, 130))
+    assert [c['name'] for c in data.loc[0, 'cast']] == ["Person 0", "Person 4", "Person 8"]
+    
+    recommendation.set_model(*build_recommendation_model(data, top_k=5))
+    recs = get_recommendations_for_movie(103, limit=3)
+    assert len(recs) == 3 and 103 not in [r['id'] for r in recs]
+    assert recs[0]['genre'] == "Action"
+    assert get_movie_recommendations("Movie 3", limit=3) == recs
+    
+    movies = hydrate_recommendations(recs)
+    assert [m.id for m in movies] == [r['id'] for r in recs]
+
+def test_results_are_cached_per_model_version(no_model):
+    data = make_synthetic_movies(100)
+    recommendation.set_model(*build_recommendation_model(data, top_k=10))
+    
+    recs = get_movie_recommendations("Movie 7", limit=5)
+    recs[0]['title'] = "Changed by the caller"
+    # Same words, different case and punctuation
+    assert get_movie_recommendations("  movie-7!", limit=5)[0]['title'] != "Changed by the caller"
+    get_movie_recommendations("Movie 7", limit=4)
+    stats = recommendation.result_cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+    
+    # A new model never serves the old one's results
+    recommendation.set_model(*build_recommendation_model(data.head(50), top_k=10))
+    assert recommendation.result_cache.stats()['entries'] == 0
+    assert all(int(r['title'].split()[1]) < 50 for r in get_movie_recommendations("Movie 7", limit=5))
+    assert recommendation.result_cache.stats()['misses'] == 3
+
+def test_concurrent_misses_compute_once():
+    cache = RecommendationCache(MemoryCache())
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return [{'title': "Heat"}]
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute(("heat", 5, "v1"), compute)))
+               for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)  # Let the others reach the in-flight computation
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert results == [[{'title': "Heat"}]] * 8
+    stats = cache.stats()
+    assert stats['misses'] == 1 and stats['hits'] + stats['coalesced'] == 7
+
+def test_sqlite_cache_is_shared_and_expires(tmp_path, monkeypatch):
+    path = str(tmp_path / "results.sqlite3")
+    first = RecommendationCache(SQLiteCache(path, ttl=60))
+    second = RecommendationCache(SQLiteCache(path, ttl=60))
+    first.get_or_compute(("heat", 5, "v1"), lambda: [{'title': "Heat", 'rating': 8.3}])
+    assert second.get_or_compute(("heat", 5, "v1"), lambda: []) == [{'title': "Heat", 'rating': 8.3}]
+    assert second.stats()['hits'] == 1
+    
+    # Another process may still be on v1, so its entries are left to expire
+    second.retain("v2")
+    assert first.backend.get(("heat", 5, "v1")) == [{'title': "Heat", 'rating': 8.3}]
+    
+    first.get_or_compute(("heat", 5, "v2"), lambda: [])
+    now = time.time()
+    monkeypatch.setattr('recommendation_cache.time.time', lambda: now + 61)
+    assert second.backend.get(("heat", 5, "v2")) is None
+    assert second.backend.get(("heat", 5, "v1")) is None
+    second.retain("v2")
+    assert len(second.backend) == 1
+    
+    # A cache that can't be read counts as empty rather than failing stats()
+    second.backend._connection().execute("DROP TABLE recommendation_cache")
+    assert second.stats()['entries'] == 0
+
+def test_endpoint_serves_fallback_until_model_is_ready(app, client, no_model, monkeypatch):
+    from models import db, Movie
+    
+    monkeypatch.setattr(recommendation, 'RECOMMENDATION_SOURCE', 'db')
+    for i in range(12):
+        db.session.add(Movie(id=1 + i, title=f"Movie {i}", genre=["Action", "Drama"][i % 2],
+                             rating=5.0 + i % 4, release_year=2000 + i, description=f"Plot {i}"))
+    db.session.add(Movie(id=50, title="The Dark Knight", genre="Action", rating=1.0, release_year=2008))
+    db.session.commit()
+    release = threading.Event()
+    monkeypatch.setattr(recommendation, 'load_models', lambda: release.wait(5))
+    
+    # The first request starts the load; until it finishes, requests get fallbacks
+    status = client.get('/api/recommendations/status')
+    assert status.status_code == 503 and status.json['state'] == 'loading'
+    response = client.get('/get_recommendations?title=Movie 3&limit=4')
+    assert response.status_code == 200 and response.json['ready'] is False
+    # DEFAULT_RECOMMENDATIONS titles first, then the best rated
+    titles = [movie['title'] for movie in response.json['recommendations']]
+    assert titles == ["The Dark Knight", "Movie 11", "Movie 7", "Movie 3"]
+    assert client.get('/get_recommendations').status_code == 400
+    
+    recommendation.set_model(*build_recommendation_model(load_data_from_db(), top_k=5))
+    release.set()
+    status = client.get('/api/recommendations/status')
+    assert status.status_code == 200 and status.json['ready'] is True
+    response = client.get('/get_recommendations?title=Movie 3&limit=4')
+    assert response.json['ready'] is True
+    ids = [movie['id'] for movie in response.json['recommendations']]
+    assert len(ids) == 4 and 4 not in ids
+
+def test_endpoint_hydrates_csv_models_by_tmdb_id(app, client, no_model, monkeypatch):
+    from models import db, Movie
+    
+    monkeypatch.setattr(recommendation, 'RECOMMENDATION_SOURCE', 'csv')
+    data = make_synthetic_movies(30)
+    # Database ids differ from the TMDB ids the CSV model is keyed by
+    db.session.add_all([Movie(id=500 + i, tmdb_id=int(row.id), title=row.title)
+                        for i, row in enumerate(data.itertuples())])
+    db.session.commit()
+    recommendation.set_model(*build_recommendation_model(data, top_k=5))
+    
+    recs = get_movie_recommendations("Movie 3", limit=4)
+    assert all(r['id'] is None and r['tmdb_id'] for r in recs)
+    response = client.get('/get_recommendations?title=Movie 3&limit=4')
+    assert response.json['ready'] is True
+    movies = response.json['recommendations']
+    assert [m['id'] for m in movies] == [499 + r['tmdb_id'] for r in recs]
+    assert [m['title'] for m in movies] == [r['title'] for r in recs]
+
+def test_model_manager_loads_in_the_background(no_model, monkeypatch):
+    release = threading.Event()
+    data = make_synthetic_movies(60)
+    
+    def slow_load():
+        release.wait(5)
+        recommendation.set_model(*build_recommendation_model(data, top_k=5))
+    
+    monkeypatch.setattr(recommendation, 'load_models', slow_load)
+    manager = recommendation.ModelManager()
+    assert manager.start() is True
+    assert manager.status()['state'] == 'loading' and not manager.ready
+    assert manager.start() is False
+    release.set()
+    assert manager.wait(5) is True
+    assert manager.status()['state'] == 'ready' and manager.load_seconds is not None
+    assert manager.start() is False
+
+def test_forked_workers_restart_an_inherited_load(no_model, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(recommendation, 'load_models', lambda: release.wait(5))
+    manager = recommendation.ModelManager()
+    assert manager.start() is True
+    assert manager.start_if_idle() is False
+    
+    # What a child forked mid-load sees: the state, but not the thread
+    manager._after_fork()
+    assert manager.state == 'idle'
+    assert manager.start_if_idle() is True
+    release.set()
+    manager.wait(5)
+
 if __name__ == "__main__":
     print(f"Current working directory: {os.getcwd()}")
     print(f"Files in directory: {os.listdir('.')}")
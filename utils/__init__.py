@@ -3,5 +3,9 @@
 # Import the movie_importer function to make it easily accessible
 from .movie_importer import import_movies_from_csv
 
+# Registers the full-text search index with the movie tables, so every
+# db.create_all() builds it
+from . import movie_search
+
 # This allows importing like: from utils import import_movies_from_csv
 __all__ = ['import_movies_from_csv']
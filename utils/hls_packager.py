@@ -0,0 +1,397 @@
+import hashlib
+import logging
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Optional
+from werkzeug.security import safe_join
+from models import Movie, VideoPackage, VideoRendition, db
+from utils.media_files import local_media_path
+
+logger = logging.getLogger(__name__)
+
+# The ffmpeg executable; it must have libx264 and the hls muxer
+FFMPEG_BIN = os.environ.get('FFMPEG_BIN', 'ffmpeg')
+
+# Directory holding the packaged videos: <HLS_DIR>/<movie id>/<version>/
+HLS_DIR = os.environ.get(
+    'STREAMIFY_HLS_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'hls')
+)
+
+# Target seconds per segment; keyframes are forced on these boundaries so
+# every rendition's segments line up and players can switch between them
+SEGMENT_SECONDS = 6
+
+# ffmpeg processes packaging at once (each one uses several cores)
+MAX_CONCURRENT_JOBS = int(os.environ.get('STREAMIFY_PACKAGING_JOBS', 2))
+
+# Seconds one ffmpeg run may take before it is killed
+JOB_TIMEOUT = 6 * 3600
+
+# x264 speed/size trade-off
+X264_PRESET = 'veryfast'
+
+# The bitrate ladder, highest first. Renditions taller than the source are
+# skipped, so nothing is upscaled.
+Rendition = namedtuple('Rendition', 'name height video_kbps audio_kbps')
+RENDITIONS = (
+    Rendition('1080p', 1080, 5000, 192),
+    Rendition('720p', 720, 2800, 128),
+    Rendition('480p', 480, 1400, 128),
+    Rendition('360p', 360, 800, 96),
+)
+
+MASTER_PLAYLIST = 'master.m3u8'
+
+SourceInfo = namedtuple('SourceInfo', 'width height duration has_audio')
+
+DURATION_RE = re.compile(r'Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+VIDEO_STREAM_RE = re.compile(r'Stream #0:\d+.*?: Video: .*?(\d{2,5})x(\d{2,5})')
+AUDIO_STREAM_RE = re.compile(r'Stream #0:\d+.*?: Audio: ')
+STREAM_INF_RE = re.compile(r'#EXT-X-STREAM-INF:(.*)')
+
+class PackagingError(Exception):
+    """ffmpeg is missing, failed, or the source isn't a usable video."""
+
+def run_ffmpeg(args: List[str], timeout: Optional[float] = JOB_TIMEOUT) -> str:
+    """
+    Run ffmpeg with ``args``, returning its stderr.
+
+    Raises:
+        PackagingError: ffmpeg is missing, timed out or exited non-zero
+            (with the end of its output)
+    """
+    try:
+        result = subprocess.run(
+            [FFMPEG_BIN, '-hide_banner', '-nostdin'] + args,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=timeout
+        )
+    except FileNotFoundError:
+        raise PackagingError(f"{FFMPEG_BIN} not found; install ffmpeg or set FFMPEG_BIN")
+    except subprocess.TimeoutExpired:
+        raise PackagingError(f"ffmpeg took longer than {timeout} seconds")
+    stderr = result.stderr.decode('utf-8', 'replace')
+    if result.returncode != 0:
+        raise PackagingError(stderr.strip()[-2000:] or f"ffmpeg exited with {result.returncode}")
+    return stderr
+
+def probe_video(path: str) -> SourceInfo:
+    """
+    Size, duration and audio presence of a video file.
+
+    Reads the stream summary ``ffmpeg -i`` prints, so only the ffmpeg
+    binary is needed.
+    """
+    try:
+        run_ffmpeg(['-i', path], timeout=60)
+        output = ''
+    except PackagingError as e:
+        # With no output file ffmpeg exits 1 after describing the input
+        output = str(e)
+    video = VIDEO_STREAM_RE.search(output)
+    if video is None:
+        raise PackagingError(f"No video stream in {path}: {output[-500:]}")
+    duration = DURATION_RE.search(output)
+    seconds = None
+    if duration:
+        hours, minutes, secs = duration.groups()
+        seconds = int(hours) * 3600 + int(minutes) * 60 + float(secs)
+    return SourceInfo(int(video.group(1)), int(video.group(2)), seconds, bool(AUDIO_STREAM_RE.search(output)))
+
+def select_renditions(source_height: int, ladder=RENDITIONS) -> List[Rendition]:
+    """The renditions of ``ladder`` no taller than the source (at least one)."""
+    renditions = [r for r in ladder if r.height <= source_height]
+    if not renditions:
+        lowest = ladder[-1]
+        height = max(2, source_height - source_height % 2)
+        renditions = [lowest._replace(name=f'{height}p', height=height)]
+    return renditions
+
+def build_ffmpeg_args(
+    source: str,
+    out_dir: str,
+    renditions: List[Rendition],
+    has_audio: bool,
+    segment_seconds: float = SEGMENT_SECONDS
+) -> List[str]:
+    """
+    ffmpeg arguments packaging ``source`` into every rendition in one pass.
+
+    The source is decoded once and split into one scaled x264 encode per
+    rendition. Writes ``<out_dir>/master.m3u8`` and, per rendition,
+    ``<name>/index.m3u8`` with its MPEG-TS segments.
+    """
+    count = len(renditions)
+    filters = [f"[0:v:0]split={count}" + ''.join(f"[s{i}]" for i in range(count))]
+    filters += [f"[s{i}]scale=-2:{r.height}[v{i}]" for i, r in enumerate(renditions)]
+    args = ['-y', '-i', source, '-filter_complex', ';'.join(filters)]
+
+    for i, r in enumerate(renditions):
+        args += [
+            '-map', f'[v{i}]',
+            f'-c:v:{i}', 'libx264',
+            f'-b:v:{i}', f'{r.video_kbps}k',
+            f'-maxrate:v:{i}', f'{int(r.video_kbps * 1.07)}k',
+            f'-bufsize:v:{i}', f'{int(r.video_kbps * 1.5)}k',
+        ]
+    if has_audio:
+        for i, r in enumerate(renditions):
+            args += ['-map', '0:a:0', f'-c:a:{i}', 'aac', f'-b:a:{i}', f'{r.audio_kbps}k', f'-ac:a:{i}', '2']
+
+    stream_map = ' '.join(
+        f"v:{i},a:{i},name:{r.name}" if has_audio else f"v:{i},name:{r.name}"
+        for i, r in enumerate(renditions)
+    )
+    args += [
+        '-preset', X264_PRESET,
+        '-pix_fmt', 'yuv420p',
+        '-sc_threshold', '0',
+        '-force_key_frames', f'expr:gte(t,n_forced*{segment_seconds})',
+        '-f', 'hls',
+        '-hls_time', str(segment_seconds),
+        '-hls_playlist_type', 'vod',
+        '-hls_flags', 'independent_segments',
+        '-hls_segment_filename', os.path.join(out_dir, '%v', 'segment_%05d.ts'),
+        '-master_pl_name', MASTER_PLAYLIST,
+        '-var_stream_map', stream_map,
+        os.path.join(out_dir, '%v', 'index.m3u8'),
+    ]
+    return args
+
+def parse_master_playlist(text: str) -> List[Dict[str, Any]]:
+    """The variant streams of a master playlist: their URI, BANDWIDTH and RESOLUTION."""
+    variants = []
+    lines = [line.strip() for line in text.splitlines()]
+    for i, line in enumerate(lines):
+        match = STREAM_INF_RE.match(line)
+        if not match or i + 1 >= len(lines):
+            continue
+        attributes = dict(re.findall(r'([A-Z-]+)=("[^"]*"|[^,]*)', match.group(1)))
+        width = height = None
+        if 'RESOLUTION' in attributes:
+            width, height = (int(n) for n in attributes['RESOLUTION'].split('x'))
+        variants.append({
+            'uri': lines[i + 1],
+            'bandwidth': int(attributes.get('BANDWIDTH', 0)),
+            'width': width,
+            'height': height,
+        })
+    return variants
+
+def parse_media_playlist(text: str) -> List[Any]:
+    """(segment URI, duration) of each segment of a media playlist."""
+    segments, duration = [], None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('#EXTINF:'):
+            duration = float(line[len('#EXTINF:'):].split(',')[0])
+        elif line and not line.startswith('#') and duration is not None:
+            segments.append((line, duration))
+            duration = None
+    return segments
+
+def package_version(source_path: str, renditions: List[Rendition], segment_seconds: float) -> str:
+    """Output version: changes whenever the source file or the encoding settings do."""
+    stat = os.stat(source_path)
+    settings = f"{source_path}|{stat.st_size}|{stat.st_mtime_ns}|{renditions}|{segment_seconds}|{X264_PRESET}"
+    return hashlib.sha1(settings.encode()).hexdigest()[:16]
+
+def package_dir(movie_id: int, version: Optional[str] = None) -> str:
+    movie_dir = os.path.join(HLS_DIR, str(movie_id))
+    return movie_dir if version is None else os.path.join(movie_dir, version)
+
+def package_file_path(movie_id: int, version: str, filename: str) -> Optional[str]:
+    """
+    The packaged file ``filename`` of a movie's package ``version``.
+
+    Returns None for anything but an existing file inside a finished
+    version directory (in-progress output lives in dot-directories).
+    """
+    if not version.isalnum():
+        return None
+    path = safe_join(package_dir(movie_id), version, filename)
+    return path if path is not None and os.path.isfile(path) else None
+
+def _record_renditions(package: VideoPackage, out_dir: str) -> None:
+    """Replace a package's VideoRendition rows with what ffmpeg wrote to ``out_dir``."""
+    with open(os.path.join(out_dir, MASTER_PLAYLIST)) as f:
+        variants = parse_master_playlist(f.read())
+    if not variants:
+        raise PackagingError("ffmpeg wrote a master playlist without variants")
+
+    # Delete the old rows first: they share (package_id, name) with the new ones
+    package.renditions = []
+    db.session.flush()
+    durations = []
+    for variant in variants:
+        playlist = os.path.join(out_dir, variant['uri'])
+        with open(playlist) as f:
+            segments = parse_media_playlist(f.read())
+        segment_dir = os.path.dirname(playlist)
+        durations.append(sum(duration for _, duration in segments))
+        package.renditions.append(VideoRendition(
+            name=os.path.dirname(variant['uri']) or os.path.splitext(variant['uri'])[0],
+            width=variant['width'],
+            height=variant['height'],
+            bandwidth=variant['bandwidth'],
+            playlist=variant['uri'],
+            segment_count=len(segments),
+            total_bytes=sum(os.path.getsize(os.path.join(segment_dir, uri)) for uri, _ in segments),
+        ))
+    package.duration = max(durations)
+
+def package_movie(
+    movie_id: int,
+    force: bool = False,
+    ladder=RENDITIONS,
+    segment_seconds: float = SEGMENT_SECONDS
+) -> Optional[VideoPackage]:
+    """
+    Package a movie's local video file (Movie.video_url) as HLS.
+
+    Output goes to a version directory that changes with the source and the
+    settings, so a package is never rewritten in place and its files can be
+    cached forever. An unchanged, ready package is left alone unless
+    ``force``. Failures are recorded on the VideoPackage (status 'failed'
+    with the error); packaging errors are returned that way, anything
+    unexpected is raised after being recorded. Must be called inside an
+    application context.
+
+    Returns:
+        The movie's VideoPackage, or None if the movie doesn't exist
+    """
+    movie = db.session.get(Movie, movie_id)
+    if movie is None:
+        return None
+    package = movie.video_package or VideoPackage(movie=movie)
+    package.source = movie.video_url
+    source_path = local_media_path(movie.video_url)
+    work_dir = None
+
+    try:
+        if source_path is None:
+            raise PackagingError(f"No local video file for {movie.video_url!r}")
+        info = probe_video(source_path)
+        renditions = select_renditions(info.height, ladder)
+        version = package_version(source_path, renditions, segment_seconds)
+        out_dir = package_dir(movie_id, version)
+        if not force and package.ready and package.version == version and os.path.isdir(out_dir):
+            return package
+
+        package.status, package.error = 'running', None
+        db.session.add(package)
+        db.session.commit()
+
+        # Write next to the final directory and rename it into place when done
+        work_dir = package_dir(movie_id, f'.{version}.tmp')
+        shutil.rmtree(work_dir, ignore_errors=True)
+        for rendition in renditions:
+            os.makedirs(os.path.join(work_dir, rendition.name))
+        logger.info(f"Packaging movie {movie_id} as {', '.join(r.name for r in renditions)}")
+        run_ffmpeg(build_ffmpeg_args(source_path, work_dir, renditions, info.has_audio, segment_seconds))
+
+        _record_renditions(package, work_dir)
+        shutil.rmtree(out_dir, ignore_errors=True)
+        os.replace(work_dir, out_dir)
+        work_dir = None
+        package.version = version
+        package.master_playlist = MASTER_PLAYLIST
+        package.segment_seconds = segment_seconds
+        package.status = 'ready'
+        db.session.commit()
+    except Exception as e:
+        # Anything that stops packaging, expected or not, must not leave the
+        # package 'running'
+        db.session.rollback()
+        movie = db.session.get(Movie, movie_id)
+        if movie is None:
+            package = None  # Deleted while it was being packaged; nothing to record the failure on
+        else:
+            package = movie.video_package or VideoPackage(movie=movie)
+            package.status, package.error = 'failed', str(e) or type(e).__name__
+            db.session.add(package)
+            db.session.commit()
+        if not isinstance(e, (PackagingError, OSError)):
+            raise
+        logger.error(f"Packaging movie {movie_id} failed: {str(e)}")
+        return package
+    finally:
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    # Old versions are no longer referenced by the database
+    for entry in os.listdir(package_dir(movie_id)):
+        if entry != package.version and not entry.startswith('.'):
+            shutil.rmtree(os.path.join(package_dir(movie_id), entry), ignore_errors=True)
+    return package
+
+class PackagingQueue:
+    """
+    Runs package_movie jobs on a fixed number of worker threads.
+
+    The worker count caps how many ffmpeg processes run at once; later jobs
+    wait in the queue. A movie that is already queued or running isn't
+    queued again.
+    """
+
+    def __init__(self, app: Any, workers: int = MAX_CONCURRENT_JOBS,
+                 runner: Callable[..., Any] = package_movie):
+        self.app = app
+        self.workers = max(1, workers)
+        self.runner = runner
+        self._queue: 'queue.Queue[Optional[tuple]]' = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, movie_id: int, force: bool = False) -> bool:
+        """Queue a movie for packaging; returns False if it already is."""
+        with self._lock:
+            if movie_id in self._pending:
+                return False
+            self._pending.add(movie_id)
+            if not self._threads:
+                self._threads = [
+                    threading.Thread(target=self._work, name=f'hls-packager-{i}', daemon=True)
+                    for i in range(self.workers)
+                ]
+                for thread in self._threads:
+                    thread.start()
+        self._queue.put((movie_id, force))
+        return True
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                movie_id, force = job
+                with self.app.app_context():
+                    try:
+                        self.runner(movie_id, force=force)
+                    except Exception as e:
+                        logger.error(f"Packaging job for movie {movie_id} crashed: {str(e)}")
+                    finally:
+                        db.session.remove()
+                with self._lock:
+                    self._pending.discard(movie_id)
+            finally:
+                self._queue.task_done()
+
+    def join(self) -> None:
+        """Wait until every queued job has finished."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Finish the queued jobs and stop the workers."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
@@ -0,0 +1,316 @@
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+import requests
+from PIL import Image, ImageOps
+from utils.media_files import is_local_media, local_media_path
+
+logger = logging.getLogger(__name__)
+
+# Directory of the resized-image cache, and the total bytes it may hold
+IMAGE_CACHE_DIR = os.environ.get(
+    'STREAMIFY_IMAGE_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'image_cache')
+)
+IMAGE_CACHE_BYTES = int(os.environ.get('STREAMIFY_IMAGE_CACHE_BYTES', 1024 * 1024 * 1024))
+
+# Eviction brings the cache down to this fraction of its limit, so it doesn't
+# run again on the next write
+PRUNE_TO = 0.9
+
+# Writes between checks of the cache size
+PRUNE_EVERY = 200
+
+# A hit refreshes an image's last-use time at most this often (seconds)
+TOUCH_INTERVAL = 300
+
+# Seconds to wait for, and most bytes to accept from, a source image
+FETCH_TIMEOUT = 10
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+
+# Bump to regenerate every cached image (after changing how they're encoded)
+PIPELINE_VERSION = 1
+
+# Variant name -> (Movie image it is made from, width in pixels)
+IMAGE_VARIANTS = {
+    'poster-small': ('poster', 185),
+    'poster': ('poster', 342),
+    'poster-large': ('poster', 500),
+    'banner': ('banner', 780),
+    'banner-large': ('banner', 1280),
+}
+
+# Output format -> (Pillow format, MIME type, file extension, save options)
+IMAGE_FORMATS = {
+    'webp': ('WEBP', 'image/webp', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+class ImageError(Exception):
+    """A source image couldn't be fetched or decoded."""
+
+class ImageCache:
+    """
+    Content-addressed disk cache of encoded images, bounded by total size.
+
+    Each image is stored once under the SHA-256 of its bytes
+    (``blobs/ab/<sha256>.<ext>``), which is also its strong ETag. A small
+    key file (``keys/cd/<key>``) maps a (source, variant, format) key to
+    its blob. Files are written to a temporary name and renamed, so any
+    number of processes can share the directory. Eviction deletes the least
+    recently used blobs, by modification time, which hits refresh.
+    """
+
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, max_bytes: int = IMAGE_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._writes = 0
+
+    def _key_path(self, key: str) -> str:
+        return os.path.join(self.directory, 'keys', key[:2], key)
+
+    def _blob_path(self, blob: str) -> str:
+        return os.path.join(self.directory, 'blobs', blob[:2], blob)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """(path, ETag) of the image cached under ``key``, or None."""
+        try:
+            with open(self._key_path(key)) as f:
+                blob = f.read().strip()
+            path = self._blob_path(blob)
+            mtime = os.stat(path).st_mtime
+        except (OSError, ValueError):
+            return None
+        if mtime < time.time() - TOUCH_INTERVAL:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return path, blob.split('.')[0]
+
+    def put(self, key: str, data: bytes, extension: str) -> Tuple[str, str]:
+        """Store an image under ``key``; returns its (path, ETag)."""
+        digest = hashlib.sha256(data).hexdigest()
+        blob = f"{digest}.{extension}"
+        path = self._blob_path(blob)
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            self._write_atomic(path, data)
+        self._write_atomic(self._key_path(key), blob.encode())
+
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+        return path, digest
+
+    def size(self) -> int:
+        """Total bytes of the cached images."""
+        return sum(size for _, size, _ in self._blobs())
+
+    def _blobs(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every cached image."""
+        blobs = []
+        for root, _, files in os.walk(os.path.join(self.directory, 'blobs')):
+            for name in files:
+                if name.startswith('.tmp-'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                blobs.append((stat.st_mtime, stat.st_size, path))
+        return blobs
+
+    def prune(self) -> int:
+        """
+        Evict least recently used images until the cache fits in max_bytes,
+        then drop key files whose image is gone.
+
+        Returns:
+            Number of images evicted
+        """
+        blobs = self._blobs()
+        total = sum(size for _, size, _ in blobs)
+        evicted = 0
+        if total > self.max_bytes:
+            for _, size, path in sorted(blobs):
+                if total <= self.max_bytes * PRUNE_TO:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+        if evicted:
+            for root, _, files in os.walk(os.path.join(self.directory, 'keys')):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        with open(path) as f:
+                            blob = f.read().strip()
+                        if not blob.startswith('.') and not os.path.exists(self._blob_path(blob)):
+                            os.unlink(path)
+                    except (OSError, ValueError):
+                        continue
+        return evicted
+
+def cache_key(source_url: str, variant: str, fmt: str) -> str:
+    width = IMAGE_VARIANTS[variant][1]
+    return hashlib.sha256(f"{PIPELINE_VERSION}|{source_url}|{width}|{fmt}".encode()).hexdigest()
+
+def fetch_source(source_url: str) -> bytes:
+    """
+    The bytes of a source image: a file under the media directory or an
+    http(s) URL.
+
+    Raises:
+        ImageError: the image is missing, too large or couldn't be fetched
+    """
+    if is_local_media(source_url):
+        path = local_media_path(source_url)
+        if path is None or os.path.getsize(path) > MAX_SOURCE_BYTES:
+            raise ImageError(f"No usable image at {source_url}")
+        with open(path, 'rb') as f:
+            return f.read()
+
+    url = 'https:' + source_url if source_url.startswith('//') else source_url
+    try:
+        with requests.get(url, timeout=FETCH_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            data = response.raw.read(MAX_SOURCE_BYTES + 1, decode_content=True)
+    except requests.RequestException as e:
+        raise ImageError(f"Couldn't fetch {url}: {str(e)}")
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ImageError(f"{url} is larger than {MAX_SOURCE_BYTES} bytes")
+    return data
+
+def render_image(data: bytes, width: int, fmt: str) -> bytes:
+    """
+    Encode an image at most ``width`` pixels wide (never upscaled) in ``fmt``.
+
+    JPEG sources are decoded at a reduced scale when they are much larger
+    than the output, which makes resizing TMDB originals several times
+    faster.
+    """
+    pil_format, _, _, options = IMAGE_FORMATS[fmt]
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            source.draft('RGB', (width, width))
+            image = ImageOps.exif_transpose(source)
+            if image.width > width:
+                image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+            has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+            if has_alpha and pil_format == 'WEBP':
+                image = image.convert('RGBA')
+            elif has_alpha:
+                # JPEG has no alpha channel: flatten onto the page background
+                background = Image.new('RGB', image.size, (20, 20, 20))
+                background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+                image = background
+            else:
+                image = image.convert('RGB')
+            out = io.BytesIO()
+            image.save(out, pil_format, **options)
+            return out.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageError(f"Couldn't decode image: {str(e)}")
+
+def get_image(source_url: str, variant: str, fmt: str, cache: ImageCache) -> Tuple[str, str]:
+    """
+    (path, ETag) of a variant of an image, rendering it on a cache miss.
+
+    Raises:
+        ImageError: the source image couldn't be fetched or decoded
+    """
+    key = cache_key(source_url, variant, fmt)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    data = render_image(fetch_source(source_url), IMAGE_VARIANTS[variant][1], fmt)
+    return cache.put(key, data, IMAGE_FORMATS[fmt][2])
+
+def render_variants(source_url: str, variants: Iterable[str], formats: Iterable[str], cache: ImageCache) -> int:
+    """
+    Render every missing (variant, format) of one source image, fetching it
+    at most once.
+
+    Returns:
+        Number of images rendered
+    """
+    missing = [(variant, fmt) for variant in variants for fmt in formats
+               if cache.get(cache_key(source_url, variant, fmt)) is None]
+    if not missing:
+        return 0
+    data = fetch_source(source_url)
+    for variant, fmt in missing:
+        rendered = render_image(data, IMAGE_VARIANTS[variant][1], fmt)
+        cache.put(cache_key(source_url, variant, fmt), rendered, IMAGE_FORMATS[fmt][2])
+    return len(missing)
+
+def _prewarm_source(job: Tuple[str, List[str], List[str], str, int]) -> Tuple[int, Optional[str]]:
+    """Worker process entry point: render_variants for one source image."""
+    source_url, variants, formats, directory, max_bytes = job
+    try:
+        return render_variants(source_url, variants, formats, ImageCache(directory, max_bytes)), None
+    except ImageError as e:
+        return 0, str(e)
+
+def prewarm_images(
+    sources: Iterable[Tuple[str, str]],
+    cache: ImageCache,
+    formats: Iterable[str] = tuple(IMAGE_FORMATS),
+    workers: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Render the variants of many images with a process pool.
+
+    Args:
+        sources: (image kind, source URL) pairs, e.g. ('poster', movie.poster_url)
+        cache: Cache the images are rendered into
+        formats: Output formats to render
+        workers: Worker processes (default: one per CPU)
+
+    Returns:
+        Counts of the sources seen, images rendered and sources that failed
+    """
+    formats = list(formats)
+    variants_by_kind: Dict[str, List[str]] = {}
+    for variant, (kind, _) in IMAGE_VARIANTS.items():
+        variants_by_kind.setdefault(kind, []).append(variant)
+
+    jobs = {}
+    for kind, source_url in sources:
+        if source_url:
+            jobs.setdefault((kind, source_url), (
+                source_url, variants_by_kind[kind], formats, cache.directory, cache.max_bytes
+            ))
+
+    counts = {'sources': len(jobs), 'rendered': 0, 'failed': 0}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        for rendered, error in pool.map(_prewarm_source, jobs.values(), chunksize=16):
+            counts['rendered'] += rendered
+            if error:
+                counts['failed'] += 1
+                logger.warning(error)
+    cache.prune()
+    return counts
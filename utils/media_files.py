@@ -0,0 +1,193 @@
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from flask import request, send_file
+from werkzeug.security import safe_join
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
+# Directory holding the media files the app serves itself. A Movie.video_url
+# without a URL scheme is a path relative to it ("movies/inception.mp4").
+MEDIA_DIR = os.environ.get(
+    'STREAMIFY_MEDIA_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'media')
+)
+
+# Seconds browsers may reuse a media file before revalidating it (with
+# If-None-Match / If-Modified-Since, answered by a bodyless 304)
+MEDIA_MAX_AGE = 3600
+
+# Bytes per read when the server can't sendfile() a response
+MEDIA_BLOCK_SIZE = 64 * 1024
+
+# Hot files (HLS segments and playlists) kept in memory by FileCache
+FILE_CACHE_BYTES = int(os.environ.get('STREAMIFY_FILE_CACHE_BYTES', 64 * 1024 * 1024))
+FILE_CACHE_MAX_FILE = 4 * 1024 * 1024  # Larger files are always streamed from disk
+
+REMOTE_PREFIXES = ('http://', 'https://', '//')
+
+# Types mimetypes doesn't know on every platform
+MEDIA_TYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+    '.m4s': 'video/iso.segment',
+    '.mp4': 'video/mp4',
+}
+
+def media_type(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    return MEDIA_TYPES.get(extension) or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+def is_local_media(url: Optional[str]) -> bool:
+    """Whether ``url`` names a file under MEDIA_DIR rather than a remote URL."""
+    return bool(url) and not url.lower().startswith(REMOTE_PREFIXES)
+
+def local_media_path(url: Optional[str]) -> Optional[str]:
+    """
+    The file under MEDIA_DIR that ``url`` names.
+
+    Returns None for remote URLs, paths escaping MEDIA_DIR and missing files.
+    """
+    if not is_local_media(url):
+        return None
+    path = safe_join(MEDIA_DIR, url.lstrip('/'))
+    return path if path is not None and os.path.isfile(path) else None
+
+class FileRange:
+    """
+    Reads one byte range of an open file.
+
+    Exposes the file's descriptor, positioned at the start of the range, so a
+    WSGI server's file_wrapper can sendfile() it (gunicorn sends
+    Content-Length bytes from the current offset); servers that iterate
+    instead get reads that stop at the end of the range.
+    """
+
+    def __init__(self, file: Any, start: int, length: int):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self) -> None:
+        self.file.close()
+
+def send_media_file(path: str, mimetype: Optional[str] = None) -> Response:
+    """
+    Stream a file with Range, ETag and Last-Modified support.
+
+    Conditional requests get 304, Range requests 206 (416 when the range is
+    unsatisfiable). The body is handed to the server's wsgi.file_wrapper, so
+    the file is never read into memory: full responses are the file itself
+    and partial ones a FileRange. Must be called inside a request context.
+    """
+    response = send_file(path, mimetype=mimetype or media_type(path), conditional=True, etag=True,
+                         max_age=MEDIA_MAX_AGE)
+    # Werkzeug only sends this on 206s; players won't seek by range without it
+    response.headers['Accept-Ranges'] = 'bytes'
+
+    # Werkzeug serves ranges by wrapping the file in an iterator, which hides
+    # it from sendfile(); hand the server the range as a file instead
+    if response.status_code == 206 and not response.headers.get('X-Sendfile'):
+        response.response.close()
+        file_range = FileRange(open(path, 'rb'), response.content_range.start, response.content_length)
+        response.response = wrap_file(request.environ, file_range, MEDIA_BLOCK_SIZE)
+    return response
+
+class FileCache:
+    """
+    In-memory LRU of small, immutable files, bounded by their total size.
+
+    Entries are (contents, mtime, ETag) in an OrderedDict in least- to
+    most-recently-used order. Every lookup stats the file, and it is re-read
+    when its modification time or size changes.
+    """
+
+    def __init__(self, max_bytes: int = FILE_CACHE_BYTES, max_file: int = FILE_CACHE_MAX_FILE):
+        self.max_bytes = max_bytes
+        self.max_file = max_file
+        self.size = 0
+        self.hits = self.misses = 0
+        self._entries: 'OrderedDict[str, Tuple[bytes, float, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: str) -> Optional[Tuple[bytes, float, str]]:
+        """
+        (contents, mtime, ETag) of the file at ``path``, read through the cache.
+
+        Returns None for files too large to cache.
+        """
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[1] == stat.st_mtime and len(entry[0]) == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+        if stat.st_size > min(self.max_file, self.max_bytes):
+            return None
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        entry = (data, stat.st_mtime, f"{stat.st_mtime_ns:x}-{len(data):x}")
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.size -= len(old[0])
+            self._entries[path] = entry
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self), 'bytes': self.size}
+
+def send_cached_file(path: str, cache: FileCache, max_age: int = MEDIA_MAX_AGE,
+                     immutable: bool = False) -> Response:
+    """
+    Serve a file from ``cache``, like send_media_file but without reading
+    the file on hits (only a stat, to notice changes).
+
+    Files too large for the cache are streamed by send_media_file. With
+    ``immutable``, clients are told the file never changes (for files whose
+    URL changes with their contents). Must be called inside a request
+    context.
+    """
+    entry = cache.get(path)
+    if entry is None:
+        response = send_media_file(path)
+    else:
+        data, mtime, etag = entry
+        response = Response(data, mimetype=media_type(path))
+        response.set_etag(etag)
+        response.last_modified = mtime
+        response.make_conditional(request.environ, accept_ranges=True, complete_length=len(data))
+        response.headers['Accept-Ranges'] = 'bytes'
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.cache_control.no_cache = None
+    if immutable:
+        response.cache_control.immutable = True
+    return response
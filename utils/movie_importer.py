@@ -1,129 +1,531 @@
 import os
 import csv
 import ast
+import json
+import time
+import queue
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from sqlalchemy import func
-from models import Movie, db, Actor, MovieActor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, delete, func, inspect, insert, select, update
+from tqdm import tqdm
+from models import Movie, db, Actor, MovieActor, Genre, MovieGenre, ImportCheckpoint
+from utils.movie_search import index_cast_names
+from utils.movie_suggest import refresh_suggestion_index
 
-def import_movies_from_csv():
-    """Import movies from CSV files if database is empty."""
+MOVIES_CSV = 'tmdb_5000_movies.csv'
+CREDITS_CSV = 'tmdb_5000_credits.csv'
+BULK_BATCH_SIZE = 1000  # Movies written per transaction
+CAST_PER_MOVIE = 5  # Top-billed actors imported for each movie
+IN_CLAUSE_SIZE = 500  # Keeps IN (...) lists under SQLite's bound-parameter limit
+QUEUE_BATCHES_PER_WORKER = 2  # Parsed batches buffered ahead of the writer, per worker
+
+# Markers closing the writer queue
+_DONE = object()
+_ABORT = object()
+
+def parse_json_column(value: Optional[str]) -> Any:
+    """Parse a TMDB JSON column, falling back to literal_eval for Python reprs."""
+    if not value:
+        return []
     try:
-        # Check if movies already exist in the database
-        if Movie.query.first() is not None:
-            print("Movies already exist in the database. Skipping import.")
-            return
+        return json.loads(value)
+    except ValueError:
+        return ast.literal_eval(value)
+
+def parse_cast(value: Optional[str]) -> List[Dict[str, Any]]:
+    """Return the top-billed cast from a credits CSV ``cast`` value."""
+    return [{
+        'name': actor['name'],
+        'character': actor.get('character'),
+        'order': actor.get('order', 0)
+    } for actor in parse_json_column(value)[:CAST_PER_MOVIE]]
+
+def parse_movie_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Turn a movies CSV row into Movie column values.
+
+    ``genres`` (every genre name, in TMDB order) is not a Movie column; the
+    writer turns it into MovieGenre rows.
+    """
+    genres = parse_json_column(row.get('genres'))
+
+    release_year = None
+    if row.get('release_date'):
+        try:
+            release_year = int(row['release_date'].split('-')[0])
+        except (ValueError, IndexError):
+            pass
+
+    runtime = row.get('runtime')
+    now = datetime.utcnow()
+    return {
+        'tmdb_id': int(row['id']),
+        'title': (row.get('title') or 'Untitled Movie').strip(),
+        'description': (row.get('overview') or 'No description available.').strip(),
+        'release_year': release_year,
+        'genre': genres[0]['name'] if genres else 'Unknown',
+        'genres': [genre['name'] for genre in genres],
+        'rating': float(row['vote_average']) if row.get('vote_average') else 0.0,
+        'poster_url': f"https://image.tmdb.org/t/p/w500{row['poster_path']}" if row.get('poster_path') else None,
+        'banner_url': f"https://image.tmdb.org/t/p/original{row['backdrop_path']}" if row.get('backdrop_path') else None,
+        'duration': int(float(runtime)) if runtime else 0,
+        'language': row.get('original_language') or 'en',
+        'created_at': now,
+        'updated_at': now
+    }
+
+def _tmdb_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def iter_joined_rows(movies_csv: str, credits_csv: str, start_after: Optional[int] = None
+                     ) -> Iterator[Tuple[Dict[str, str], Optional[str]]]:
+    """
+    Stream ``(movie row, raw cast value)`` pairs joined on the TMDB id.
+
+    Both files are read incrementally. Credits rows read ahead of their
+    movie are held (cast column only) until that movie comes up, so memory
+    stays bounded when the two files share an order, as the TMDB export
+    does. Rows up to and including ``start_after`` are skipped, which is
+    how an interrupted import resumes.
+    """
+    with open(movies_csv, 'r', encoding='utf-8') as mf, open(credits_csv, 'r', encoding='utf-8') as cf:
+        movies = csv.DictReader(mf)
+        credits = csv.DictReader(cf)
+        pending: Dict[int, Optional[str]] = {}
+        skipped = set()
+        credits_done = False
+        skipping = start_after is not None
+
+        for row in movies:
+            tmdb_id = _tmdb_id(row.get('id'))
+            if skipping:
+                skipped.add(tmdb_id)
+                pending.pop(tmdb_id, None)
+                skipping = tmdb_id != start_after
+                continue
+
+            while tmdb_id is not None and tmdb_id not in pending and not credits_done:
+                credit_row = next(credits, None)
+                if credit_row is None:
+                    credits_done = True
+                    break
+                credit_id = _tmdb_id(credit_row.get('movie_id'))
+                if credit_id is None or credit_id in skipped:
+                    continue
+                pending[credit_id] = credit_row.get('cast')
+            yield row, pending.pop(tmdb_id, None)
+
+        if skipping:
+            print(f"Checkpoint movie {start_after} not found in {movies_csv}; nothing was resumed.")
+
+def parse_import_row(row: Dict[str, str], cast_value: Optional[str]
+                     ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Parse a joined movie row and its raw cast into ``(movie values, cast)``."""
+    return parse_movie_row(row), parse_cast(cast_value)
+
+def ensure_import_schema(conn) -> None:
+    """Add the import checkpoint and genre tables and Movie.tmdb_id to databases created before them."""
+    for table in (ImportCheckpoint.__table__, Genre.__table__, MovieGenre.__table__):
+        table.create(conn, checkfirst=True)
+    columns = {column['name'] for column in inspect(conn).get_columns('movie')}
+    if 'tmdb_id' not in columns:
+        conn.exec_driver_sql('ALTER TABLE movie ADD COLUMN tmdb_id INTEGER')
+        conn.exec_driver_sql('CREATE UNIQUE INDEX ix_movie_tmdb_id ON movie (tmdb_id)')
+    conn.commit()
+
+def _import_completed(conn, source: str) -> bool:
+    """Whether ``source`` has a completed import checkpoint (False before the checkpoint table exists)."""
+    if not inspect(conn).has_table(ImportCheckpoint.__tablename__):
+        return False
+    return bool(conn.execute(
+        select(ImportCheckpoint.completed).where(ImportCheckpoint.source == source)
+    ).scalar())
+
+@contextmanager
+def sqlite_bulk_load(conn):
+    """
+    Relax SQLite durability while a bulk import runs on ``conn``.
+
+    Switches the database to WAL and turns ``synchronous`` off for the
+    duration, restoring the previous ``synchronous`` level afterwards. A
+    no-op on other databases.
+    """
+    if conn.dialect.name != 'sqlite':
+        yield
+        return
+    synchronous = conn.exec_driver_sql('PRAGMA synchronous').scalar()
+    conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+    conn.exec_driver_sql('PRAGMA synchronous=OFF')
+    conn.commit()
+    try:
+        yield
+    finally:
+        conn.rollback()
+        conn.exec_driver_sql(f'PRAGMA synchronous={int(synchronous)}')
+        conn.commit()
+
+class BulkMovieWriter:
+    """
+    Upsert parsed movies and their cast in large batches.
+
+    Keeps in-memory maps of lower-cased actor names and of genre names to
+    ids (seeded from their tables) and hands out movie, actor and genre ids
+    itself, so each batch is a handful of executemany statements in a
+    single transaction. Movies whose ``tmdb_id`` is already stored are
+    updated in place and get their cast and genres replaced, which makes
+    re-importing a file idempotent.
+    When ``source`` is given, the batch's ImportCheckpoint is committed in
+    the same transaction. Assumes it is the only writer while the import
+    runs.
+    """
+
+    def __init__(self, conn, source: Optional[str] = None):
+        self.conn = conn
+        self.source = source
+        self.actor_ids: Dict[str, int] = {
+            name.lower(): actor_id
+            for actor_id, name in conn.execute(select(Actor.id, Actor.name))
+        }
+        self.next_movie_id = (conn.execute(select(func.max(Movie.id))).scalar() or 0) + 1
+        self.next_actor_id = (conn.execute(select(func.max(Actor.id))).scalar() or 0) + 1
+        self.genre_ids: Dict[str, int] = {
+            name: genre_id for genre_id, name in conn.execute(select(Genre.id, Genre.name))
+        }
+        self.next_genre_id = max(self.genre_ids.values(), default=0) + 1
+        self.rows_imported = 0
+        self.last_tmdb_id = None
+        if source is not None:
+            checkpoint = conn.execute(
+                select(ImportCheckpoint.rows_imported, ImportCheckpoint.last_tmdb_id)
+                .where(ImportCheckpoint.source == source)
+            ).first()
+            if checkpoint is not None:
+                self.rows_imported = checkpoint.rows_imported or 0
+                self.last_tmdb_id = checkpoint.last_tmdb_id
+        conn.commit()
+
+    def _existing_movie_ids(self, tmdb_ids: List[int]) -> Dict[int, int]:
+        """Map the already stored ``tmdb_ids`` to their Movie ids."""
+        existing = {}
+        for start in range(0, len(tmdb_ids), IN_CLAUSE_SIZE):
+            existing.update(self.conn.execute(
+                select(Movie.tmdb_id, Movie.id).where(Movie.tmdb_id.in_(tmdb_ids[start:start + IN_CLAUSE_SIZE]))
+            ).all())
+        return existing
+
+    def _save_checkpoint(self, last_tmdb_id: Optional[int], rows_imported: int, completed: bool) -> None:
+        table = ImportCheckpoint.__table__
+        values = {'last_tmdb_id': last_tmdb_id, 'rows_imported': rows_imported,
+                  'completed': completed, 'updated_at': datetime.utcnow()}
+        result = self.conn.execute(update(table).where(table.c.source == self.source).values(**values))
+        if result.rowcount == 0:
+            self.conn.execute(insert(table).values(source=self.source, **values))
+
+    def write(self, batch: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> int:
+        """
+        Upsert one batch of ``(movie values, cast)`` pairs and commit it.
+
+        Returns:
+            Number of movies written
+        """
+        if not batch:
+            return 0
+        # A TMDB id repeated within the batch keeps its last row
+        by_tmdb_id = {values['tmdb_id']: (values, cast) for values, cast in batch}
+        existing = self._existing_movie_ids(list(by_tmdb_id))
+
+        now = datetime.utcnow()
+        new_movies, updated_movies, actors, movie_actors = [], [], [], []
+        genres, movie_genres = [], []
+        actor_ids, genre_ids = dict(self.actor_ids), dict(self.genre_ids)
+        next_movie_id, next_actor_id = self.next_movie_id, self.next_actor_id
+        next_genre_id = self.next_genre_id
+
+        for tmdb_id, (values, cast) in by_tmdb_id.items():
+            values = dict(values)
+            genre_names = values.pop('genres', [])
+            movie_id = existing.get(tmdb_id)
+            if movie_id is None:
+                movie_id = next_movie_id
+                next_movie_id += 1
+                new_movies.append(dict(values, id=movie_id))
+            else:
+                updated = {key: value for key, value in values.items() if key != 'created_at'}
+                updated_movies.append(dict(updated, movie_pk=movie_id))
+
+            for position, name in enumerate(dict.fromkeys(genre_names)):
+                genre_id = genre_ids.get(name)
+                if genre_id is None:
+                    genre_id = genre_ids[name] = next_genre_id
+                    next_genre_id += 1
+                    genres.append({'id': genre_id, 'name': name, 'created_at': now})
+                movie_genres.append({'movie_id': movie_id, 'genre_id': genre_id, 'position': position})
 
-        movies_csv = 'tmdb_5000_movies.csv'
-        credits_csv = 'tmdb_5000_credits.csv'
+            seen = set()
+            for actor_data in cast:
+                key = actor_data['name'].lower()
+                actor_id = actor_ids.get(key)
+                if actor_id is None:
+                    actor_id = actor_ids[key] = next_actor_id
+                    next_actor_id += 1
+                    actors.append({'id': actor_id, 'name': actor_data['name'],
+                                   'created_at': now, 'updated_at': now})
+                if actor_id in seen:
+                    continue  # Same actor credited twice; (movie, actor) is unique
+                seen.add(actor_id)
+                movie_actors.append({
+                    'movie_id': movie_id,
+                    'actor_id': actor_id,
+                    'character_name': actor_data['character'],
+                    'cast_order': actor_data['order'],
+                    'created_at': now,
+                    'updated_at': now
+                })
 
+        movie_table = Movie.__table__
+        rows_imported = self.rows_imported + len(by_tmdb_id)
+        try:
+            replaced = list(existing.values())
+            for start in range(0, len(replaced), IN_CLAUSE_SIZE):
+                for table in (MovieActor.__table__, MovieGenre.__table__):
+                    self.conn.execute(delete(table).where(
+                        table.c.movie_id.in_(replaced[start:start + IN_CLAUSE_SIZE])
+                    ))
+            # Movies go in before the rows that reference them
+            if new_movies:
+                self.conn.execute(insert(movie_table), new_movies)
+            if updated_movies:
+                self.conn.execute(
+                    update(movie_table).where(movie_table.c.id == bindparam('movie_pk')),
+                    updated_movies
+                )
+            if actors:
+                self.conn.execute(insert(Actor.__table__), actors)
+            if movie_actors:
+                self.conn.execute(insert(MovieActor.__table__), movie_actors)
+            # The search index picks up each movie's cast once its credits are in
+            indexed = [movie['id'] for movie in new_movies] + replaced
+            for start in range(0, len(indexed), IN_CLAUSE_SIZE):
+                index_cast_names(self.conn, indexed[start:start + IN_CLAUSE_SIZE])
+            if genres:
+                self.conn.execute(insert(Genre.__table__), genres)
+            if movie_genres:
+                self.conn.execute(insert(MovieGenre.__table__), movie_genres)
+            if self.source is not None:
+                self._save_checkpoint(batch[-1][0]['tmdb_id'], rows_imported, False)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        # Only advance once the batch is committed
+        self.actor_ids, self.genre_ids = actor_ids, genre_ids
+        self.next_movie_id, self.next_actor_id = next_movie_id, next_actor_id
+        self.next_genre_id = next_genre_id
+        self.rows_imported = rows_imported
+        self.last_tmdb_id = batch[-1][0]['tmdb_id']
+        return len(by_tmdb_id)
+
+    def finish(self) -> None:
+        """Mark the source's checkpoint as a completed import."""
+        if self.source is not None:
+            self._save_checkpoint(self.last_tmdb_id, self.rows_imported, True)
+            self.conn.commit()
+
+def parse_import_chunk(chunk: List[Tuple[Dict[str, str], Optional[str]]]
+                       ) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """Parse a chunk of joined rows, skipping (and reporting) unparsable ones."""
+    parsed = []
+    for row, cast_value in chunk:
+        try:
+            parsed.append(parse_import_row(row, cast_value))
+        except (ValueError, KeyError, SyntaxError, TypeError) as e:
+            print(f"Error processing movie {row.get('title')}: {str(e)}")
+    return parsed
+
+def iter_parsed_batches(movies_csv: str, credits_csv: str, start_after: Optional[int] = None,
+                        batch_size: int = BULK_BATCH_SIZE, workers: int = 1
+                        ) -> Iterator[List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]]:
+    """
+    Yield parsed batches of ``(movie values, cast)`` in file order.
+
+    With ``workers > 1`` the joined row chunks are parsed in a process pool,
+    with at most ``workers * QUEUE_BATCHES_PER_WORKER`` chunks in flight.
+    """
+    joined = iter_joined_rows(movies_csv, credits_csv, start_after)
+    chunks = iter(lambda: list(islice(joined, batch_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield parse_import_chunk(chunk)
+        return
+
+    context = None
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(parse_import_chunk, chunk))
+            if len(in_flight) >= workers * QUEUE_BATCHES_PER_WORKER:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def _write_batches(conn, source: str, batches: Iterable[Any], bar) -> Tuple[int, bool]:
+    """
+    Write parsed batches through a BulkMovieWriter until ``_DONE`` or ``_ABORT``.
+
+    Returns:
+        Number of movies written and whether the source was completed
+    """
+    writer = BulkMovieWriter(conn, source)
+    imported = 0
+    for batch in batches:
+        if batch is _ABORT:
+            return imported, False
+        if batch is _DONE:
+            break
+        if batch:
+            imported += writer.write(batch)
+            bar.update(len(batch))
+    writer.finish()
+    return imported, True
+
+def _threaded_import(engine, source: str, batches: Iterator[Any], bar) -> int:
+    """
+    Write ``batches`` from a dedicated writer thread fed through a bounded queue.
+
+    The queue gives backpressure: parsing blocks once the writer falls
+    ``maxsize`` batches behind, and the database only ever sees one writer.
+    """
+    pending: queue.Queue = queue.Queue(maxsize=QUEUE_BATCHES_PER_WORKER * 2)
+    outcome: Dict[str, Any] = {}
+
+    def run_writer():
+        try:
+            with engine.connect() as conn, sqlite_bulk_load(conn):
+                outcome['imported'], _ = _write_batches(conn, source, iter(pending.get, None), bar)
+        except BaseException as e:
+            outcome['error'] = e
+            # Unblock the producer
+            while True:
+                try:
+                    pending.get_nowait()
+                except queue.Empty:
+                    break
+
+    thread = threading.Thread(target=run_writer, name='movie-import-writer', daemon=True)
+    thread.start()
+
+    def put(item):
+        while thread.is_alive():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for batch in batches:
+            if not put(batch):
+                break
+        put(_DONE)
+    except BaseException:
+        put(_ABORT)
+        raise
+    finally:
+        thread.join()
+
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['imported']
+
+def import_movies_from_csv(movies_csv: str = MOVIES_CSV, credits_csv: str = CREDITS_CSV,
+                           batch_size: int = BULK_BATCH_SIZE, force: bool = False,
+                           progress: bool = True, workers: int = 1) -> bool:
+    """
+    Import movies from CSV files if they haven't been imported yet.
+
+    Movies and credits are streamed and joined row by row, parsed in
+    ``batch_size`` chunks and written by a BulkMovieWriter, one transaction
+    per batch, with SQLite tuned for bulk load. With ``workers > 1`` the
+    chunks are parsed in a process pool while a single writer thread
+    inserts them. Each batch commits an ImportCheckpoint for the movies
+    file, so an interrupted import resumes after the last committed movie
+    on the next call. A completed import (or, without a checkpoint, a
+    non-empty catalog) is skipped unless ``force`` is set; forced re-imports
+    upsert on the TMDB id instead of duplicating movies. A completed import
+    is recognised from its checkpoint alone, without the schema checks.
+
+    Returns:
+        True if any movies were imported
+    """
+    try:
         # Check if CSV files exist
         if not (os.path.exists(movies_csv) and os.path.exists(credits_csv)):
             print("CSV files not found. Skipping movie import.")
-            return
-
-        print("Starting movie import from CSV files...")
-        
-        # First, read all credits to create a mapping of movie_id to actors
-        movie_credits = {}
-        with open(credits_csv, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    movie_id = int(row['movie_id'])
-                    cast = ast.literal_eval(row['cast'])
-                    movie_credits[movie_id] = [{
-                        'name': actor['name'],
-                        'character': actor['character'],
-                        'order': actor['order']
-                    } for actor in cast[:5]]  # Limit to top 5 actors per movie
-                except (ValueError, KeyError, SyntaxError) as e:
-                    print(f"Error processing credits for movie: {e}")
-                    continue
+            return False
+
+        source = os.path.basename(movies_csv)
+        engine = db.engine
+        with engine.connect() as conn:
+            if not force and _import_completed(conn, source):
+                return False
+            ensure_import_schema(conn)
+            checkpoint = conn.execute(
+                select(ImportCheckpoint.last_tmdb_id, ImportCheckpoint.rows_imported,
+                       ImportCheckpoint.completed)
+                .where(ImportCheckpoint.source == source)
+            ).first()
+            has_movies = conn.execute(select(Movie.id).limit(1)).first() is not None
+            if force and checkpoint is not None:
+                conn.execute(delete(ImportCheckpoint.__table__).where(ImportCheckpoint.source == source))
+                checkpoint = None
+            conn.commit()
+
+        start_after = None
+        if checkpoint is not None and checkpoint.completed:
+            print(f"{source} has already been imported. Skipping import.")
+            return False
+        elif checkpoint is not None:
+            start_after = checkpoint.last_tmdb_id
+            print(f"Resuming movie import from {source} after TMDB id {start_after}...")
+        elif has_movies and not force:
+            print("Movies already exist in the database. Skipping import.")
+            return False
+
+        print(f"Starting movie import from CSV files ({workers} parse worker(s))...")
+        start = time.perf_counter()
+        batches = iter_parsed_batches(movies_csv, credits_csv, start_after, batch_size, workers)
+        initial = (checkpoint.rows_imported or 0) if checkpoint is not None else 0
+        with tqdm(unit='movie', initial=initial, disable=not progress) as bar:
+            if workers > 1:
+                imported = _threaded_import(engine, source, batches, bar)
+            else:
+                with engine.connect() as conn, sqlite_bulk_load(conn):
+                    imported, _ = _write_batches(conn, source, batches, bar)
+
+        # The import wrote through its own connection; drop stale session state.
+        # Forced re-imports may have updated existing movies, so the suggestion
+        # index is rebuilt rather than extended.
+        db.session.expire_all()
+        with engine.connect() as conn:
+            refresh_suggestion_index(conn, rebuild=True)
+
+        elapsed = time.perf_counter() - start
+        print(f"Successfully imported {imported} movies from CSV files in {elapsed:.1f}s.")
+        return imported > 0
 
-        # Then import movies
-        with open(movies_csv, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    # Parse genres (they're stored as JSON strings)
-                    genres = ast.literal_eval(row.get('genres', '[]'))
-                    genre = genres[0]['name'] if genres else 'Unknown'
-                    
-                    # Get release year from release_date
-                    release_year = None
-                    if row.get('release_date'):
-                        try:
-                            release_year = int(row['release_date'].split('-')[0])
-                        except (ValueError, IndexError):
-                            pass
-                    
-                    # Handle poster and banner URLs
-                    poster_url = None
-                    if row.get('poster_path'):
-                        poster_url = f"https://image.tmdb.org/t/p/w500{row['poster_path']}"
-                    
-                    banner_url = None
-                    if row.get('backdrop_path'):
-                        banner_url = f"https://image.tmdb.org/t/p/original{row['backdrop_path']}"
-                    
-                    # Create movie
-                    movie = Movie(
-                        title=row.get('title', 'Untitled Movie').strip(),
-                        description=row.get('overview', 'No description available.').strip(),
-                        release_year=release_year,
-                        genre=genre,
-                        rating=float(row.get('vote_average', 0)) if row.get('vote_average') else 0.0,
-                        poster_url=poster_url,
-                        banner_url=banner_url,
-                        duration=row.get('runtime', 0) or 0,
-                        language=row.get('original_language', 'en'),
-                        created_at=datetime.utcnow(),
-                        updated_at=datetime.utcnow()
-                    )
-                    
-                    db.session.add(movie)
-                    db.session.flush()  # Get the movie ID for actor association
-                    
-                    # Add actors if available
-                    movie_id = int(row.get('id', 0))
-                    if movie_id in movie_credits:
-                        for actor_data in movie_credits[movie_id]:
-                            # Find or create actor
-                            actor = Actor.query.filter(
-                                func.lower(Actor.name) == func.lower(actor_data['name'])
-                            ).first()
-                            
-                            if not actor:
-                                actor = Actor(
-                                    name=actor_data['name'],
-                                    created_at=datetime.utcnow(),
-                                    updated_at=datetime.utcnow()
-                                )
-                                db.session.add(actor)
-                                db.session.flush()
-                            
-                            # Create movie-actor association
-                            movie_actor = MovieActor(
-                                movie_id=movie.id,
-                                actor_id=actor.id,
-                                character_name=actor_data['character'],
-                                cast_order=actor_data['order'],
-                                created_at=datetime.utcnow(),
-                                updated_at=datetime.utcnow()
-                            )
-                            db.session.add(movie_actor)
-                    
-                    # Commit every 50 records to avoid memory issues
-                    if Movie.query.count() % 50 == 0:
-                        db.session.commit()
-                        
-                except Exception as e:
-                    print(f"Error processing movie {row.get('title')}: {str(e)}")
-                    db.session.rollback()
-        
-        db.session.commit()
-        print(f"Successfully imported {Movie.query.count()} movies from CSV files.")
-        
     except Exception as e:
         print(f"Error during movie import: {str(e)}")
         db.session.rollback()
@@ -0,0 +1,198 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func, literal, select, tuple_
+from models import Movie, Genre, MovieGenre, db
+
+# Sort options offered by the movie listings: (sort column, descending, value used for NULL)
+SORT_KEYS = {
+    'rating_desc': (Movie.rating, True, 0.0),
+    'rating_asc': (Movie.rating, False, 0.0),
+    'title_asc': (Movie.title, False, ''),
+    'title_desc': (Movie.title, True, ''),
+    'year_desc': (Movie.release_year, True, 0),
+    'year_asc': (Movie.release_year, False, 0),
+}
+DEFAULT_SORT = 'rating_desc'
+PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+# Columns the movie cards need
+CARD_COLUMNS = (Movie.id, Movie.title, Movie.poster_url, Movie.release_year, Movie.rating)
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that is malformed or belongs to another sort."""
+    pass
+
+def normalize_sort(sort: Optional[str]) -> str:
+    """The listing sort to use for a requested one (unknown sorts get the default)."""
+    return sort if sort in SORT_KEYS else DEFAULT_SORT
+
+def sort_key(sort: str) -> Tuple[Any, bool]:
+    """The (NULL-free) sort expression of a listing sort and whether it descends."""
+    column, descending, null_value = SORT_KEYS.get(sort, SORT_KEYS[DEFAULT_SORT])
+    return func.coalesce(column, null_value), descending
+
+def sort_order(sort: str) -> Tuple[Any, ...]:
+    """ORDER BY clauses for a listing sort, with Movie.id as the tie-breaker."""
+    key, descending = sort_key(sort)
+    if descending:
+        return key.desc(), Movie.id.desc()
+    return key.asc(), Movie.id.asc()
+
+def encode_cursor(sort: str, key_value: Any, movie_id: int) -> str:
+    """Opaque cursor for the position just after (key_value, movie_id) in ``sort`` order."""
+    payload = json.dumps([sort, key_value, movie_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    """
+    Read a cursor made by encode_cursor for ``sort``.
+    
+    Raises:
+        InvalidCursor: If the cursor can't be decoded or was made for another sort
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, key_value, movie_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise InvalidCursor('Malformed cursor')
+    if cursor_sort != sort or not isinstance(movie_id, int):
+        raise InvalidCursor('Cursor does not match the requested sort')
+    return key_value, movie_id
+
+def paginate(stmt, sort: str = DEFAULT_SORT, cursor: Optional[str] = None,
+             limit: int = PAGE_SIZE, key: Optional[Tuple[Any, bool]] = None
+             ) -> Tuple[List[Any], Optional[str]]:
+    """
+    Run one keyset page of a movie select in ``sort`` order.
+    
+    Pages are positioned with a row-value comparison on (sort key, id)
+    rather than OFFSET, so every page costs the same at any depth and rows
+    don't shift between pages when the catalog changes. The rows gain
+    ``sort_key`` and ``cursor_id`` columns.
+    
+    Args:
+        stmt: A select over Movie (columns or the entity)
+        sort: One of SORT_KEYS
+        cursor: ``next_cursor`` of the previous page, None for the first page
+        limit: Page size
+        key: (expression, descending) to order by instead of the sort's own
+            key, for sorts outside SORT_KEYS; ``sort`` then only names the
+            cursors
+        
+    Returns:
+        The page's rows and the cursor of the next page (None on the last page)
+        
+    Raises:
+        InvalidCursor: If ``cursor`` is not a cursor of this sort
+    """
+    if key is None:
+        sort = normalize_sort(sort)
+        key = sort_key(sort)
+    key, descending = key
+    stmt = stmt.add_columns(key.label('sort_key'), Movie.id.label('cursor_id'))
+    if cursor:
+        key_value, movie_id = decode_cursor(cursor, sort)
+        position = tuple_(key, Movie.id)
+        after = tuple_(literal(key_value), literal(movie_id))
+        stmt = stmt.where(position < after if descending else position > after)
+    order = (key.desc(), Movie.id.desc()) if descending else (key.asc(), Movie.id.asc())
+    rows = db.session.execute(stmt.order_by(*order).limit(limit + 1)).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, rows[-1].sort_key, rows[-1].cursor_id)
+    return rows, next_cursor
+
+def genre_names() -> List[str]:
+    """Names of the genres that have at least one movie, alphabetically."""
+    stmt = (
+        select(Genre.name)
+        .where(select(MovieGenre.movie_id).where(MovieGenre.genre_id == Genre.id).exists())
+        .order_by(Genre.name)
+    )
+    return list(db.session.scalars(stmt))
+
+def genre_movies_page(genre: str, sort: str = DEFAULT_SORT, cursor: Optional[str] = None,
+                      limit: int = PAGE_SIZE) -> Tuple[List[Any], Optional[str]]:
+    """One keyset page (see paginate) of the card rows of the movies in ``genre``."""
+    stmt = (
+        select(*CARD_COLUMNS)
+        .join(MovieGenre, MovieGenre.movie_id == Movie.id)
+        .join(Genre, Genre.id == MovieGenre.genre_id)
+        .where(Genre.name == genre)
+    )
+    return paginate(stmt, sort, cursor, limit)
+
+def top_movies_per_genre(per_genre: int, sort: str = DEFAULT_SORT) -> Dict[str, List[Any]]:
+    """
+    The first ``per_genre`` movies of every genre, in ``sort`` order.
+
+    One query: ROW_NUMBER() over each genre's movies picks the rows, so
+    only the returned cards are read into Python. Each row also carries its
+    ``sort_key``, so a genre's next page can start after its last row.
+
+    Returns:
+        Genre name -> card rows (id, title, poster_url, release_year, rating,
+        sort_key), genres in alphabetical order
+    """
+    ranked = (
+        select(
+            Genre.name.label('genre'),
+            *CARD_COLUMNS,
+            sort_key(sort)[0].label('sort_key'),
+            func.row_number().over(partition_by=MovieGenre.genre_id, order_by=sort_order(sort)).label('rank')
+        )
+        .join_from(MovieGenre, Genre, Genre.id == MovieGenre.genre_id)
+        .join(Movie, Movie.id == MovieGenre.movie_id)
+        .subquery()
+    )
+    stmt = (
+        select(ranked.c.genre, ranked.c.id, ranked.c.title, ranked.c.poster_url,
+               ranked.c.release_year, ranked.c.rating, ranked.c.sort_key)
+        .where(ranked.c.rank <= per_genre)
+        .order_by(ranked.c.genre, ranked.c.rank)
+    )
+    movies_by_genre: Dict[str, List[Any]] = OrderedDict()
+    for row in db.session.execute(stmt):
+        movies_by_genre.setdefault(row.genre, []).append(row)
+    return movies_by_genre
+
+def top_movies_per_primary_genre(per_genre: int) -> Dict[str, List[Any]]:
+    """
+    The ``per_genre`` highest-rated movies for each primary genre (Movie.genre).
+
+    One query: ROW_NUMBER() OVER (PARTITION BY genre ORDER BY rating DESC)
+    ranks movie ids straight off the covering ix_movie_genre_rating index
+    (no sort, no table reads), and only the winners are joined back to
+    movie for the card columns, returned as plain rows rather than ORM
+    objects.
+
+    Returns:
+        Genre -> card rows (id, title, poster_url, release_year, rating, genre),
+        genres in alphabetical order
+    """
+    ranked = (
+        select(
+            Movie.id,
+            func.row_number().over(
+                partition_by=Movie.genre, order_by=(Movie.rating.desc(), Movie.id.asc())
+            ).label('rank')
+        )
+        .where(Movie.genre.isnot(None), Movie.genre != '')
+        .subquery()
+    )
+    stmt = (
+        select(*CARD_COLUMNS, Movie.genre)
+        .join(ranked, ranked.c.id == Movie.id)
+        .where(ranked.c.rank <= per_genre)
+        .order_by(Movie.genre, ranked.c.rank)
+    )
+    movies_by_genre: Dict[str, List[Any]] = OrderedDict()
+    for row in db.session.execute(stmt):
+        movies_by_genre.setdefault(row.genre, []).append(row)
+    return movies_by_genre
@@ -0,0 +1,228 @@
+import re
+from typing import Any, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+from sqlalchemy import bindparam, event, func, literal, literal_column, or_, select, text, tuple_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql import column, table
+from models import Movie, MovieActor, db
+from utils.movie_queries import decode_cursor, encode_cursor, paginate, normalize_sort, PAGE_SIZE
+
+# Sort of search results by BM25 relevance (the other sorts are the listing ones)
+RELEVANCE_SORT = 'relevance'
+
+# BM25 weights of the indexed columns: title, description, genre, cast_names
+SEARCH_COLUMN_WEIGHTS = (10.0, 1.0, 2.0, 4.0)
+
+# FTS5 table over the searchable text of every movie; its rowid is movie.id.
+# It keeps its own copy of the text because cast names live in other tables.
+# prefix='2 3' indexes short prefixes so typeahead queries stay cheap.
+CREATE_SEARCH_INDEX = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS movie_fts USING fts5("
+    "title, description, genre, cast_names, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+# Space-separated cast names of the movie with id {movie_id}
+CAST_NAMES = (
+    "coalesce((SELECT group_concat(actor.name, ' ') FROM movie_actor "
+    "JOIN actor ON actor.id = movie_actor.actor_id WHERE movie_actor.movie_id = {movie_id}), '')"
+)
+
+# Triggers keeping movie_fts in step with movie. A new movie is indexed with
+# the credits already written for it; credits changed later are re-indexed
+# with index_cast_names (only the importer writes movie_actor). A trigger per
+# credit would re-index the whole movie once per actor.
+SEARCH_INDEX_TRIGGERS = {
+    'movie_fts_insert': (
+        "CREATE TRIGGER IF NOT EXISTS movie_fts_insert AFTER INSERT ON movie BEGIN "
+        "INSERT INTO movie_fts (rowid, title, description, genre, cast_names) "
+        "VALUES (new.id, new.title, new.description, new.genre, " + CAST_NAMES.format(movie_id='new.id') + "); "
+        "END"
+    ),
+    'movie_fts_update': (
+        "CREATE TRIGGER IF NOT EXISTS movie_fts_update AFTER UPDATE OF title, description, genre ON movie BEGIN "
+        "UPDATE movie_fts SET title = new.title, description = new.description, genre = new.genre "
+        "WHERE rowid = new.id; "
+        "END"
+    ),
+    'movie_fts_delete': (
+        "CREATE TRIGGER IF NOT EXISTS movie_fts_delete AFTER DELETE ON movie BEGIN "
+        "DELETE FROM movie_fts WHERE rowid = old.id; "
+        "END"
+    ),
+}
+
+REBUILD_SEARCH_INDEX = (
+    "INSERT INTO movie_fts (rowid, title, description, genre, cast_names) "
+    "SELECT movie.id, movie.title, movie.description, movie.genre, "
+    + CAST_NAMES.format(movie_id='movie.id') + " FROM movie"
+)
+
+INDEX_CAST_NAMES = text(
+    "UPDATE movie_fts SET cast_names = " + CAST_NAMES.format(movie_id='movie_fts.rowid')
+    + " WHERE rowid IN :movie_ids"
+).bindparams(bindparam('movie_ids', expanding=True))
+
+movie_fts = table('movie_fts', column('rowid'))
+
+# Engine -> whether its database has the search index (checked once per engine)
+_index_available: 'WeakKeyDictionary[Any, bool]' = WeakKeyDictionary()
+
+def create_search_index(conn) -> bool:
+    """
+    Create the movie_fts index and its sync triggers if they are missing.
+
+    A new index is filled from the existing movies. Does not commit.
+
+    Returns:
+        False if the database can't hold the index (not SQLite, or SQLite
+        built without FTS5), True otherwise
+    """
+    available = False
+    if conn.dialect.name == 'sqlite':
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'movie_fts'"
+        )).first() is not None
+        try:
+            conn.execute(text(CREATE_SEARCH_INDEX))
+            available = True
+        except OperationalError:
+            pass  # no such module: fts5
+        if available:
+            for statement in SEARCH_INDEX_TRIGGERS.values():
+                conn.execute(text(statement))
+            if not exists:
+                rebuild_search_index(conn)
+    _index_available[conn.engine] = available
+    return available
+
+def drop_search_index(conn) -> None:
+    """Drop the movie_fts index and its triggers, if present. Does not commit."""
+    if conn.dialect.name == 'sqlite':
+        for name in SEARCH_INDEX_TRIGGERS:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+        conn.execute(text("DROP TABLE IF EXISTS movie_fts"))
+    _index_available.pop(conn.engine, None)
+
+def rebuild_search_index(conn) -> int:
+    """
+    Re-index every movie. Does not commit.
+
+    Returns:
+        Number of movies indexed
+    """
+    conn.execute(text("DELETE FROM movie_fts"))
+    return conn.execute(text(REBUILD_SEARCH_INDEX)).rowcount
+
+def has_search_index(conn) -> bool:
+    """Whether the connection's database has the movie_fts index (checked once per engine)."""
+    if conn.engine not in _index_available:
+        _index_available[conn.engine] = conn.dialect.name == 'sqlite' and conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'movie_fts'"
+        )).first() is not None
+    return _index_available[conn.engine]
+
+def search_index_available() -> bool:
+    """Whether the application's database has the movie_fts index."""
+    return has_search_index(db.session.connection())
+
+def index_cast_names(conn, movie_ids: List[int]) -> None:
+    """Re-index the cast names of some movies after their credits changed. Does not commit."""
+    if not movie_ids or not has_search_index(conn):
+        return
+    conn.execute(INDEX_CAST_NAMES, {'movie_ids': movie_ids})
+
+# New databases get the index with their tables (movie_actor is created after
+# the tables the index reads, and dropped before them)
+event.listen(MovieActor.__table__, 'after_create', lambda target, conn, **kw: create_search_index(conn))
+event.listen(MovieActor.__table__, 'before_drop', lambda target, conn, **kw: drop_search_index(conn))
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    FTS5 query for a user's search text.
+
+    Every word must match; the last one also matches as a prefix, so
+    partially typed words find results. Words are quoted, so FTS5
+    operators in the text are treated as plain words.
+
+    Returns:
+        The MATCH expression, or None if the text has no words
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"' for word in words) + '*'
+
+def search_movies(query: str, sort: Optional[str] = RELEVANCE_SORT, cursor: Optional[str] = None,
+                  limit: int = PAGE_SIZE) -> Tuple[List[Movie], Optional[str], str]:
+    """
+    One keyset page (see paginate) of the movies matching a search.
+
+    With the FTS5 index, movies match on title, description, genre and
+    cast names and the relevance sort ranks them by weighted BM25.
+    Without it (FTS5 not compiled in, or the database not migrated yet),
+    titles and descriptions are matched with ILIKE and relevance falls back
+    to the default listing sort.
+
+    Args:
+        query: The user's search text
+        sort: RELEVANCE_SORT or one of the listing sorts
+        cursor: ``next_cursor`` of the previous page, None for the first page
+        limit: Page size
+
+    Returns:
+        The page's movies, the cursor of the next page (None on the last
+        page) and the sort that was applied
+
+    Raises:
+        InvalidCursor: If ``cursor`` is not a cursor of the applied sort
+    """
+    if sort != RELEVANCE_SORT:
+        sort = normalize_sort(sort)
+    match = match_expression(query)
+    if match is None:
+        return [], None, sort
+
+    if not search_index_available():
+        sort = normalize_sort(None if sort == RELEVANCE_SORT else sort)
+        stmt = select(Movie).where(or_(
+            Movie.title.ilike(f'%{query}%'),
+            Movie.description.ilike(f'%{query}%')
+        ))
+        rows, next_cursor = paginate(stmt, sort, cursor, limit)
+        return [row.Movie for row in rows], next_cursor, sort
+
+    if sort == RELEVANCE_SORT:
+        movies, next_cursor = relevance_page(match, cursor, limit)
+        return movies, next_cursor, sort
+    matches = select(movie_fts.c.rowid).where(literal_column('movie_fts').match(match))
+    rows, next_cursor = paginate(select(Movie).where(Movie.id.in_(matches)), sort, cursor, limit)
+    return [row.Movie for row in rows], next_cursor, sort
+
+def relevance_page(match: str, cursor: Optional[str] = None,
+                   limit: int = PAGE_SIZE) -> Tuple[List[Movie], Optional[str]]:
+    """
+    One keyset page of the movies matching an FTS5 expression, best BM25 score first.
+
+    The cursor position and the LIMIT are applied inside the full-text
+    query, so only the page's rows are joined to movie and sorted again.
+
+    Raises:
+        InvalidCursor: If ``cursor`` is not a relevance cursor
+    """
+    score = func.bm25(literal_column('movie_fts'), *SEARCH_COLUMN_WEIGHTS)
+    ranked = select(movie_fts.c.rowid, score.label('score')).where(literal_column('movie_fts').match(match))
+    if cursor:
+        score_value, movie_id = decode_cursor(cursor, RELEVANCE_SORT)
+        ranked = ranked.where(tuple_(score, movie_fts.c.rowid) > tuple_(literal(score_value), literal(movie_id)))
+    # BM25 scores are negative; the best match has the lowest
+    page = ranked.order_by(score, movie_fts.c.rowid).limit(limit + 1).subquery()
+    rows = db.session.execute(
+        select(Movie, page.c.score).join(page, page.c.rowid == Movie.id).order_by(page.c.score, page.c.rowid)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(RELEVANCE_SORT, rows[-1].score, rows[-1].Movie.id)
+    return [row.Movie for row in rows], next_cursor
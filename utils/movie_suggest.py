@@ -0,0 +1,343 @@
+import logging
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from heapq import merge
+from operator import itemgetter
+from sys import intern
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+from sqlalchemy import event, func, inspect, null, select
+from sqlalchemy.orm import Session
+from models import Actor, Movie, MovieActor, db
+
+logger = logging.getLogger(__name__)
+
+# Most suggestions returned per kind (movies, actors)
+SUGGESTION_LIMIT = 10
+
+# Prefixes matching more keys than this have their top suggestions ranked
+# when the index is built; any other prefix ranks at most this many keys per
+# request
+SCAN_LIMIT = 256
+
+# A name also matches from each of its first few words on ("dark kn" finds
+# "The Dark Knight")
+MAX_KEY_WORDS = 6
+
+# Seconds between checks for movies added by another process (import_movies.py)
+REFRESH_INTERVAL = 30.0
+
+# Seconds between full rebuilds of the index. The checks above only see new
+# rows; rebuilding drops movies and actors another process renamed or deleted.
+REBUILD_INTERVAL = 600.0
+
+# Columns whose changes make an indexed record stale
+INDEXED_COLUMNS = {Movie: ('title', 'rating', 'release_year'), Actor: ('name',)}
+
+WORD_RE = re.compile(r'\w+')
+
+def normalize(text: str) -> str:
+    """Lower-case, accent-free words of ``text`` separated by single spaces."""
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(WORD_RE.findall(text.casefold()))
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index over names (movie titles or actor names).
+
+    Every record is keyed by its normalized name and by the name from each
+    later word on, in one sorted list searched with bisect. Records are
+    numbered in ranking order (best score first), so the best matches of a
+    prefix are simply its lowest record numbers. Record data is kept in
+    arrays indexed by record number and the strings are interned, so a
+    worker holds little more than the names themselves. Indexes are never
+    modified; with_records returns an extended copy, so readers always see
+    a complete index.
+    """
+
+    def __init__(self, ids: Optional[array] = None, names: Optional[List[str]] = None,
+                 scores: Optional[array] = None, years: Optional[array] = None,
+                 keys: Optional[List[str]] = None, key_records: Optional[array] = None):
+        self.ids = ids if ids is not None else array('q')  # Database id per record
+        self.names = names if names is not None else []
+        self.scores = scores if scores is not None else array('d')  # Ranking, higher first
+        self.years = years if years is not None else array('h')  # 0 when unknown
+        self.keys = keys if keys is not None else []
+        self.key_records = key_records if key_records is not None else array('I')
+        self.top = self._rank_crowded_prefixes()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _best(self, start: int, end: int, limit: int = SUGGESTION_LIMIT) -> List[int]:
+        """Best (lowest-numbered) distinct records of the keys in [start, end)."""
+        return sorted(set(self.key_records[start:end]))[:limit]
+
+    def _prefix_end(self, prefix: str, start: int, end: Optional[int] = None) -> int:
+        """Position after the last key starting with ``prefix``, searching from ``start``."""
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return bisect_left(self.keys, upper, start, len(self.keys) if end is None else end)
+
+    def _rank_crowded_prefixes(self) -> Dict[str, array]:
+        """
+        Best records of every prefix matching more than SCAN_LIMIT keys.
+
+        A prefix can only be crowded if the prefix one character shorter is,
+        so each length only splits the crowded ranges of the previous one.
+        """
+        top = {}
+        crowded = [(0, len(self.keys))] if len(self.keys) > SCAN_LIMIT else []
+        length = 0
+        while crowded:
+            length += 1
+            spans, crowded = crowded, []
+            for start, end in spans:
+                while start < end:
+                    if len(self.keys[start]) < length:
+                        start += 1  # Sorts before the longer keys sharing its prefix
+                        continue
+                    prefix = self.keys[start][:length]
+                    stop = self._prefix_end(prefix, start, end)
+                    if stop - start > SCAN_LIMIT:
+                        top[prefix] = array('I', self._best(start, stop))
+                        crowded.append((start, stop))
+                    start = stop
+        return top
+
+    def with_records(self, records: Iterable[Tuple[int, str, float, Optional[int]]]) -> 'PrefixIndex':
+        """
+        A copy of the index with more records.
+
+        Args:
+            records: (id, name, score, year) tuples
+
+        Returns:
+            The extended index
+        """
+        added = [(record_id, intern(name), score or 0.0, year or 0)
+                 for record_id, name, score, year in records]
+        if not added:
+            return self
+        rows = list(zip(self.ids, self.names, self.scores, self.years)) + added
+
+        # Renumber every record in ranking order
+        order = sorted(range(len(rows)), key=lambda i: (-rows[i][2], rows[i][0]))
+        number = array('I', bytes(4 * len(rows)))
+        for position, i in enumerate(order):
+            number[i] = position
+
+        new_keys = []
+        for i in range(len(self.ids), len(rows)):
+            words = normalize(rows[i][1]).split()
+            for start in range(min(len(words), MAX_KEY_WORDS)):
+                new_keys.append((intern(' '.join(words[start:])), number[i]))
+        new_keys.sort()
+        old_keys = zip(self.keys, (number[record] for record in self.key_records))
+        merged = list(merge(old_keys, new_keys, key=itemgetter(0)))
+
+        ranked = [rows[i] for i in order]
+        return PrefixIndex(
+            array('q', [row[0] for row in ranked]),
+            [row[1] for row in ranked],
+            array('d', [row[2] for row in ranked]),
+            array('h', [row[3] for row in ranked]),
+            [key for key, _ in merged],
+            array('I', [record for _, record in merged]),
+        )
+
+    def match(self, prefix: str, limit: int = SUGGESTION_LIMIT) -> List[int]:
+        """
+        Best-scored records with a name (or later part of it) starting with ``prefix``.
+
+        Args:
+            prefix: A normalized prefix (see normalize)
+            limit: Most records returned (at most SUGGESTION_LIMIT)
+
+        Returns:
+            Record numbers, best first
+        """
+        if not prefix:
+            return []
+        top = self.top.get(prefix)
+        if top is not None:
+            return top.tolist()[:limit]
+        start = bisect_left(self.keys, prefix)
+        return self._best(start, self._prefix_end(prefix, start), limit)
+
+class SuggestionIndex:
+    """
+    The title and actor-name indexes of one database and the newest rows they cover.
+
+    ``stale`` is set when this process edits or deletes an indexed movie or
+    actor; the next lookup starts a rebuild in the background.
+    """
+
+    def __init__(self, movies: PrefixIndex, actors: PrefixIndex, last_movie_id: int, last_actor_id: int,
+                 built_at: Optional[float] = None):
+        self.movies = movies
+        self.actors = actors
+        self.last_movie_id = last_movie_id
+        self.last_actor_id = last_actor_id
+        self.checked_at = time.monotonic()
+        self.built_at = self.checked_at if built_at is None else built_at
+        self.stale = False
+
+    def needs_rebuild(self) -> bool:
+        return self.stale or time.monotonic() - self.built_at >= REBUILD_INTERVAL
+
+    def suggest(self, query: str, limit: int = SUGGESTION_LIMIT) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Typeahead suggestions for a partially typed query.
+
+        Returns:
+            {'movies': [{id, title, year, rating}], 'actors': [{id, name}]},
+            best-rated movies and most-credited actors first
+        """
+        prefix = normalize(query)
+        movies, actors = self.movies, self.actors
+        return {
+            'movies': [{
+                'id': movies.ids[record],
+                'title': movies.names[record],
+                'year': movies.years[record] or None,
+                'rating': movies.scores[record],
+            } for record in movies.match(prefix, limit)],
+            'actors': [{
+                'id': actors.ids[record],
+                'name': actors.names[record],
+            } for record in actors.match(prefix, limit)],
+        }
+
+def _extend(conn, index: Optional[SuggestionIndex] = None) -> SuggestionIndex:
+    """Build a suggestion index, or extend ``index`` with the movies and actors added since."""
+    last_movie_id = index.last_movie_id if index else 0
+    last_actor_id = index.last_actor_id if index else 0
+    movie_rows = conn.execute(
+        select(Movie.id, Movie.title, Movie.rating, Movie.release_year)
+        .where(Movie.id > last_movie_id)
+        .order_by(Movie.id)
+    ).all()
+    # Actors are ranked by how many movies credit them
+    actor_rows = conn.execute(
+        select(Actor.id, Actor.name, func.count(MovieActor.id), null())
+        .outerjoin(MovieActor, MovieActor.actor_id == Actor.id)
+        .where(Actor.id > last_actor_id)
+        .group_by(Actor.id)
+        .order_by(Actor.id)
+    ).all()
+    movies = index.movies if index else PrefixIndex()
+    actors = index.actors if index else PrefixIndex()
+    extended = SuggestionIndex(
+        movies.with_records(movie_rows),
+        actors.with_records(actor_rows),
+        movie_rows[-1].id if movie_rows else last_movie_id,
+        actor_rows[-1].id if actor_rows else last_actor_id,
+        index.built_at if index else None,
+    )
+    extended.stale = index.stale if index else False
+    return extended
+
+# Engine -> its suggestion index, built on first use in each worker process
+_indexes: 'WeakKeyDictionary[Any, SuggestionIndex]' = WeakKeyDictionary()
+_lock = threading.Lock()
+
+# Engine -> the thread rebuilding its index
+_rebuilds: 'WeakKeyDictionary[Any, threading.Thread]' = WeakKeyDictionary()
+
+def _start_rebuild(engine, index: SuggestionIndex) -> None:
+    """Rebuild an engine's index in a background thread unless a rebuild is already running."""
+    with _lock:
+        if engine in _rebuilds:
+            return
+        # Edits committed from here on mark the index stale again
+        index.stale = False
+        thread = _rebuilds[engine] = threading.Thread(
+            target=_rebuild, args=(engine,), name='suggestion-index-rebuild', daemon=True
+        )
+    thread.start()
+
+def _rebuild(engine) -> None:
+    try:
+        with engine.connect() as conn:
+            rebuilt = _extend(conn)
+    except Exception as e:
+        logger.warning(f"Rebuilding the suggestion index failed: {str(e)}")
+        rebuilt = None
+    with _lock:
+        current = _indexes.get(engine)
+        if rebuilt is None:
+            if current is not None:
+                current.stale = True  # Try again on a later lookup
+        else:
+            # Rows added since the rebuild read the tables come with the next refresh
+            rebuilt.stale = current.stale if current is not None else False
+            _indexes[engine] = rebuilt
+        del _rebuilds[engine]
+
+def refresh_suggestion_index(conn, rebuild: bool = False) -> None:
+    """
+    Add newly imported movies and actors to this process's suggestion index.
+
+    With ``rebuild``, the index is built again instead, for writes that
+    also changed or removed existing rows. Does nothing if the index hasn't
+    been built yet (its first use builds it from the database).
+    """
+    with _lock:
+        index = _indexes.get(conn.engine)
+        if index is not None:
+            _indexes[conn.engine] = _extend(conn, None if rebuild else index)
+
+def get_suggestion_index() -> SuggestionIndex:
+    """
+    The suggestion index of the application's database.
+
+    Built on first use; after that, movies and actors added by other
+    processes are picked up at most REFRESH_INTERVAL seconds apart. Every
+    REBUILD_INTERVAL seconds, or after this process edits or deletes an
+    indexed row, the index is rebuilt in the background while lookups keep
+    using the current one.
+    """
+    engine = db.engine
+    index = _indexes.get(engine)
+    if index is not None:
+        if index.needs_rebuild():
+            _start_rebuild(engine, index)
+        if time.monotonic() - index.checked_at < REFRESH_INTERVAL:
+            return index
+    with _lock:
+        index = _indexes.get(engine)
+        if index is None or time.monotonic() - index.checked_at >= REFRESH_INTERVAL:
+            with engine.connect() as conn:
+                index = _indexes[engine] = _extend(conn, index)
+    return index
+
+@event.listens_for(Session, 'after_flush')
+def _note_indexed_changes(session, flush_context) -> None:
+    """Remember the engines whose indexed movies or actors this transaction edited or deleted."""
+    changed = [obj for obj in session.deleted if type(obj) in INDEXED_COLUMNS] + [
+        obj for obj in session.dirty if type(obj) in INDEXED_COLUMNS
+        and any(inspect(obj).attrs[column].history.has_changes() for column in INDEXED_COLUMNS[type(obj)])
+    ]
+    if changed:
+        session.info.setdefault('stale_suggestions', set()).add(session.get_bind())
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_suggestion_indexes(session) -> None:
+    for engine in session.info.pop('stale_suggestions', ()):
+        index = _indexes.get(engine)
+        if index is not None:
+            index.stale = True
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_indexed_changes(session) -> None:
+    session.info.pop('stale_suggestions', None)
+
+def suggest(query: str, limit: int = SUGGESTION_LIMIT) -> Dict[str, List[Dict[str, Any]]]:
+    """Typeahead suggestions from the application's database (see SuggestionIndex.suggest)."""
+    return get_suggestion_index().suggest(query, limit)